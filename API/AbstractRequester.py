@@ -1,12 +1,67 @@
 import abc
+import logging
+import time
 
 from requests import Response, Session
+from requests.adapters import HTTPAdapter
+from requests.exceptions import ConnectionError, Timeout
+
+from API.Cassette import Cassette
+from API.RetryPolicy import RetryPolicy
+from API.TokenBucket import TokenBucket
 
 
 class AbstractRequester(Session, metaclass=abc.ABCMeta):
-    def __init__(self, first_part_url: str = ''):
+    def __init__(self, first_part_url: str = '', pool_size: int = 10, keep_alive: bool = True,
+                 retry_policy: RetryPolicy | None = None, rate_limiter: TokenBucket | None = None):
         super().__init__()
         self.first_part_url = first_part_url
+        self.pool_size = pool_size
+        self.keep_alive = keep_alive
+        # shared by all clients using this requester: retries of idempotent calls and an optional rate limit
+        self.retry_policy = retry_policy if retry_policy is not None else RetryPolicy()
+        self.rate_limiter = rate_limiter
+        # record mode: every response (after the retries) is added to the cassette
+        self.cassette: Cassette | None = None
+
+        # one adapter per scheme, sized so that all clients sharing this session can reuse their connections
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.mount('https://', adapter)
+        self.mount('http://', adapter)
+        if not keep_alive:
+            self.headers['Connection'] = 'close'
+
+    def request(self, method: str, url: str, *args, idempotent: bool | None = None, **kwargs) -> Response:
+        # every call of the session passes here; a POST that only reads (a search) is retried when it is marked
+        # idempotent, the last response is returned when the retries run out
+        if idempotent is None:
+            idempotent = method.upper() in self.retry_policy.idempotent_methods
+        attempt = 0
+        while True:
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire()
+            try:
+                response = super().request(method, url, *args, **kwargs)
+            except (ConnectionError, Timeout) as exception:
+                if not idempotent or not self.retry_policy.should_retry(attempt):
+                    raise
+                delay = self.retry_policy.get_delay(attempt)
+                logging.info(f'{method} {url} failed ({exception}), retry {attempt + 1} in {delay:.1f}s')
+            else:
+                if not idempotent or not self.retry_policy.should_retry(attempt, response):
+                    if self.cassette is not None:
+                        self.cassette.record(response)
+                    return response
+                delay = self.retry_policy.get_delay(attempt, response)
+                logging.info(f'{method} {url} returned {response.status_code}, retry {attempt + 1} in {delay:.1f}s')
+                response.close()
+            time.sleep(delay)
+            attempt += 1
+            kwargs = self.modify_kwargs_for_retry(kwargs)
+
+    def modify_kwargs_for_retry(self, kwargs: dict) -> dict:
+        # a retry can follow a long sleep, subclasses renew what may have expired meanwhile (f.e. a bearer token)
+        return kwargs
 
     @abc.abstractmethod
     def get(self, url: str = '', **kwargs) -> Response:
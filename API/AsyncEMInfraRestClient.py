@@ -0,0 +1,98 @@
+import asyncio
+from typing import AsyncGenerator
+
+from requests import Response
+
+from API.AsyncRequester import AsyncRequester
+from API.EMInfraRestClient import EMInfraRestClient
+from Domain.EMInfraDomain import FeedProxyPage, EventContextDTO, EventContextDTOList, EventDTOList, EventDTO
+
+
+class AsyncEMInfraRestClient:
+    # the OSLO search, feed and event context calls of EMInfraRestClient as coroutines, so many searches can be in
+    # flight from one process; the concurrency is bounded by the AsyncRequester
+    def __init__(self, requester: AsyncRequester):
+        self.requester = requester
+        self.requester.first_part_url += 'eminfra/'
+
+    @classmethod
+    def raise_for_status(cls, response: Response, status_code: int = 200,
+                         exception_type: type[Exception] = RuntimeError) -> None:
+        if response.status_code != status_code:
+            print(response)
+            raise exception_type(response.content.decode())
+
+    async def get_oslo_search_page(self, resource: str, cursor: str | None = None, size: int = 100,
+                                   filter_dict: dict = None) -> tuple[list[dict], str | None]:
+        # the objects of one page and the cursor of the next page (None on the last page)
+        response = await self.requester.post(
+            url=f'core/api/otl/{resource}/search', idempotent=True,
+            json=EMInfraRestClient.create_oslo_search_json(resource=resource, cursor=cursor, size=size,
+                                                           filter_dict=filter_dict))
+        self.raise_for_status(response)
+        return response.json()['@graph'], response.headers.get('em-paging-next-cursor')
+
+    async def iterate_objects_from_oslo_search_endpoint(self, resource: str, cursor: str | None = None,
+                                                        size: int = 100, filter_dict: dict = None
+                                                        ) -> AsyncGenerator[dict, None]:
+        # the pages of one search follow each other (the cursor is in the previous page), run several searches at
+        # the same time to use the concurrency
+        while True:
+            objects, cursor = await self.get_oslo_search_page(resource=resource, cursor=cursor, size=size,
+                                                              filter_dict=filter_dict)
+            for obj in objects:
+                yield obj
+            if cursor is None:
+                break
+
+    async def get_objects_from_oslo_search_endpoint(self, resource: str, cursor: str | None = None, size: int = 100,
+                                                    filter_dict: dict = None) -> list[dict]:
+        return [obj async for obj in self.iterate_objects_from_oslo_search_endpoint(
+            resource=resource, cursor=cursor, size=size, filter_dict=filter_dict)]
+
+    async def get_current_feed_page(self) -> FeedProxyPage:
+        response = await self.requester.get(url='feedproxy/feed/assets')
+        self.raise_for_status(response)
+        return FeedProxyPage.model_validate_json(response.content.decode())
+
+    async def get_feed_page_by_number(self, page_number: str) -> FeedProxyPage:
+        response = await self.requester.get(url=f'feedproxy/feed/assets/{page_number}/100')
+        self.raise_for_status(response)
+        return FeedProxyPage.model_validate_json(response.content.decode())
+
+    async def get_event_context_by_uuid(self, uuid: str) -> EventContextDTO:
+        response = await self.requester.get(url=f'core/api/eventcontexts/{uuid}')
+        self.raise_for_status(response)
+        return EventContextDTO.model_validate_json(response.content.decode())
+
+    async def get_event_contexts_by_uuids(self, uuids: [str]) -> list[EventContextDTO]:
+        return list(await asyncio.gather(*(self.get_event_context_by_uuid(uuid=uuid) for uuid in uuids)))
+
+    async def get_events_page_by_eventcontext_id(self, context_id: str, size: int = 10, from_: int = 0
+                                                 ) -> EventDTOList:
+        search_query_dto = EMInfraRestClient.create_events_by_eventcontext_query(context_id=context_id, size=size)
+        search_query_dto.from_ = from_
+        response = await self.requester.post(url='core/api/events/search', idempotent=True,
+                                             json=search_query_dto.dict(by_alias=True))
+        self.raise_for_status(response, exception_type=ProcessLookupError)
+        return EventDTOList.model_validate_json(response.content.decode())
+
+    async def get_feed_events_by_eventcontext_id(self, context_id: str, size: int = 10) -> list[EventDTO]:
+        # the first page gives the total count, the other pages (offset paging) are requested at the same time
+        first_page = await self.get_events_page_by_eventcontext_id(context_id=context_id, size=size)
+        events = list(first_page.data)
+        if not events:
+            return events
+        other_pages = await asyncio.gather(*(
+            self.get_events_page_by_eventcontext_id(context_id=context_id, size=size, from_=from_)
+            for from_ in range(len(events), first_page.totalCount, size)))
+        for page in other_pages:
+            events.extend(page.data)
+        return events
+
+    async def get_delivery_from_context_string(self, context_string: str) -> EventContextDTOList:
+        search_query_dto = EMInfraRestClient.create_context_string_query(context_string=context_string)
+        response = await self.requester.post(url='core/api/eventcontexts/search', idempotent=True,
+                                             json=search_query_dto.dict(by_alias=True))
+        self.raise_for_status(response, exception_type=ProcessLookupError)
+        return EventContextDTOList.model_validate_json(response.content.decode())
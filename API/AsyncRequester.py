@@ -0,0 +1,57 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Callable
+from weakref import WeakKeyDictionary
+
+from requests import Response
+
+from API.AbstractRequester import AbstractRequester
+
+
+class AsyncRequester:
+    # asyncio view on a (shared) requester: the calls run on <max_concurrency> threads that use the session, connection
+    # pool, token, retry policy and rate limit of the requester, a semaphore bounds the calls in flight so any amount of
+    # tasks can be started; keep the pool_size of the requester at least <max_concurrency>
+    def __init__(self, requester: AbstractRequester, first_part_url: str = '', max_concurrency: int = 10):
+        self.requester = requester
+        self.first_part_url = first_part_url
+        self.max_concurrency = max_concurrency
+        self.executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix='async_requester')
+        # a semaphore belongs to one event loop
+        self.semaphores: WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.BoundedSemaphore] = WeakKeyDictionary()
+
+    def get_semaphore(self) -> asyncio.BoundedSemaphore:
+        loop = asyncio.get_running_loop()
+        semaphore = self.semaphores.get(loop)
+        if semaphore is None:
+            semaphore = self.semaphores[loop] = asyncio.BoundedSemaphore(self.max_concurrency)
+        return semaphore
+
+    async def run(self, function: Callable, *args, **kwargs):
+        # any blocking call on the requester, f.e. a request of which the streamed response is read as well
+        async with self.get_semaphore():
+            return await asyncio.get_running_loop().run_in_executor(self.executor,
+                                                                    partial(function, *args, **kwargs))
+
+    async def request(self, method: str, url: str = '', **kwargs) -> Response:
+        return await self.run(getattr(self.requester, method), url=self.first_part_url + url, **kwargs)
+
+    async def get(self, url: str = '', **kwargs) -> Response:
+        return await self.request('get', url=url, **kwargs)
+
+    async def post(self, url: str = '', **kwargs) -> Response:
+        return await self.request('post', url=url, **kwargs)
+
+    async def put(self, url: str = '', **kwargs) -> Response:
+        return await self.request('put', url=url, **kwargs)
+
+    async def patch(self, url: str = '', **kwargs) -> Response:
+        return await self.request('patch', url=url, **kwargs)
+
+    async def delete(self, url: str = '', **kwargs) -> Response:
+        return await self.request('delete', url=url, **kwargs)
+
+    def close(self) -> None:
+        # the requester itself stays open, it is shared with the synchronous clients
+        self.executor.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,77 @@
+import json
+from pathlib import Path
+from threading import Lock
+
+from requests import Response
+
+
+class Cassette:
+    # the request/response pairs of a requester in record mode, written as one json object per line while they are
+    # recorded; the headers with credentials are scrubbed, so a cassette can be replayed by the stub server offline
+    scrubbed_headers = frozenset({'authorization', 'proxy-authorization', 'cookie', 'set-cookie'})
+    # headers that do not describe the recorded body anymore
+    dropped_headers = frozenset({'content-encoding', 'content-length', 'transfer-encoding', 'connection'})
+
+    def __init__(self, cassette_path: Path | None = None, interactions: list[dict] = None):
+        self.cassette_path = cassette_path
+        self.interactions: list[dict] = interactions if interactions is not None else []
+        self.lock = Lock()
+        self.replay_counts: dict[tuple, int] = {}
+        self.interactions_by_key: dict[tuple, list[dict]] = {}
+        for interaction in self.interactions:
+            self.index_interaction(interaction)
+
+    @classmethod
+    def load(cls, cassette_path: Path) -> 'Cassette':
+        with open(cassette_path) as cassette_file:
+            interactions = [json.loads(line) for line in cassette_file if line.strip()]
+        return cls(interactions=interactions)
+
+    @classmethod
+    def scrub_headers(cls, headers) -> dict[str, str]:
+        return {name: '<scrubbed>' if name.lower() in cls.scrubbed_headers else value
+                for name, value in headers.items() if name.lower() not in cls.dropped_headers}
+
+    @classmethod
+    def get_request_key(cls, method: str, path: str, body: str | bytes | None) -> tuple[str, str, str]:
+        # json bodies are compared on their content, not on the order of their keys
+        if isinstance(body, bytes):
+            body = body.decode()
+        body = body or ''
+        try:
+            body = json.dumps(json.loads(body), sort_keys=True)
+        except ValueError:
+            pass
+        return method.upper(), path, body
+
+    def index_interaction(self, interaction: dict) -> None:
+        request = interaction['request']
+        key = self.get_request_key(request['method'], request['path'], request['body'])
+        self.interactions_by_key.setdefault(key, []).append(interaction)
+
+    def record(self, response: Response) -> None:
+        # reads the whole body, a streamed response is then read from memory
+        request = response.request
+        body = request.body.decode() if isinstance(request.body, bytes) else request.body
+        interaction = {
+            'request': {'method': request.method, 'path': request.path_url, 'headers': self.scrub_headers(
+                request.headers), 'body': body},
+            'response': {'status_code': response.status_code, 'headers': self.scrub_headers(response.headers),
+                         'body': response.content.decode()}}
+        with self.lock:
+            self.interactions.append(interaction)
+            self.index_interaction(interaction)
+            if self.cassette_path is not None:
+                with open(self.cassette_path, 'a') as cassette_file:
+                    cassette_file.write(json.dumps(interaction) + '\n')
+
+    def find_response(self, method: str, path: str, body: str | bytes | None) -> dict | None:
+        # the same request recorded several times is answered in the recorded order, the last answer repeats
+        key = self.get_request_key(method, path, body)
+        with self.lock:
+            interactions = self.interactions_by_key.get(key)
+            if not interactions:
+                return None
+            count = self.replay_counts.get(key, 0)
+            self.replay_counts[key] = count + 1
+            return interactions[min(count, len(interactions) - 1)]['response']
@@ -4,11 +4,16 @@ from pathlib import Path
 from requests import Response
 
 from API.AbstractRequester import AbstractRequester
+from API.RetryPolicy import RetryPolicy
+from API.TokenBucket import TokenBucket
 
 
 class CertRequester(AbstractRequester):
-    def __init__(self, cert_path: Path, key_path: Path, first_part_url: str = ''):
-        super().__init__(first_part_url=first_part_url)
+    def __init__(self, cert_path: Path, key_path: Path, first_part_url: str = '', pool_size: int = 10,
+                 keep_alive: bool = True, retry_policy: RetryPolicy | None = None,
+                 rate_limiter: TokenBucket | None = None):
+        super().__init__(first_part_url=first_part_url, pool_size=pool_size, keep_alive=keep_alive,
+                         retry_policy=retry_policy, rate_limiter=rate_limiter)
         self.cert_path = cert_path
         self.key_path = key_path
 
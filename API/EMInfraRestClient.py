@@ -1,10 +1,12 @@
-﻿import json
-from datetime import datetime
+﻿from datetime import datetime
+from queue import Queue, Full
+from threading import Event, Thread
 from typing import Generator, Iterator
 
 from requests import Response
 
 from API.AbstractRequester import AbstractRequester
+from API.GraphStreamParser import GraphStreamParser
 from Domain.EMInfraDomain import FeedProxyPage, EventContextDTO, InstallatieDTO, InstallatieUpdateDTO, LocatieDTO, \
     LocatieKenmerkDTO, LocatieKenmerkUpdateLocatieDTO, LocatieRelatieUpdateDTO, AssetRefDTO, \
     KenmerkEigenschapValueDTOList, ListUpdateDTOKenmerkEigenschapValueUpdateDTO, KenmerkEigenschapValueUpdateDTO, \
@@ -19,10 +21,13 @@ class EMInfraRestClient:
         'lgc:installatie#VPBevestig': '2588c15f-b84d-41bf-a2c9-ad2c0376960b',
         'lgc:installatie#VVOP': 'dfb4ca9b-8744-4088-bce9-67771a30d6bd'
     }
+    stream_chunk_size = 64 * 1024
 
-    def __init__(self, requester: AbstractRequester):
+    def __init__(self, requester: AbstractRequester, search_prefetch_page_count: int = 0):
         self.requester = requester
         self.requester.first_part_url += 'eminfra/'
+        # the amount of search pages that can be requested ahead of the page the consumer is handling
+        self.search_prefetch_page_count = search_prefetch_page_count
 
     def get_installatie_by_id(self, id: str) -> InstallatieDTO:
         response = self.requester.get(
@@ -90,33 +95,104 @@ class EMInfraRestClient:
             self, resource: str,
             cursor: str | None = None,
             size: int = 100,
-            filter_dict: dict = None) -> Generator[dict, None, None]:
+            filter_dict: dict = None,
+            prefetch_page_count: int | None = None) -> Generator[dict, None, None]:
+        if prefetch_page_count is None:
+            prefetch_page_count = self.search_prefetch_page_count
+        if prefetch_page_count > 0:
+            pages = self.iterate_prefetched_search_pages(
+                resource=resource, cursor=cursor, size=size, filter_dict=filter_dict,
+                prefetch_page_count=prefetch_page_count)
+        else:
+            pages = self.iterate_search_pages(resource=resource, cursor=cursor, size=size, filter_dict=filter_dict)
+
+        try:
+            for response in pages:
+                with response:
+                    if response.status_code != 200:
+                        raise RuntimeError(response.content.decode())
+                    # the objects are yielded while the page is downloading, without holding the whole page
+                    yield from GraphStreamParser(
+                        response.iter_content(chunk_size=self.stream_chunk_size)).iterate_items()
+        finally:
+            # stops the prefetching right away, also when the consumer stops early or the page fails
+            pages.close()
+
+    def iterate_search_pages(self, resource: str, cursor: str | None = None, size: int = 100,
+                             filter_dict: dict = None) -> Generator[Response, None, None]:
+        # the (streamed) responses of the pages, the cursor of the next page is in the headers of the previous one
         while True:
             response = self.get_objects_from_oslo_search_endpoint(
-                resource=resource, cursor=cursor, size=size, filter_dict=filter_dict)
-
-            decoded_string = response.content.decode()
-            graph = json.loads(decoded_string)
-            headers = dict(response.headers)
-
-            yield from graph['@graph']
-            if 'em-paging-next-cursor' not in headers:
+                resource=resource, cursor=cursor, size=size, filter_dict=filter_dict, stream=True)
+            yield response
+            cursor = response.headers.get('em-paging-next-cursor')
+            if response.status_code != 200 or cursor is None:
                 break
-            cursor = headers['em-paging-next-cursor']
+
+    def iterate_prefetched_search_pages(self, resource: str, cursor: str | None = None, size: int = 100,
+                                        filter_dict: dict = None, prefetch_page_count: int = 1
+                                        ) -> Generator[Response, None, None]:
+        # a background thread requests the next page as soon as the headers (with the cursor) of the previous page
+        # arrive, at most <prefetch_page_count> requested pages wait in the queue until the consumer reaches them
+        page_queue: Queue = Queue(maxsize=prefetch_page_count)
+        stopped = Event()
+
+        def put_until_stopped(item) -> bool:
+            while not stopped.is_set():
+                try:
+                    page_queue.put(item, timeout=0.1)
+                    return True
+                except Full:
+                    continue
+            return False
+
+        def request_pages() -> None:
+            try:
+                for response in self.iterate_search_pages(resource=resource, cursor=cursor, size=size,
+                                                          filter_dict=filter_dict):
+                    if not put_until_stopped(response):
+                        response.close()
+                        return
+            except Exception as exception:
+                put_until_stopped(exception)
+            put_until_stopped(None)
+
+        thread = Thread(target=request_pages, name='oslo_search_prefetch', daemon=True)
+        thread.start()
+        try:
+            while True:
+                page = page_queue.get()
+                if page is None:
+                    return
+                if isinstance(page, Exception):
+                    raise page
+                yield page
+        finally:
+            # the consumer stopped early or failed: stop requesting and close the pages nobody will read
+            stopped.set()
+            thread.join()
+            while not page_queue.empty():
+                page = page_queue.get_nowait()
+                if isinstance(page, Response):
+                    page.close()
 
     def get_objects_from_oslo_search_endpoint(self, resource: str,
                                               cursor: str | None = None,
                                               size: int = 100,
-                                              filter_dict: dict = None) -> Response:
-        url = f'core/api/otl/{resource}/search'
+                                              filter_dict: dict = None,
+                                              stream: bool = False) -> Response:
+        return self.requester.post(url=f'core/api/otl/{resource}/search', json=self.create_oslo_search_json(
+            resource=resource, cursor=cursor, size=size, filter_dict=filter_dict), stream=stream, idempotent=True)
+
+    @classmethod
+    def create_oslo_search_json(cls, resource: str, cursor: str | None = None, size: int = 100,
+                                filter_dict: dict = None) -> dict:
         otl_zoekparameter = ZoekParameterOTL(size=size, from_cursor=cursor, filter_dict=filter_dict)
 
         if resource == 'agents':
             otl_zoekparameter.expansion_field_list = ['contactInfo']
 
-        json_data = otl_zoekparameter.to_dict()
-
-        return self.requester.post(url=url, json=json_data)
+        return otl_zoekparameter.to_dict()
 
     def get_current_feed_page(self) -> FeedProxyPage:
         response = self.requester.get(
@@ -307,17 +383,13 @@ class EMInfraRestClient:
         raise NotImplementedError(f'no type defined for {value}')
 
     def get_feed_events_by_eventcontext_id(self, context_id: str, size: int = 10) -> Iterator[EventDTO]:
-        search_query_dto = QueryDTO(
-            size=size, pagingMode='OFFSET',
-            selection=SelectionDTO(expressions=[ExpressionDTO(terms=[TermDTO(
-                property='contextId', value=context_id, operator='EQ')])])
-        )
+        search_query_dto = self.create_events_by_eventcontext_query(context_id=context_id, size=size)
         count = 0
         total_count = -1
 
         while True:
             json_data = search_query_dto.dict(by_alias=True)
-            response = self.requester.post(url='core/api/events/search', json=json_data)
+            response = self.requester.post(url='core/api/events/search', json=json_data, idempotent=True)
             if response.status_code != 200:
                 print(response)
                 raise ProcessLookupError(response.content.decode())
@@ -332,15 +404,27 @@ class EMInfraRestClient:
                 break
             search_query_dto.from_ = count
 
-    def get_delivery_from_context_string(self, context_string: str):
-        search_query_dto = QueryDTO(
+    @classmethod
+    def create_events_by_eventcontext_query(cls, context_id: str, size: int = 10) -> QueryDTO:
+        return QueryDTO(
+            size=size, pagingMode='OFFSET',
+            selection=SelectionDTO(expressions=[ExpressionDTO(terms=[TermDTO(
+                property='contextId', value=context_id, operator='EQ')])])
+        )
+
+    @classmethod
+    def create_context_string_query(cls, context_string: str) -> QueryDTO:
+        return QueryDTO(
             size=10, pagingMode='OFFSET',
             selection=SelectionDTO(expressions=[ExpressionDTO(terms=[TermDTO(
                 property='omschrijving', value=context_string, operator='CONTAINS')])])
         )
 
+    def get_delivery_from_context_string(self, context_string: str):
+        search_query_dto = self.create_context_string_query(context_string=context_string)
+
         json_data = search_query_dto.dict(by_alias=True)
-        response = self.requester.post(url='core/api/eventcontexts/search', json=json_data)
+        response = self.requester.post(url='core/api/eventcontexts/search', json=json_data, idempotent=True)
         if response.status_code != 200:
             print(response)
             raise ProcessLookupError(response.content.decode())
@@ -35,7 +35,7 @@ class EMInfraRestClient:
 
         response = self.requester.post(
             url='core/api/eigenschappen/search',
-            data=json.dumps(payload))
+            data=json.dumps(payload), idempotent=True)
         if response.status_code != 200:
             print(response)
             raise ProcessLookupError(response.content.decode("utf-8"))
@@ -0,0 +1,97 @@
+import codecs
+import json
+from typing import Generator, Iterable
+
+
+class GraphStreamParser:
+    # parses a JSON object from a stream of byte chunks and yields the items of one of its arrays (the @graph of an
+    # OSLO search page) as soon as they are complete, only holding the part of the stream that is not parsed yet
+    decoder = json.JSONDecoder()
+    whitespace = ' \t\n\r'
+    delimiters = whitespace + ',]}:'
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self.chunks = iter(chunks)
+        self.text_decoder = codecs.getincrementaldecoder('utf-8')()
+        self.buffer = ''
+        self.position = 0
+        self.finished = False
+
+    def read_more(self) -> bool:
+        # replaces the parsed part of the buffer with the next chunk, False at the end of the stream
+        if self.finished:
+            return False
+        for chunk in self.chunks:
+            if chunk:
+                self.buffer = self.buffer[self.position:] + self.text_decoder.decode(chunk)
+                self.position = 0
+                return True
+        self.buffer = self.buffer[self.position:] + self.text_decoder.decode(b'', final=True)
+        self.position = 0
+        self.finished = True
+        return False
+
+    def peek(self) -> str:
+        # the next character that is not whitespace, without consuming it, '' at the end of the stream
+        while True:
+            while self.position < len(self.buffer) and self.buffer[self.position] in self.whitespace:
+                self.position += 1
+            if self.position < len(self.buffer):
+                return self.buffer[self.position]
+            if not self.read_more():
+                return ''
+
+    def expect(self, characters: str) -> str:
+        character = self.peek()
+        if character == '' or character not in characters:
+            raise ValueError(f'Expected one of {list(characters)} in the JSON stream, found {character!r}.')
+        self.position += 1
+        return character
+
+    def decode_value(self):
+        # a value is only accepted when a delimiter follows it (or at the end of the stream): a number like 12 at the
+        # end of a chunk could still go on
+        while True:
+            self.peek()
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.position)
+                if self.finished or (end < len(self.buffer) and self.buffer[end] in self.delimiters):
+                    self.position = end
+                    return value
+            except json.JSONDecodeError:
+                if self.finished:
+                    raise
+            self.read_more()
+
+    def iterate_array(self) -> Generator:
+        self.expect('[')
+        if self.peek() == ']':
+            self.position += 1
+            return
+        while True:
+            yield self.decode_value()
+            if self.expect(',]') == ']':
+                return
+
+    def iterate_items(self, key: str = '@graph') -> Generator:
+        # the other members of the object are parsed and dropped, the stream is read to the end so the connection can
+        # be reused
+        found = False
+        self.expect('{')
+        if self.peek() == '}':
+            self.position += 1
+        else:
+            while True:
+                name = self.decode_value()
+                self.expect(':')
+                if name == key:
+                    found = True
+                    yield from self.iterate_array()
+                else:
+                    self.decode_value()
+                if self.expect(',}') == '}':
+                    break
+        if self.peek() != '':
+            raise ValueError(f'Unexpected data after the JSON object: {self.buffer[self.position:][:50]!r}.')
+        if not found:
+            raise KeyError(key)
@@ -1,32 +1,33 @@
-import datetime
-import json
 import sys
 from pathlib import Path
 
-import jwt  # pip install pyjwt and cryptography
-import jwt.algorithms as jwt_algo
-import requests
-import string
-
-from random import choice
-
 from requests import Response
 
 from API.AbstractRequester import AbstractRequester
+from API.RetryPolicy import RetryPolicy
+from API.TokenBucket import TokenBucket
+from API.TokenCache import TokenCache
+from API.TokenManager import TokenManager
 
 
 class JWTRequester(AbstractRequester):
-    def __init__(self, private_key_path: Path, client_id: str, first_part_url: str = ''):
+    def __init__(self, private_key_path: Path, client_id: str, first_part_url: str = '', pool_size: int = 10,
+                 keep_alive: bool = True, retry_policy: RetryPolicy | None = None,
+                 rate_limiter: TokenBucket | None = None, token_cache: TokenCache | None = None,
+                 token_cache_key: str | None = None):
         if 'cryptography' not in sys.modules:
             raise ModuleNotFoundError('needs module cryptography to work')
 
-        super().__init__(first_part_url=first_part_url)
+        super().__init__(first_part_url=first_part_url, pool_size=pool_size, keep_alive=keep_alive,
+                         retry_policy=retry_policy, rate_limiter=rate_limiter)
         self.private_key_path: Path = private_key_path
         self.client_id: str = client_id
 
-        self.oauth_token: str = ''
-        self.expires: datetime.datetime = datetime.datetime.now(datetime.UTC) - datetime.timedelta(seconds=1)
-        self.requested_at: datetime.datetime = self.expires
+        # a singleton is initialised again, stop the background refresh of its previous token manager
+        if getattr(self, 'token_manager', None) is not None:
+            self.token_manager.close()
+        self.token_manager = TokenManager(private_key_path=private_key_path, client_id=client_id,
+                                          token_cache=token_cache, cache_key=token_cache_key)
 
     def get(self, url: str = '', **kwargs) -> Response:
         kwargs = self.modify_kwargs_for_bearer_token(kwargs)
@@ -49,14 +50,11 @@ class JWTRequester(AbstractRequester):
         return super().delete(url=url, **kwargs)
 
     def get_oauth_token(self) -> str:
-        if self.expires > datetime.datetime.now(datetime.UTC):
-            return self.oauth_token
+        return self.token_manager.get_token()
 
-        authentication_token = self.generate_authentication_token()
-        self.oauth_token, expires_in = self.get_access_token(authentication_token)
-        self.expires = self.requested_at + datetime.timedelta(seconds=expires_in) - datetime.timedelta(minutes=1)
-
-        return self.oauth_token
+    def close(self) -> None:
+        self.token_manager.close()
+        super().close()
 
     def modify_kwargs_for_bearer_token(self, kwargs: dict) -> dict:
         bearer_token = self.get_oauth_token()
@@ -81,45 +79,12 @@ class JWTRequester(AbstractRequester):
 
         return kwargs
 
-    def generate_authentication_token(self) -> str:
-        self.requested_at = datetime.datetime.now(datetime.UTC)
-        # Authentication token generation
-        payload = {'iss': self.client_id,
-                   'sub': self.client_id,
-                   'aud': 'https://authenticatie.vlaanderen.be/op',
-                   'exp': self.requested_at + datetime.timedelta(minutes=9),
-                   'jti': ''.join(choice(string.ascii_lowercase) for _ in range(20))
-                   }
-
-        with open(self.private_key_path) as private_key:
-            private_key_json = json.load(private_key)
-            key = jwt_algo.RSAAlgorithm.from_jwk(private_key_json)
-            token = jwt.encode(payload=payload, key=key, algorithm='RS256')
-
-        return token
-
-    def get_access_token(self, token: str) -> (str, int):
-        # Authorization access token generation
-        url = 'https://authenticatie.vlaanderen.be/op/v1/token'
-        headers = {'Content-Type': 'application/x-www-form-urlencoded'}
-        request_body = {
-            'grant_type': 'client_credentials',
-            'scope': 'awv_toep_services',
-            'client_assertion_type': 'urn:ietf:params:oauth:client-assertion-type:jwt-bearer',
-            'client_id': self.client_id,
-            "client_assertion": token
-        }
-
-        response = requests.post(url, data=request_body, headers=headers)
-
-        # Check for HTTP codes other than 200
-        if response.status_code != 200:
-            print('Status:', response.status_code, 'Headers:', response.headers, 'Error Response:', response.content)
-            raise RuntimeError(f'Could not get the acces token: {response.content}')
-
-        response_json = response.json()
-
-        return response_json['access_token'], response_json['expires_in']
+    def modify_kwargs_for_retry(self, kwargs: dict) -> dict:
+        # the token of the first attempt may have expired during the backoff
+        headers = kwargs.get('headers')
+        if headers is not None and 'authorization' in headers:
+            headers['authorization'] = f'Bearer {self.get_oauth_token()}'
+        return kwargs
 
 
 class SingletonJWTRequester(JWTRequester):
@@ -0,0 +1,26 @@
+from requests import Response
+
+from API.AbstractRequester import AbstractRequester
+
+
+class PrefixedRequester:
+    """Lightweight view on a shared requester: every client gets its own base path prefix, while the session,
+    connection pool and authentication token of the shared requester are reused."""
+    def __init__(self, requester: AbstractRequester, first_part_url: str = ''):
+        self.requester = requester
+        self.first_part_url = first_part_url
+
+    def get(self, url: str = '', **kwargs) -> Response:
+        return self.requester.get(url=self.first_part_url + url, **kwargs)
+
+    def post(self, url: str = '', **kwargs) -> Response:
+        return self.requester.post(url=self.first_part_url + url, **kwargs)
+
+    def put(self, url: str = '', **kwargs) -> Response:
+        return self.requester.put(url=self.first_part_url + url, **kwargs)
+
+    def patch(self, url: str = '', **kwargs) -> Response:
+        return self.requester.patch(url=self.first_part_url + url, **kwargs)
+
+    def delete(self, url: str = '', **kwargs) -> Response:
+        return self.requester.delete(url=self.first_part_url + url, **kwargs)
@@ -1,6 +1,12 @@
+from pathlib import Path
+
 from API.AbstractRequester import AbstractRequester
+from API.Cassette import Cassette
 from API.CertRequester import CertRequester
 from API.JWTRequester import JWTRequester
+from API.RetryPolicy import RetryPolicy
+from API.TokenBucket import TokenBucket
+from API.TokenCache import TokenCache
 from Domain.Enums import Environment, AuthType
 
 
@@ -13,7 +19,8 @@ class RequesterFactory:
     }
     
     @classmethod
-    def create_requester(cls, settings: dict, auth_type: AuthType, env: Environment) -> AbstractRequester:
+    def create_requester(cls, settings: dict, auth_type: AuthType, env: Environment, pool_size: int = None,
+                         keep_alive: bool = None) -> AbstractRequester:
         try:
             specific_settings = settings['authentication'][auth_type.name][env.name.lower()]
         except KeyError as e:
@@ -24,13 +31,42 @@ class RequesterFactory:
         except KeyError as exc:
             raise ValueError(f"Invalid environment: {env}") from exc
 
+        # optional connection settings, shared by all clients that use this requester
+        requester_settings = settings.get('requester', {})
+        if pool_size is None:
+            pool_size = requester_settings.get('pool_size', 10)
+        if keep_alive is None:
+            keep_alive = requester_settings.get('keep_alive', True)
+        retry_policy = RetryPolicy(max_retries=requester_settings.get('max_retries', 3),
+                                   backoff_factor=requester_settings.get('backoff_factor', 1.0),
+                                   max_backoff=requester_settings.get('max_backoff', 60.0))
+        # requests per second, no limit when it is not set
+        rate_limit = requester_settings.get('rate_limit')
+        rate_limiter = None if rate_limit is None else TokenBucket(
+            rate=rate_limit, capacity=requester_settings.get('rate_limit_burst', 1))
+
+        # base_url points the requester at another server, f.e. a local StubEMInfraServer
+        first_part_url = requester_settings.get('base_url') or first_part_url
+
         if auth_type == AuthType.JWT:
-            return JWTRequester(private_key_path=specific_settings['key_path'], 
-                                client_id=specific_settings['client_id'],
-                                first_part_url=first_part_url)
+            # the access token is kept in the token cache (if set) for the next runs, per client and environment
+            token_cache_path = requester_settings.get('token_cache_path')
+            token_cache = None if token_cache_path is None else TokenCache(Path(token_cache_path).expanduser())
+            requester = JWTRequester(private_key_path=specific_settings['key_path'],
+                                     client_id=specific_settings['client_id'],
+                                     first_part_url=first_part_url, pool_size=pool_size, keep_alive=keep_alive,
+                                     retry_policy=retry_policy, rate_limiter=rate_limiter, token_cache=token_cache,
+                                     token_cache_key=f"{specific_settings['client_id']}/{env.name.lower()}")
         elif auth_type == AuthType.CERT:
-            return CertRequester(cert_path=specific_settings['cert_path'],
-                                 key_path=specific_settings['key_path'],
-                                 first_part_url=first_part_url)
+            requester = CertRequester(cert_path=specific_settings['cert_path'],
+                                      key_path=specific_settings['key_path'],
+                                      first_part_url=first_part_url, pool_size=pool_size, keep_alive=keep_alive,
+                                      retry_policy=retry_policy, rate_limiter=rate_limiter)
         else:
             raise ValueError(f"Invalid authentication type: {auth_type}")
+
+        # record mode: the requests and responses are appended to the cassette, to replay them offline
+        cassette_path = requester_settings.get('record_cassette_path')
+        if cassette_path is not None:
+            requester.cassette = Cassette(cassette_path=Path(cassette_path).expanduser())
+        return requester
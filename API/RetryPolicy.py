@@ -0,0 +1,47 @@
+import datetime
+import random
+from email.utils import parsedate_to_datetime
+
+from requests import Response
+
+
+class RetryPolicy:
+    # exponential backoff with full jitter, a Retry-After header of the server takes precedence
+    idempotent_methods = frozenset({'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'})
+
+    def __init__(self, max_retries: int = 3, backoff_factor: float = 1.0, max_backoff: float = 60.0,
+                 retry_statuses: frozenset[int] = frozenset({429, 500, 502, 503, 504}), max_retry_after: float = 300.0):
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.retry_statuses = retry_statuses
+        self.max_retry_after = max_retry_after
+
+    def should_retry(self, attempt: int, response: Response | None = None) -> bool:
+        # attempt counts the retries done so far, without a response the request failed on the connection
+        if attempt >= self.max_retries:
+            return False
+        return response is None or response.status_code in self.retry_statuses
+
+    def get_delay(self, attempt: int, response: Response | None = None) -> float:
+        retry_after = self.get_retry_after(response)
+        if retry_after is not None:
+            return min(retry_after, self.max_retry_after)
+        return random.uniform(0, min(self.max_backoff, self.backoff_factor * 2 ** attempt))
+
+    @classmethod
+    def get_retry_after(cls, response: Response | None) -> float | None:
+        # Retry-After is either a number of seconds or an HTTP date
+        if response is None or 'Retry-After' not in response.headers:
+            return None
+        retry_after = response.headers['Retry-After'].strip()
+        if retry_after.isdigit():
+            return float(retry_after)
+        try:
+            retry_at = parsedate_to_datetime(retry_after)
+        except (TypeError, ValueError):
+            return None
+        if retry_at.tzinfo is None:
+            # a date with -0000 as zone parses to a naive datetime, HTTP dates are in UTC
+            retry_at = retry_at.replace(tzinfo=datetime.UTC)
+        return max(0.0, (retry_at - datetime.datetime.now(datetime.UTC)).total_seconds())
@@ -0,0 +1,25 @@
+import time
+from threading import Lock
+
+
+class TokenBucket:
+    # rate limiter shared by all threads using a requester: <rate> requests per second with bursts of <capacity>
+    def __init__(self, rate: float, capacity: int = 1):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated_at = time.monotonic()
+        self.lock = Lock()
+
+    def acquire(self) -> float:
+        # takes a token, a caller that has to wait reserves its token first (the count goes below 0) so the waiting
+        # callers are served in order; returns the time waited
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+            self.updated_at = now
+            self.tokens -= 1
+            wait = 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+        if wait > 0:
+            time.sleep(wait)
+        return wait
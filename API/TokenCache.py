@@ -0,0 +1,58 @@
+import json
+import logging
+import os
+import stat
+import time
+from pathlib import Path
+
+
+class TokenCache:
+    # access tokens and their expiry (epoch seconds) per key (client_id and environment) in a json file that only the
+    # user can read, so a new process can use the token of the previous run; a file others can read is not trusted
+    def __init__(self, cache_path: Path):
+        self.cache_path = cache_path
+
+    def read_entries(self) -> dict:
+        try:
+            file_stat = os.stat(self.cache_path)
+        except FileNotFoundError:
+            return {}
+        if os.name == 'posix' and file_stat.st_mode & (stat.S_IRWXG | stat.S_IRWXO):
+            logging.warning(f'Not using the token cache {self.cache_path}: it can be read by other users.')
+            return {}
+        try:
+            with open(self.cache_path) as cache_file:
+                entries = json.load(cache_file)
+        except (OSError, ValueError) as exception:
+            logging.warning(f'Could not read the token cache {self.cache_path}: {exception}')
+            return {}
+        return entries if isinstance(entries, dict) else {}
+
+    def load(self, key: str) -> tuple[str, float] | None:
+        # the token and its expiry, None when there is no token for the key or it has expired
+        entry = self.read_entries().get(key)
+        if not isinstance(entry, dict) or 'access_token' not in entry or entry.get('expires_at', 0) <= time.time():
+            return None
+        return entry['access_token'], entry['expires_at']
+
+    def save(self, key: str, access_token: str, expires_at: float) -> None:
+        # the other keys are kept, the expired tokens are dropped; written to a private temporary file that replaces
+        # the cache in one step, so a process never reads half a file
+        now = time.time()
+        entries = {other_key: entry for other_key, entry in self.read_entries().items()
+                   if isinstance(entry, dict) and entry.get('expires_at', 0) > now}
+        entries[key] = {'access_token': access_token, 'expires_at': expires_at}
+
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        temporary_path = self.cache_path.with_name(f'{self.cache_path.name}.{os.getpid()}.tmp')
+        file_descriptor = os.open(temporary_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        try:
+            if os.name == 'posix':
+                # a temporary file left by an earlier run keeps its mode
+                os.fchmod(file_descriptor, 0o600)
+            with os.fdopen(file_descriptor, 'w') as cache_file:
+                json.dump(entries, cache_file)
+            os.replace(temporary_path, self.cache_path)
+        except BaseException:
+            temporary_path.unlink(missing_ok=True)
+            raise
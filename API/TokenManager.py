@@ -0,0 +1,172 @@
+import datetime
+import json
+import logging
+import string
+import time
+from pathlib import Path
+from random import choice
+from threading import Condition, Timer
+
+import jwt  # pip install pyjwt and cryptography
+import jwt.algorithms as jwt_algo
+import requests
+
+from API.TokenCache import TokenCache
+
+
+class TokenManager:
+    # the OAuth access token of a client, shared by all threads of a requester: the private key is parsed once, a
+    # background timer refreshes the token <refresh_margin> seconds before it expires and callers that need a token
+    # while it is refreshed wait on that one refresh instead of requesting their own
+    token_url = 'https://authenticatie.vlaanderen.be/op/v1/token'
+    audience = 'https://authenticatie.vlaanderen.be/op'
+    # the background timer never fires sooner than this, whatever the token lifetime
+    min_refresh_delay = 1.0
+
+    def __init__(self, private_key_path: Path, client_id: str, expiry_margin: float = 60.0,
+                 refresh_margin: float = 60.0, token_cache: TokenCache | None = None, cache_key: str | None = None):
+        self.private_key_path = private_key_path
+        self.client_id = client_id
+        # with a token cache, the first call uses the token of a previous process when it is still valid
+        self.token_cache = token_cache
+        self.cache_key = cache_key if cache_key is not None else client_id
+        self.cache_checked = token_cache is None
+        # the token is not used anymore <expiry_margin> seconds before it expires
+        self.expiry_margin = expiry_margin
+        self.refresh_margin = refresh_margin
+        self.key = None
+
+        self.access_token: str = ''
+        self.expires_at: float = 0.0  # time.monotonic()
+        self.condition = Condition()
+        self.refreshing = False
+        self.refresh_error: Exception | None = None
+        self.refresh_timer: Timer | None = None
+        self.closed = False
+
+    def is_valid(self) -> bool:
+        return self.access_token != '' and time.monotonic() < self.expires_at
+
+    def get_token(self) -> str:
+        with self.condition:
+            if self.is_valid():
+                return self.access_token
+            if not self.cache_checked:
+                self.cache_checked = True
+                if self.load_cached_token():
+                    return self.access_token
+            if self.refreshing:
+                self.condition.wait_for(lambda: not self.refreshing)
+                if self.is_valid():
+                    return self.access_token
+                raise RuntimeError('Could not refresh the access token.') from self.refresh_error
+            self.refreshing = True
+        return self.refresh()
+
+    def refresh(self) -> str:
+        # only called by the caller that set refreshing
+        requested_at = time.monotonic()
+        requested_at_epoch = time.time()
+        try:
+            access_token, expires_in = self.get_access_token(self.generate_authentication_token())
+        except Exception as exception:
+            with self.condition:
+                self.refreshing = False
+                self.refresh_error = exception
+                self.condition.notify_all()
+            raise
+
+        # the margins take at most a quarter of the lifetime each, so a short-lived token is still used for half of it
+        expiry_margin = min(self.expiry_margin, expires_in / 4)
+        refresh_margin = min(self.refresh_margin, expires_in / 4)
+        with self.condition:
+            self.access_token = access_token
+            self.expires_at = requested_at + expires_in - expiry_margin
+            self.refreshing = False
+            self.refresh_error = None
+            self.condition.notify_all()
+            self.schedule_refresh(delay=self.expires_at - refresh_margin - time.monotonic())
+        if self.token_cache is not None:
+            try:
+                self.token_cache.save(key=self.cache_key, access_token=access_token,
+                                      expires_at=requested_at_epoch + expires_in)
+            except OSError as exception:
+                logging.warning(f'Could not save the access token in the token cache: {exception}')
+        return access_token
+
+    def load_cached_token(self) -> bool:
+        # called holding the condition; the expiry in the cache is wall clock time
+        cached_token = self.token_cache.load(key=self.cache_key)
+        if cached_token is None:
+            return False
+        access_token, expires_at = cached_token
+        expires_in = expires_at - time.time()
+        if expires_in <= self.expiry_margin:
+            return False
+        self.access_token = access_token
+        self.expires_at = time.monotonic() + expires_in - self.expiry_margin
+        self.schedule_refresh(delay=self.expires_at - self.refresh_margin - time.monotonic())
+        return True
+
+    def schedule_refresh(self, delay: float) -> None:
+        if self.closed:
+            return
+        if self.refresh_timer is not None:
+            self.refresh_timer.cancel()
+        self.refresh_timer = Timer(max(self.min_refresh_delay, delay), self.refresh_in_background)
+        self.refresh_timer.daemon = True
+        self.refresh_timer.start()
+
+    def refresh_in_background(self) -> None:
+        with self.condition:
+            if self.refreshing or self.closed:
+                return
+            self.refreshing = True
+        try:
+            self.refresh()
+        except Exception as exception:
+            # the current token stays in use, the first caller after it expires tries again
+            logging.warning(f'Could not refresh the access token in the background: {exception}')
+
+    def close(self) -> None:
+        with self.condition:
+            self.closed = True
+            if self.refresh_timer is not None:
+                self.refresh_timer.cancel()
+
+    def get_key(self):
+        if self.key is None:
+            with open(self.private_key_path) as private_key:
+                self.key = jwt_algo.RSAAlgorithm.from_jwk(json.load(private_key))
+        return self.key
+
+    def generate_authentication_token(self) -> str:
+        issued_at = datetime.datetime.now(datetime.UTC)
+        payload = {'iss': self.client_id,
+                   'sub': self.client_id,
+                   'aud': self.audience,
+                   'exp': issued_at + datetime.timedelta(minutes=9),
+                   'jti': ''.join(choice(string.ascii_lowercase) for _ in range(20))
+                   }
+        return jwt.encode(payload=payload, key=self.get_key(), algorithm='RS256')
+
+    def get_access_token(self, token: str) -> (str, int):
+        headers = {'Content-Type': 'application/x-www-form-urlencoded'}
+        request_body = {
+            'grant_type': 'client_credentials',
+            'scope': 'awv_toep_services',
+            'client_assertion_type': 'urn:ietf:params:oauth:client-assertion-type:jwt-bearer',
+            'client_id': self.client_id,
+            "client_assertion": token
+        }
+
+        response = requests.post(self.token_url, data=request_body, headers=headers)
+
+        # Check for HTTP codes other than 200
+        if response.status_code != 200:
+            print('Status:', response.status_code, 'Headers:', response.headers, 'Error Response:', response.content)
+            raise RuntimeError(f'Could not get the acces token: {response.content}')
+
+        response_json = response.json()
+
+        return response_json['access_token'], response_json['expires_in']
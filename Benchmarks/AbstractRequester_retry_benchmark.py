@@ -0,0 +1,52 @@
+import argparse
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from API.CertRequester import CertRequester
+from API.RetryPolicy import RetryPolicy
+from API.TokenBucket import TokenBucket
+from TestSupport.StubEMInfraServer import StubEMInfraServer, SyntheticEMInfraData
+
+
+def run(server: StubEMInfraServer, key_dir: Path, request_count: int, workers: int, retry_policy: RetryPolicy,
+        rate_limiter: TokenBucket | None) -> (int, int, float):
+    requester = CertRequester(cert_path=key_dir / 'cert.crt', key_path=key_dir / 'cert.key',
+                              first_part_url=server.url, pool_size=workers, retry_policy=retry_policy,
+                              rate_limiter=rate_limiter)
+    context_uuids = [event_context['uuid'] for event_context in server.data.event_contexts]
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        status_codes = list(executor.map(
+            lambda index: requester.get(
+                url=f'eminfra/core/api/eventcontexts/{context_uuids[index % len(context_uuids)]}').status_code,
+            range(request_count)))
+    elapsed = time.perf_counter() - start
+    requester.close()
+    return status_codes.count(200), request_count, elapsed
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--requests', type=int, default=400)
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--rate', type=float, default=100, help='requests per second the server accepts')
+    parser.add_argument('--error_rate', type=float, default=0.05, help='fraction of requests answered with 503')
+    args = parser.parse_args()
+
+    # answers 429 (with Retry-After) above <rate> requests per second and 503 on a fraction <error_rate> of the others
+    server = StubEMInfraServer(data=SyntheticEMInfraData(lichtpunt_count=0), throttle_rate=args.rate,
+                               error_rate=args.error_rate)
+    with tempfile.TemporaryDirectory() as key_dir, server:
+        (Path(key_dir) / 'cert.crt').touch()
+        (Path(key_dir) / 'cert.key').touch()
+        for name, retry_policy, rate_limiter in [
+                ('no retries', RetryPolicy(max_retries=0), None),
+                ('retries', RetryPolicy(max_retries=5, backoff_factor=0.05), None),
+                ('retries + rate limit', RetryPolicy(max_retries=5, backoff_factor=0.05),
+                 TokenBucket(rate=args.rate * 0.9))]:
+            succeeded, total, elapsed = run(server, Path(key_dir), args.requests, args.workers, retry_policy,
+                                            rate_limiter)
+            print(f'{name:>20}: {succeeded}/{total} succeeded in {elapsed:.2f}s '
+                  f'({succeeded / elapsed:.0f} successful requests/s)')
@@ -0,0 +1,81 @@
+import argparse
+import tracemalloc
+
+from Domain.AssetCollection import AssetCollection
+from Domain.AttributeProjection import report_attribute_projection
+
+
+def create_lichtpunt_dicts(amount: int) -> ([dict], [dict]):
+    # every lichtpunt is a mast with a toestel, linked with a Bevestiging relation
+    nodes, relations = [], []
+    for index in range(amount):
+        mast_uuid = f'00000000-0000-0000-0000-{index:012}'
+        toestel_uuid = f'00000000-0000-0000-0001-{index:012}'
+        nodes.append({'uuid': mast_uuid, 'AIMNaamObject.naam': f'WW0001.A{index}',
+                      'typeURI': 'https://wegenenverkeer.data.vlaanderen.be/ns/onderdeel#WVLichtmast'})
+        nodes.append({'uuid': toestel_uuid, 'AIMNaamObject.naam': f'WW0001.A{index}.WV1',
+                      'typeURI': 'https://wegenenverkeer.data.vlaanderen.be/ns/onderdeel#VerlichtingstoestelLED'})
+        relations.append({'uuid': f'{toestel_uuid[24:]}-Bevestigin-{mast_uuid[24:]}', 'bron': toestel_uuid,
+                          'doel': mast_uuid,
+                          'typeURI': 'https://wegenenverkeer.data.vlaanderen.be/ns/onderdeel#Bevestiging'})
+    return nodes, relations
+
+
+def measure(amount: int) -> (float, float):
+    # the attribute dicts are created up front, so only the memory of the collection itself is measured
+    nodes, relations = create_lichtpunt_dicts(amount)
+    collection = AssetCollection()
+
+    tracemalloc.start()
+    for node in nodes:
+        collection.add_node(node)
+    memory_nodes = tracemalloc.get_traced_memory()[0]
+    for relation in relations:
+        collection.add_relation(relation)
+    memory_total = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    return memory_nodes / len(nodes), (memory_total - memory_nodes) / len(relations)
+
+
+def create_full_toestel_dict(index: int) -> dict:
+    # shaped like an asset from the search endpoint: a few report attributes and nested blocks the reports never read
+    return {
+        'uuid': f'00000000-0000-0000-0001-{index:012}', 'AIMNaamObject.naam': f'WW0001.A{index}.WV1',
+        'typeURI': 'https://wegenenverkeer.data.vlaanderen.be/ns/onderdeel#VerlichtingstoestelLED',
+        'AIMDBStatus.isActief': True, 'AIMToestand.toestand': 'https://wegenenverkeer.data.vlaanderen.be/id/concept/'
+                                                              'KlAIMToestand/in-gebruik',
+        'Verlichtingstoestel.systeemvermogen': 50, 'AIMObject.notitie': f'notitie {index}',
+        'geo:Geometrie.log': [{'geo:DtcLog.niveau': f'https://geo.data.wegenenverkeer.be/id/concept/KlLogNiveau/{n}',
+                               'geo:DtcLog.geometrie': {'geo:DtuGeometrie.punt': f'POINT Z (1{index}.0 2{n}.0 0)'},
+                               'geo:DtcLog.bron': 'https://geo.data.wegenenverkeer.be/id/concept/KlLogBron/meettoestel'}
+                              for n in range(-1, 3)],
+        'tz:Toezicht.toezichter': {'tz:DtcToezichter.gebruikersnaam': 'toezichter', 'tz:DtcToezichter.email': 'a@b.c'},
+        'tz:Schadebeheerder.schadebeheerder': {'tz:DtcBeheerder.naam': 'beheerder', 'tz:DtcBeheerder.referentie': 'X'},
+        'loc:Locatie.omschrijving': f'lichtpunt {index}',
+        'loc:Locatie.puntlocatie': {'loc:3Dpunt.puntgeometrie': {'loc:DtcCoord.lambert72': {
+            'loc:DtcCoordLambert72.xcoordinaat': 100000.0 + index, 'loc:DtcCoordLambert72.ycoordinaat': 200000.0}}},
+    }
+
+
+def measure_attributes(amount: int, attribute_projection: dict[str, frozenset[str]] | None) -> float:
+    # here the attribute dicts are created while measuring and only the collection keeps a reference to them
+    collection = AssetCollection(attribute_projection=attribute_projection)
+    tracemalloc.start()
+    for index in range(amount):
+        collection.add_node(create_full_toestel_dict(index))
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return memory / amount
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--amount', type=int, default=100000, help='amount of lichtpunten (2 nodes and 1 edge each)')
+    args = parser.parse_args()
+
+    bytes_per_node, bytes_per_edge = measure(args.amount)
+    print(f'{bytes_per_node:8.1f} bytes per node, {bytes_per_edge:8.1f} bytes per edge (relation included)')
+    print(f'{measure_attributes(args.amount, None):8.1f} bytes per node with all attributes, '
+          f'{measure_attributes(args.amount, report_attribute_projection):8.1f} bytes per node with the report '
+          f'attribute projection')
@@ -0,0 +1,29 @@
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from Benchmarks.AssetCollection_traversal_benchmark import create_collection
+from Domain.AssetCollection import AssetCollection
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--amount', type=int, default=100000, help='amount of lichtpunten')
+    args = parser.parse_args()
+
+    collection = create_collection(amount=args.amount, kast_degree=200)
+    with tempfile.TemporaryDirectory() as temp_dir:
+        snapshot_path = Path(temp_dir) / 'snapshot.pkl'
+
+        start = time.perf_counter()
+        collection.save_snapshot(snapshot_path)
+        save_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        loaded = AssetCollection.load_snapshot(snapshot_path)
+        load_time = time.perf_counter() - start
+
+        assert loaded.short_uri_dict == collection.short_uri_dict
+        assert len(loaded.object_dict) == len(collection.object_dict)
+        print(f'{len(collection.object_dict)} objects: save {save_time:.3f}s, load {load_time:.3f}s, '
+              f'{snapshot_path.stat().st_size / 1024 / 1024:.1f} MiB')
@@ -0,0 +1,61 @@
+import argparse
+import time
+
+from Domain.AssetCollection import AssetCollection
+from Domain.Enums import Direction
+
+
+def create_collection(amount: int, kast_degree: int) -> AssetCollection:
+    # lichtpunten (mast with a toestel) and montagekasten that each feed <kast_degree> masten
+    collection = AssetCollection()
+    base_uri = 'https://wegenenverkeer.data.vlaanderen.be/ns/onderdeel#'
+    for index in range(amount):
+        collection.add_node({'uuid': f'mast-{index}', 'typeURI': f'{base_uri}WVLichtmast'})
+        collection.add_node({'uuid': f'toestel-{index}', 'typeURI': f'{base_uri}VerlichtingstoestelLED'})
+        collection.add_relation({'uuid': f'bevestiging-{index}', 'bron': f'toestel-{index}', 'doel': f'mast-{index}',
+                                 'typeURI': f'{base_uri}Bevestiging'})
+        kast_uuid = f'kast-{index // kast_degree}'
+        if index % kast_degree == 0:
+            collection.add_node({'uuid': kast_uuid, 'typeURI': f'{base_uri}Montagekast'})
+        collection.add_relation({'uuid': f'voedt-{index}', 'bron': kast_uuid, 'doel': f'mast-{index}',
+                                 'typeURI': f'{base_uri}Voedt'})
+        collection.add_relation({'uuid': f'sturing-{index}', 'bron': kast_uuid, 'doel': f'toestel-{index}',
+                                 'typeURI': f'{base_uri}Sturing'})
+    return collection
+
+
+def time_traversals(collection: AssetCollection, start_uuids: [str], repeat: int = 5, **filters) -> float:
+    # best of <repeat> runs
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for start_uuid in start_uuids:
+            if hasattr(collection, 'get_neighbours'):
+                collection.get_neighbours(start_uuid=start_uuid, **filters)
+            else:
+                # before the adjacency index
+                list(collection.traverse_graph(
+                    start_uuid=start_uuid, return_type='info_object', relation_types=filters.get('relation_types'),
+                    allowed_directions=filters.get('directions'), filtered_node_types=filters.get('node_types')))
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--amount', type=int, default=100000, help='amount of lichtpunten')
+    parser.add_argument('--kast_degree', type=int, default=200, help='amount of lichtpunten per montagekast')
+    args = parser.parse_args()
+
+    collection = create_collection(amount=args.amount, kast_degree=args.kast_degree)
+    toestel_uuids = [f'toestel-{index}' for index in range(args.amount)]
+    kast_uuids = [f'kast-{index}' for index in range(args.amount // args.kast_degree)]
+
+    print(f'toestel > drager ({len(toestel_uuids)} traversals): ' + str(round(time_traversals(
+        collection, toestel_uuids, relation_types=['Bevestiging'], directions=[Direction.NONE],
+        node_types=['onderdeel#WVLichtmast', 'onderdeel#WVConsole']), 3)) + 's')
+    print(f'toestel > anything ({len(toestel_uuids)} traversals): ' + str(round(time_traversals(
+        collection, toestel_uuids), 3)) + 's')
+    print(f'kast > gevoede masten, skipping the Sturing edges ({len(kast_uuids)} traversals): ' + str(round(
+        time_traversals(collection, kast_uuids, relation_types=['Voedt', 'Sturing'],
+                        directions=[Direction.WITH], node_types=['onderdeel#WVLichtmast']), 3)) + 's')
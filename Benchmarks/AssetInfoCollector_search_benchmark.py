@@ -0,0 +1,44 @@
+import argparse
+import time
+from unittest.mock import Mock
+
+from Domain.AssetInfoCollector import AssetInfoCollector
+
+
+def create_fake_search(latency: float, time_per_asset: float):
+    # every page costs the server <latency> plus <time_per_asset> per asset in the page; the pages of one search
+    # follow each other, different searches run side by side
+    def search(resource: str, cursor: str | None = None, size: int = 100, filter_dict: dict = None):
+        uuids = filter_dict['uuid']
+        for start in range(0, len(uuids), size):
+            page_uuids = uuids[start:start + size]
+            time.sleep(latency + time_per_asset * len(page_uuids))
+            yield from ({'@id': f'https://data.awvvlaanderen.be/id/asset/{uuid}-bGdjOmluc3RhbGxhdGllI0thc3Q',
+                         '@type': 'https://wegenenverkeer.data.vlaanderen.be/ns/onderdeel#WVLichtmast'}
+                        for uuid in page_uuids)
+    return search
+
+
+def collect(uuids: [str], latency: float, time_per_asset: float, **search_settings) -> float:
+    collector = AssetInfoCollector(em_infra_rest_client=Mock(), emson_importer=Mock(), **search_settings)
+    collector.em_infra_importer.get_objects_from_oslo_search_endpoint_using_iterator = create_fake_search(
+        latency=latency, time_per_asset=time_per_asset)
+    start = time.perf_counter()
+    collector.collect_asset_info(uuids=uuids)
+    assert len(collector.collection.object_dict) == len(uuids)
+    return time.perf_counter() - start
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--amount', type=int, default=10000, help='amount of uuids in one search')
+    parser.add_argument('--latency', type=float, default=0.05, help='seconds per page')
+    parser.add_argument('--time_per_asset', type=float, default=0.0001, help='seconds per asset in a page')
+    args = parser.parse_args()
+
+    uuids = [f'00000000-0000-0000-0000-{index:012}' for index in range(args.amount)]
+    for search_settings in [{}, {'search_page_size': 500},
+                            {'search_max_workers': 4, 'search_chunk_size': 1000, 'search_page_size': 500},
+                            {'search_max_workers': 8, 'search_chunk_size': 1000, 'search_page_size': 500}]:
+        search_time = collect(uuids, latency=args.latency, time_per_asset=args.time_per_asset, **search_settings)
+        print(f'{str(search_settings):<85}: {search_time:6.2f}s')
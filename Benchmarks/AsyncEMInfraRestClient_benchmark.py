@@ -0,0 +1,53 @@
+import argparse
+import tempfile
+import time
+from pathlib import Path
+from unittest.mock import Mock
+
+from API.AsyncEMInfraRestClient import AsyncEMInfraRestClient
+from API.AsyncRequester import AsyncRequester
+from API.CertRequester import CertRequester
+from API.EMInfraRestClient import EMInfraRestClient
+from API.EMsonImporter import EMsonImporter
+from API.PrefixedRequester import PrefixedRequester
+from Domain.AssetInfoCollector import AssetInfoCollector
+from TestSupport.StubEMInfraServer import StubEMInfraServer, SyntheticEMInfraData
+
+
+def search(collector: AssetInfoCollector, uuids: [str]) -> (int, float):
+    start = time.perf_counter()
+    relations = list(collector.get_assetrelaties_by_source_or_target_uuids(uuids=uuids))
+    return len(relations), time.perf_counter() - start
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--searches', type=int, default=400, help='amount of chunk searches')
+    parser.add_argument('--chunk_size', type=int, default=5)
+    parser.add_argument('--latency', type=float, default=0.05, help='seconds the server takes for a search')
+    args = parser.parse_args()
+
+    data = SyntheticEMInfraData(lichtpunt_count=args.searches * args.chunk_size)
+    uuids = [uuid for uuid in data.assets if uuid[19:23] == '0001']
+    with tempfile.TemporaryDirectory() as key_dir, StubEMInfraServer(data=data, latency=args.latency) as server:
+        (Path(key_dir) / 'cert.crt').touch()
+        (Path(key_dir) / 'cert.key').touch()
+        requester = CertRequester(cert_path=Path(key_dir) / 'cert.crt', key_path=Path(key_dir) / 'cert.key',
+                                  first_part_url=server.url, pool_size=200)
+        client = EMInfraRestClient(PrefixedRequester(requester))
+
+        for search_max_workers in [8, 32, 200]:
+            collector = AssetInfoCollector(em_infra_rest_client=client, emson_importer=Mock(spec=EMsonImporter),
+                                           search_max_workers=search_max_workers, search_chunk_size=args.chunk_size)
+            count, elapsed = search(collector, uuids)
+            print(f'{search_max_workers:>3} search threads: {count} relations in {elapsed:.2f}s')
+
+        for max_concurrency in [32, 200]:
+            async_requester = AsyncRequester(PrefixedRequester(requester), max_concurrency=max_concurrency)
+            collector = AssetInfoCollector(em_infra_rest_client=client, emson_importer=Mock(spec=EMsonImporter),
+                                           search_chunk_size=args.chunk_size,
+                                           async_em_infra_client=AsyncEMInfraRestClient(async_requester))
+            count, elapsed = search(collector, uuids)
+            print(f'{max_concurrency:>3} async in flight: {count} relations in {elapsed:.2f}s')
+            async_requester.close()
+        requester.close()
@@ -0,0 +1,54 @@
+import argparse
+import io
+import json
+import time
+from unittest.mock import Mock
+
+from requests import Response
+
+from API.AbstractRequester import AbstractRequester
+from API.EMInfraRestClient import EMInfraRestClient
+from Benchmarks.AssetCollection_memory_benchmark import create_full_toestel_dict
+from Domain.AssetCollection import AssetCollection
+
+
+def create_fake_requester(page_count: int, page_size: int, latency: float) -> AbstractRequester:
+    # every page takes <latency> seconds before its headers arrive, like the search endpoint under load
+    body = json.dumps({'@graph': [create_full_toestel_dict(index) for index in range(page_size)]}).encode()
+
+    def post(url: str, json: dict, stream: bool = False, **kwargs) -> Response:
+        time.sleep(latency)
+        page = 0 if json['fromCursor'] is None else int(json['fromCursor'])
+        response = Response()
+        response.status_code = 200
+        response.raw = io.BytesIO(body.replace(b'"uuid": "', f'"uuid": "{page}-'.encode()))
+        if page < page_count - 1:
+            response.headers['em-paging-next-cursor'] = str(page + 1)
+        return response
+
+    fake_requester = Mock(spec=AbstractRequester)
+    fake_requester.first_part_url = ''
+    fake_requester.post = post
+    return fake_requester
+
+
+def collect(client: EMInfraRestClient, prefetch_page_count: int) -> float:
+    collection = AssetCollection()
+    start = time.perf_counter()
+    for asset in client.get_objects_from_oslo_search_endpoint_using_iterator(
+            resource='assets', prefetch_page_count=prefetch_page_count):
+        collection.add_node(asset)
+    return time.perf_counter() - start
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--pages', type=int, default=20)
+    parser.add_argument('--size', type=int, default=1000, help='amount of assets in a page')
+    parser.add_argument('--latency', type=float, default=0.1, help='seconds before a page starts arriving')
+    args = parser.parse_args()
+
+    client = EMInfraRestClient(requester=create_fake_requester(args.pages, args.size, args.latency))
+    for prefetch_page_count in [0, 1, 2]:
+        print(f'prefetch {prefetch_page_count}: {args.pages} pages of {args.size} assets in '
+              f'{collect(client, prefetch_page_count):.2f}s')
@@ -0,0 +1,54 @@
+import argparse
+import io
+import json
+import time
+import tracemalloc
+
+from requests import Response
+
+from API.GraphStreamParser import GraphStreamParser
+from Benchmarks.AssetCollection_memory_benchmark import create_full_toestel_dict
+
+
+def create_response(body: bytes) -> Response:
+    response = Response()
+    response.status_code = 200
+    response.raw = io.BytesIO(body)
+    return response
+
+
+def parse_whole_page(response: Response):
+    # before: the bytes, the decoded string and the parsed page are held at once
+    yield from json.loads(response.content.decode())['@graph']
+
+
+def parse_streaming(response: Response):
+    yield from GraphStreamParser(response.iter_content(chunk_size=64 * 1024)).iterate_items()
+
+
+def measure(parse_function, body: bytes) -> (float, float, float):
+    # every asset is dropped after it is handled, like add_node does with the parts the projection leaves out
+    response = create_response(body)
+    tracemalloc.start()
+    start = time.perf_counter()
+    first_item_time = None
+    for _ in parse_function(response):
+        if first_item_time is None:
+            first_item_time = time.perf_counter() - start
+    total_time = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return first_item_time, total_time, peak / 1024 / 1024
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--size', type=int, default=1000, help='amount of assets in a page')
+    args = parser.parse_args()
+
+    body = json.dumps({'@graph': [create_full_toestel_dict(index) for index in range(args.size)]}).encode()
+    print(f'page of {args.size} assets, {len(body) / 1024 / 1024:.1f} MiB')
+    for description, parse_function in [('json.loads', parse_whole_page), ('streaming', parse_streaming)]:
+        first_item_time, total_time, peak = measure(parse_function, body)
+        print(f'{description:>10}: first asset after {first_item_time * 1000:7.2f}ms, page {total_time * 1000:7.1f}ms, '
+              f'peak memory {peak:6.2f} MiB')
@@ -0,0 +1,65 @@
+import argparse
+import gc
+import multiprocessing
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from Benchmarks.AssetCollection_traversal_benchmark import create_collection
+from Domain.AssetCollection import AssetCollection
+from Domain.Enums import Direction
+from Domain.MappedAssetCollection import MappedAssetCollection
+
+worker_collection: AssetCollection | MappedAssetCollection | None = None
+
+
+def init_worker(collection: AssetCollection | MappedAssetCollection) -> None:
+    global worker_collection
+    worker_collection = collection
+
+
+def traverse_in_worker(indices: range) -> (float, float):
+    # every worker visits its share of the lichtpunten, like the reports of its installaties, and reports the memory
+    # it did not share with the other processes
+    start = time.perf_counter()
+    for index in indices:
+        for drager in worker_collection.get_neighbours(start_uuid=f'toestel-{index}', relation_types=['Bevestiging'],
+                                                       directions=[Direction.NONE]):
+            drager.attr_dict.get('typeURI')
+    with open('/proc/self/smaps_rollup') as smaps_file:
+        smaps = dict(line.split(':', 1) for line in smaps_file if ':' in line and not line.startswith('0'))
+    return time.perf_counter() - start, int(smaps['Private_Dirty'].split()[0]) / 1024
+
+
+def run_workers(collection: AssetCollection | MappedAssetCollection, amount: int, workers: int) -> [(float, float)]:
+    # forked explicitly (Linux only, like /proc): the in-memory collection is inherited by the workers, it is too
+    # deeply recursive to be pickled for spawned workers
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('fork'),
+                             initializer=init_worker, initargs=(collection,)) as executor:
+        return list(executor.map(traverse_in_worker, [range(worker, amount, workers) for worker in range(workers)]))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--amount', type=int, default=100000, help='amount of lichtpunten')
+    parser.add_argument('--workers', type=int, default=4)
+    args = parser.parse_args()
+
+    collection = create_collection(amount=args.amount, kast_degree=200)
+    with tempfile.TemporaryDirectory() as temp_dir:
+        start = time.perf_counter()
+        MappedAssetCollection.write_graph_image(collection=collection, image_path=Path(temp_dir))
+        print(f'graph image written in {time.perf_counter() - start:.2f}s')
+
+        results = run_workers(collection, amount=args.amount, workers=args.workers)
+        print(f'    in memory: traversal {max(r[0] for r in results):.2f}s, private memory per worker '
+              f'{max(r[1] for r in results):.0f} MiB')
+
+        # the workers are forked, so the in-memory collection is dropped first to not count it twice
+        del collection
+        gc.collect()
+        results = run_workers(MappedAssetCollection(image_path=Path(temp_dir)), amount=args.amount,
+                              workers=args.workers)
+        print(f'memory-mapped: traversal {max(r[0] for r in results):.2f}s, private memory per worker '
+              f'{max(r[1] for r in results):.0f} MiB')
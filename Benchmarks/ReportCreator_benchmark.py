@@ -0,0 +1,53 @@
+import argparse
+import time
+
+from pandas import DataFrame, concat
+from pandas.testing import assert_frame_equal
+
+from Domain.ReportCreator import ReportCreator
+
+all_column_names = [f'kolom_{index}' for index in range(30)]
+
+
+def create_records(amount: int) -> [dict]:
+    # records shaped like those of the sheet builders: list wrapped values, a few optional columns per record
+    records = []
+    for index in range(amount):
+        record = {column_name: [f'{column_name}_{index}'] for column_name in all_column_names}
+        for extra_index in range(index % 4):
+            record[f'LED_toestel_{extra_index + 1}_uuid'] = [f'00000000-0000-0000-0000-{index:012}']
+        records.append(record)
+    return records
+
+
+def create_dataframe_with_concat(records: [dict]) -> DataFrame:
+    df = DataFrame(columns=all_column_names)
+    for record in records:
+        df = concat([df, DataFrame(record)])
+    return df
+
+
+def time_function(function, records: [dict]) -> (float, DataFrame):
+    start = time.perf_counter()
+    df = function(records)
+    return time.perf_counter() - start, df
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--max_concat_amount', type=int, default=10000,
+                        help='skip the (quadratic) concat reference above this amount of assets')
+    args = parser.parse_args()
+
+    for amount in [1000, 10000, 100000]:
+        records = create_records(amount)
+        records_time, records_df = time_function(
+            lambda r: ReportCreator.create_dataframe_from_records(r, all_column_names), records)
+        if amount > args.max_concat_amount:
+            print(f'{amount:>6} assets: records {records_time:8.3f}s, concat skipped')
+            continue
+        concat_time, concat_df = time_function(create_dataframe_with_concat, records)
+        # pandas 3 infers a string dtype for some concatenated columns, the values are the same
+        assert_frame_equal(concat_df, records_df, check_dtype=False)
+        print(f'{amount:>6} assets: records {records_time:8.3f}s, concat {concat_time:8.3f}s, '
+              f'speed-up {concat_time / records_time:6.1f}x')
@@ -0,0 +1,86 @@
+import argparse
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+from unittest.mock import Mock
+
+from API.Cassette import Cassette
+from API.CertRequester import CertRequester
+from API.EMInfraRestClient import EMInfraRestClient
+from API.EMsonImporter import EMsonImporter
+from API.PrefixedRequester import PrefixedRequester
+from TestSupport.StubEMInfraServer import StubEMInfraServer, SyntheticEMInfraData
+from Database.DbManager import DbManager
+from Domain.AssetInfoCollector import AssetInfoCollector
+from Domain.CollectionPatterns import drager_plan
+from Domain.DeliveryFinder import DeliveryFinder
+
+
+def collect(requester: CertRequester, mast_uuids: [str], search_max_workers: int, prefetch_page_count: int
+            ) -> (int, Counter, float):
+    client = EMInfraRestClient(PrefixedRequester(requester), search_prefetch_page_count=prefetch_page_count)
+    collector = AssetInfoCollector(em_infra_rest_client=client, emson_importer=Mock(spec=EMsonImporter),
+                                   search_max_workers=search_max_workers, search_chunk_size=100)
+    statistics = Counter()
+    start = time.perf_counter()
+    collector.start_collecting_from_starting_uuids_using_plan(starting_uuids=mast_uuids, plan=drager_plan,
+                                                              statistics=statistics)
+    return len(collector.collection.object_dict), statistics, time.perf_counter() - start
+
+
+def catch_up_with_feed(requester: CertRequester, state_db_path: Path, prefetch_page_count: int) -> (int, float):
+    delivery_finder = DeliveryFinder(em_infra_client=EMInfraRestClient(PrefixedRequester(requester)),
+                                     davie_client=Mock(), db_manager=DbManager(state_db_path=state_db_path))
+    start = time.perf_counter()
+    events, _, _ = delivery_finder.find_events_with_context(
+        current_feedproxy_event=None, current_feedproxy_page='0', proxy_feed_page=None, batch_page_size=1000,
+        prefetch_page_count=prefetch_page_count)
+    return len(events), time.perf_counter() - start
+
+
+def create_requester(url: str, key_dir: Path, cassette: Cassette | None = None) -> CertRequester:
+    requester = CertRequester(cert_path=key_dir / 'cert.crt', key_path=key_dir / 'cert.key', first_part_url=url,
+                              pool_size=32)
+    requester.cassette = cassette
+    return requester
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--lichtpunten', type=int, default=5000)
+    parser.add_argument('--deliveries', type=int, default=20)
+    parser.add_argument('--latency', type=float, default=0.05, help='seconds every answer of the stub waits')
+    args = parser.parse_args()
+
+    data = SyntheticEMInfraData(lichtpunt_count=args.lichtpunten, delivery_count=args.deliveries)
+    mast_uuids = [uuid for uuid in data.assets if uuid[19:23] == '0001']
+    with tempfile.TemporaryDirectory() as temporary_dir, StubEMInfraServer(data=data, latency=args.latency) as server:
+        temporary_dir = Path(temporary_dir)
+        (temporary_dir / 'cert.crt').touch()
+        (temporary_dir / 'cert.key').touch()
+        requester = create_requester(server.url, temporary_dir)
+
+        for search_max_workers, prefetch_page_count in [(1, 0), (8, 0), (8, 2)]:
+            count, statistics, elapsed = collect(requester, mast_uuids, search_max_workers, prefetch_page_count)
+            print(f'collect {len(mast_uuids)} masts, {search_max_workers} workers, prefetch {prefetch_page_count}: '
+                  f'{count} objects, {statistics["relation_queries"]} relation queries in {elapsed:.2f}s')
+
+        for prefetch_page_count in [0, 4]:
+            count, elapsed = catch_up_with_feed(requester, temporary_dir / f'state_{prefetch_page_count}.db',
+                                                prefetch_page_count)
+            print(f'feed catch-up, prefetch {prefetch_page_count}: {count} events in {elapsed:.2f}s')
+        requester.close()
+
+        # record one collection and replay it from a stub that only knows the cassette
+        cassette_path = temporary_dir / 'cassette.jsonl'
+        recording_requester = create_requester(server.url, temporary_dir, Cassette(cassette_path=cassette_path))
+        count, _, elapsed = collect(recording_requester, mast_uuids, 8, 0)
+        recording_requester.close()
+        print(f'recorded: {count} objects in {elapsed:.2f}s, {cassette_path.stat().st_size / 1e6:.1f} MB cassette')
+
+        with StubEMInfraServer(cassette=Cassette.load(cassette_path), latency=args.latency) as replay_server:
+            replay_requester = create_requester(replay_server.url, temporary_dir)
+            count, _, elapsed = collect(replay_requester, mast_uuids, 8, 0)
+            replay_requester.close()
+            print(f'replayed: {count} objects in {elapsed:.2f}s')
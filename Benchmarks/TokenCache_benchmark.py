@@ -0,0 +1,41 @@
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import jwt.algorithms as jwt_algo
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+from API.TokenCache import TokenCache
+from API.TokenManager import TokenManager
+from Benchmarks.TokenManager_benchmark import FakeTokenEndpoint
+
+
+def time_to_first_token(key_path: Path, token_cache: TokenCache | None, latency: float) -> (float, int):
+    # a new run: a new token manager, only the token cache is shared with the previous runs
+    endpoint = FakeTokenEndpoint(expires_in=3600, latency=latency)
+    token_manager = TokenManager(private_key_path=key_path, client_id='client', token_cache=token_cache,
+                                 cache_key='client/prd')
+    token_manager.get_access_token = endpoint.get_access_token
+    start = time.perf_counter()
+    token_manager.get_token()
+    elapsed = time.perf_counter() - start
+    token_manager.close()
+    return elapsed, endpoint.calls
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--latency', type=float, default=0.3, help='seconds the token endpoint takes')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as key_dir:
+        key_path = Path(key_dir) / 'private_key.json'
+        key_path.write_text(jwt_algo.RSAAlgorithm.to_jwk(rsa.generate_private_key(public_exponent=65537,
+                                                                                   key_size=2048)))
+        token_cache = TokenCache(Path(key_dir) / 'tokens.json')
+        for name, cache in [('no token cache', None), ('token cache', token_cache)]:
+            timings = [time_to_first_token(key_path, cache, args.latency) for _ in range(args.runs)]
+            print(f'{name:>14}: first token after ' + ', '.join(f'{elapsed * 1000:.1f}ms' for elapsed, _ in timings) +
+                  f' ({sum(calls for _, calls in timings)} token requests in {args.runs} runs)')
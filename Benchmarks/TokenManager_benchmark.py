@@ -0,0 +1,83 @@
+import argparse
+import statistics
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from threading import Lock
+
+import jwt.algorithms as jwt_algo
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+from API.TokenManager import TokenManager
+
+
+class FakeTokenEndpoint:
+    def __init__(self, expires_in: float, latency: float):
+        self.expires_in = expires_in
+        self.latency = latency
+        self.calls = 0
+        self.lock = Lock()
+
+    def get_access_token(self, token: str) -> (str, float):
+        time.sleep(self.latency)
+        with self.lock:
+            self.calls += 1
+        return f'access-token-{self.calls}', self.expires_in
+
+
+class UnmanagedToken(TokenManager):
+    # the token handling before the token manager: the key is read for every token and every caller that finds the
+    # token expired requests a new one in its own request
+    def get_key(self):
+        with open(self.private_key_path) as private_key:
+            return jwt_algo.RSAAlgorithm.from_jwk(private_key.read())
+
+    def get_token(self) -> str:
+        if self.is_valid():
+            return self.access_token
+        requested_at = time.monotonic()
+        self.access_token, expires_in = self.get_access_token(self.generate_authentication_token())
+        self.expires_at = requested_at + expires_in - self.expiry_margin
+        return self.access_token
+
+
+def run(token_manager: TokenManager, workers: int, duration: float, work: float) -> [float]:
+    # every worker makes 'requests' of <work> seconds, the time spent getting the token is measured
+    def make_requests() -> [float]:
+        waits = []
+        end = time.monotonic() + duration
+        while time.monotonic() < end:
+            start = time.perf_counter()
+            token_manager.get_token()
+            waits.append(time.perf_counter() - start)
+            time.sleep(work)
+        return waits
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return [wait for waits in executor.map(lambda _: make_requests(), range(workers)) for wait in waits]
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--duration', type=float, default=5.0)
+    parser.add_argument('--expires_in', type=float, default=2.0, help='lifetime of a token in seconds')
+    parser.add_argument('--latency', type=float, default=0.2, help='seconds the token endpoint takes')
+    parser.add_argument('--work', type=float, default=0.005, help='seconds a request takes')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as key_dir:
+        key_path = Path(key_dir) / 'private_key.json'
+        key_path.write_text(jwt_algo.RSAAlgorithm.to_jwk(rsa.generate_private_key(public_exponent=65537,
+                                                                                   key_size=2048)))
+        for name, token_class in [('unmanaged', UnmanagedToken), ('token manager', TokenManager)]:
+            endpoint = FakeTokenEndpoint(expires_in=args.expires_in, latency=args.latency)
+            token_manager = token_class(private_key_path=key_path, client_id='client', expiry_margin=0,
+                                        refresh_margin=args.expires_in / 4)
+            token_manager.get_access_token = endpoint.get_access_token
+            waits = sorted(run(token_manager, args.workers, args.duration, args.work))
+            token_manager.close()
+            print(f'{name:>13}: {len(waits)} requests, {endpoint.calls} token requests, waited for a token in '
+                  f'{sum(wait > 0.01 for wait in waits)} requests, p99 {waits[int(len(waits) * 0.99)] * 1000:.2f}ms, '
+                  f'mean {statistics.mean(waits) * 1000:.3f}ms')
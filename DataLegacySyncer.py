@@ -1,29 +1,63 @@
 import json
+import logging
+from collections import Counter
 from itertools import batched
 from pathlib import Path
 
 from API.AbstractRequester import AbstractRequester
+from API.AsyncEMInfraRestClient import AsyncEMInfraRestClient
+from API.AsyncRequester import AsyncRequester
 from API.DavieRestClient import DavieRestClient
 from API.EMInfraRestClient import EMInfraRestClient
 from API.EMsonImporter import EMsonImporter
+from API.PrefixedRequester import PrefixedRequester
 from API.RequesterFactory import RequesterFactory
+from Database.AssetCacheManager import AssetCacheManager
 from Database.DbManager import DbManager
+from Domain.AssetCollection import AssetCollection
 from Domain.AssetInfoCollector import AssetInfoCollector
+from Domain.AttributeProjection import report_attribute_projection
+from Domain.CollectionPatterns import toestel_plan, armatuurcontroller_plan, drager_plan, legacy_drager_plan
 from Domain.DeliveryFinder import DeliveryFinder
 from Domain.Enums import AuthType, Environment
+from Domain.MappedAssetCollection import MappedAssetCollection
 from Domain.ReportCreator import ReportCreator
 
 
 class DataLegacySyncer:
-    def __init__(self, settings_path: Path, auth_type: AuthType, env: Environment, state_db_path: Path):
-        self.em_infra_client = EMInfraRestClient(self.create_requester_with_settings(
-            settings_path=settings_path, auth_type=auth_type, env=env))
-        self.emson_importer = EMsonImporter(self.create_requester_with_settings(
-            settings_path=settings_path, auth_type=auth_type, env=env))
-        self.davie_client = DavieRestClient(self.create_requester_with_settings(
-            settings_path=settings_path, auth_type=auth_type, env=env))
+    def __init__(self, settings_path: Path, auth_type: AuthType, env: Environment, state_db_path: Path,
+                 use_asset_cache: bool = False, project_attributes: bool = False, search_prefetch_page_count: int = 0,
+                 search_max_workers: int = 1, search_chunk_size: int = 1000, search_page_size: int = 100,
+                 async_max_concurrency: int = 0):
+        # one requester (session, connection pool and token) shared by all clients, each with its own base path
+        self.requester = self.create_requester_with_settings(settings_path=settings_path, auth_type=auth_type,
+                                                             env=env)
+        self.em_infra_client = EMInfraRestClient(PrefixedRequester(self.requester),
+                                                 search_prefetch_page_count=search_prefetch_page_count)
+        self.emson_importer = EMsonImporter(PrefixedRequester(self.requester))
+        self.davie_client = DavieRestClient(PrefixedRequester(self.requester))
+        # with an async_max_concurrency, the searches of a collection and the event contexts of the deliveries are in
+        # flight at the same time, at most async_max_concurrency requests on the same requester
+        self.async_em_infra_client = None
+        if async_max_concurrency > 0:
+            self.async_em_infra_client = AsyncEMInfraRestClient(
+                AsyncRequester(self.requester, max_concurrency=async_max_concurrency))
         self.db_manager = DbManager(state_db_path=state_db_path)
 
+        # the asset cache lives next to the state db; once it exists, the feed keeps invalidating it even when this
+        # syncer does not read from it
+        asset_cache_path = state_db_path.with_name(f'{state_db_path.stem}_asset_cache.db')
+        self.asset_cache_manager = None
+        if use_asset_cache or asset_cache_path.exists():
+            self.asset_cache_manager = AssetCacheManager(cache_db_path=asset_cache_path)
+        self.use_asset_cache = use_asset_cache
+        # only keep the attributes the reports use, to save memory on large collections
+        self.attribute_projection = report_attribute_projection if project_attributes else None
+        # concurrent searches share the connection pool of the requester (pool_size in the requester settings)
+        self.search_max_workers = search_max_workers
+        self.search_chunk_size = search_chunk_size
+        self.search_page_size = search_page_size
+
     @classmethod
     def create_requester_with_settings(cls, settings_path: Path, auth_type: AuthType, env: Environment
                                        ) -> AbstractRequester:
@@ -31,40 +65,102 @@ class DataLegacySyncer:
             settings = json.load(settings_file)
         return RequesterFactory.create_requester(settings=settings, auth_type=auth_type, env=env)
 
-    def run(self):
-        self.find_deliveries_to_sync()
+    def create_asset_info_collector(self) -> AssetInfoCollector:
+        return AssetInfoCollector(em_infra_rest_client=self.em_infra_client, emson_importer=self.emson_importer,
+                                  asset_cache_manager=self.asset_cache_manager if self.use_asset_cache else None,
+                                  attribute_projection=self.attribute_projection,
+                                  search_max_workers=self.search_max_workers, search_chunk_size=self.search_chunk_size,
+                                  search_page_size=self.search_page_size,
+                                  async_em_infra_client=self.async_em_infra_client)
+
+    def run(self, batch_page_size: int = 5, prefetch_page_count: int = 0):
+        self.find_deliveries_to_sync(batch_page_size=batch_page_size, prefetch_page_count=prefetch_page_count)
 
-    def find_deliveries_to_sync(self):
+    def find_deliveries_to_sync(self, batch_page_size: int = 5, prefetch_page_count: int = 0):
         delivery_finder = DeliveryFinder(em_infra_client=self.em_infra_client, davie_client=self.davie_client,
-                                         db_manager=self.db_manager)
+                                         db_manager=self.db_manager, batch_page_size=batch_page_size,
+                                         prefetch_page_count=prefetch_page_count,
+                                         asset_cache_manager=self.asset_cache_manager,
+                                         async_em_infra_client=self.async_em_infra_client)
 
         delivery_finder.find_deliveries_to_sync()
 
     def collect_and_create_specific_reports(self, delivery_references: list[str], combine_single_report: bool = False,
-                                            installatie_nummer: str = None):
+                                            installatie_nummer: str = None, report_max_workers: int = 1,
+                                            snapshot_path: Path = None):
+        # when a snapshot_path is given, the collected assets are saved there (one snapshot per delivery when the
+        # reports are not combined) so the reports can be created again with create_reports_from_snapshot
         if combine_single_report:
-            asset_info_collector = AssetInfoCollector(em_infra_rest_client=self.em_infra_client,
-                                                      emson_importer=self.emson_importer)
+            asset_info_collector = self.create_asset_info_collector()
             asset_uuids = list(self.db_manager.get_asset_uuids_from_specific_deliveries(
                 delivery_references=delivery_references))
             self._collect_info_given_asset_uuids(asset_info_collector=asset_info_collector, asset_uuids=asset_uuids)
-            self._create_all_reports(asset_info_collector=asset_info_collector, installatie_nummer=installatie_nummer)
+            if snapshot_path is not None:
+                asset_info_collector.collection.save_snapshot(snapshot_path)
+            self._create_all_reports(asset_info_collector=asset_info_collector, installatie_nummer=installatie_nummer,
+                                     max_workers=report_max_workers)
         else:
             for delivery_reference in delivery_references:
-                asset_info_collector = AssetInfoCollector(em_infra_rest_client=self.em_infra_client,
-                                                          emson_importer=self.emson_importer)
+                asset_info_collector = self.create_asset_info_collector()
                 asset_uuids = list(self.db_manager.get_asset_uuids_from_specific_deliveries(
                     delivery_references=[delivery_reference]))
                 self._collect_info_given_asset_uuids(asset_info_collector=asset_info_collector, asset_uuids=asset_uuids)
+                if snapshot_path is not None:
+                    asset_info_collector.collection.save_snapshot(
+                        snapshot_path.with_stem(f'{snapshot_path.stem}_{delivery_reference}'))
                 self._create_all_reports(asset_info_collector=asset_info_collector,
-                                         installatie_nummer=installatie_nummer)
+                                         installatie_nummer=installatie_nummer, max_workers=report_max_workers)
 
-    def collect_and_create_reports(self):
-        asset_info_collector = AssetInfoCollector(em_infra_rest_client=self.em_infra_client,
-                                                  emson_importer=self.emson_importer)
+    def collect_and_create_reports(self, report_max_workers: int = 1, snapshot_path: Path = None):
+        asset_info_collector = self.create_asset_info_collector()
         asset_uuids = self.db_manager.get_asset_uuids_from_final_deliveries()
         self._collect_info_given_asset_uuids(asset_info_collector=asset_info_collector, asset_uuids=asset_uuids)
-        self._create_all_reports(asset_info_collector=asset_info_collector)
+        if snapshot_path is not None:
+            asset_info_collector.collection.save_snapshot(snapshot_path)
+        self._create_all_reports(asset_info_collector=asset_info_collector, max_workers=report_max_workers)
+
+    def collect_and_create_reports_per_installatie(self, delivery_references: list[str] = None,
+                                                   report_max_workers: int = 1, snapshot_path: Path = None,
+                                                   graph_image_path: Path = None):
+        # one workbook per installatie, collected once for all (or the given) deliveries
+        # with a graph_image_path, the reports are created from a memory-mapped graph image written there, so the
+        # report workers share it instead of each holding a copy of the collection
+        asset_info_collector = self.create_asset_info_collector()
+        if delivery_references is None:
+            asset_uuids = self.db_manager.get_asset_uuids_from_final_deliveries()
+        else:
+            asset_uuids = list(self.db_manager.get_asset_uuids_from_specific_deliveries(
+                delivery_references=delivery_references))
+        self._collect_info_given_asset_uuids(asset_info_collector=asset_info_collector, asset_uuids=asset_uuids)
+        if snapshot_path is not None:
+            asset_info_collector.collection.save_snapshot(snapshot_path)
+        collection = asset_info_collector.collection
+        if graph_image_path is not None:
+            MappedAssetCollection.write_graph_image(collection=collection, image_path=graph_image_path)
+            collection = MappedAssetCollection(image_path=graph_image_path)
+            asset_info_collector.collection = None
+        self._create_reports(collection=collection, per_installatie=True, report_max_workers=report_max_workers)
+
+    def create_reports_from_snapshot(self, snapshot_path: Path, installatie_nummer: str = None,
+                                     per_installatie: bool = False, report_max_workers: int = 1):
+        # re-runs the report logic on previously collected assets, without contacting the API
+        self._create_reports(collection=AssetCollection.load_snapshot(snapshot_path),
+                             installatie_nummer=installatie_nummer, per_installatie=per_installatie,
+                             report_max_workers=report_max_workers)
+
+    def create_reports_from_graph_image(self, graph_image_path: Path, installatie_nummer: str = None,
+                                        per_installatie: bool = False, report_max_workers: int = 1):
+        self._create_reports(collection=MappedAssetCollection(image_path=graph_image_path),
+                             installatie_nummer=installatie_nummer, per_installatie=per_installatie,
+                             report_max_workers=report_max_workers)
+
+    def _create_reports(self, collection: AssetCollection | MappedAssetCollection, installatie_nummer: str = None,
+                        per_installatie: bool = False, report_max_workers: int = 1):
+        report_creator = ReportCreator(collection=collection, db_manager=self.db_manager)
+        if per_installatie:
+            report_creator.create_reports_per_installatie(max_workers=report_max_workers)
+        else:
+            report_creator.create_all_reports(installatie_nummer=installatie_nummer, max_workers=report_max_workers)
 
     def poll_aanleveringen(self):
         pass
@@ -80,136 +176,29 @@ class DataLegacySyncer:
     @staticmethod
     def _collect_info_given_asset_uuids(asset_info_collector: AssetInfoCollector, asset_uuids: list[str],
                                         batch_size: int = 10000):
-        # work in batches of <batch_size> asset_uuids
-        for uuids in batched(asset_uuids, batch_size):
-            print('collecting asset info')
-            asset_info_collector.start_collecting_from_starting_uuids_using_pattern(
-                starting_uuids=uuids,
-                pattern=[('uuids', 'of', 'a'),
-                         ('a', 'type_of', ['VerlichtingstoestelLED']),
-                         ('a', '-[r1]-', 'b'),
-                         ('b', 'type_of', ['onderdeel#WVLichtmast', 'onderdeel#WVConsole']),
-                         ('r1', 'type_of', ['onderdeel#Bevestiging']),
-                         ('a', '-[r1]-', 'c'),
-                         ('c', 'type_of', ['onderdeel#Armatuurcontroller']),
-                         ('a', '-[r2]-', 'd'),
-                         ('d', 'type_of', ['onderdeel#LEDDriver']),
-                         ('r2', 'type_of', ['onderdeel#Bevestiging', 'onderdeel#Sturing']),
-                         ('c', '-[r3]->', 'd'),
-                         ('r3', 'type_of', ['onderdeel#VoedtAangestuurd']),
-                         ('e', '-[r3]->', 'c'),
-                         ('e', 'type_of', ['onderdeel#Montagekast']),
-                         ('b', '-[r1]-', 'e'),
-                         ('b', '-[r4]->', 'f'),
-                         ('a', '-[r4]->', 'f'),
-                         ('f', 'type_of', ['lgc:installatie#VPLMast', 'lgc:installatie#VPConsole',
-                                           'lgc:installatie#VPBevestig']),
-                         ('r4', 'type_of', ['onderdeel#HoortBij']),
-                         ('c', '-[r5]-', 'g'),
-                         ('g', 'type_of', ['onderdeel#Segmentcontroller']),
-                         ('r5', 'type_of', ['onderdeel#Sturing']),
-                         ('g', '-[r4]-', 'h'),
-                         ('h', 'type_of', ['lgc:installatie#SegC'])])
-            print('collected asset info starting from onderdeel#VerlichtingstoestelLED')
-
-        for uuids in batched(asset_uuids, batch_size):
-            print('collecting asset info')
-            asset_info_collector.start_collecting_from_starting_uuids_using_pattern(
-                starting_uuids=uuids,
-                pattern=[('uuids', 'of', 'a'),
-                         ('a', 'type_of', ['onderdeel#Armatuurcontroller']),
-                         ('a', '-[r1]-', 'b'),
-                         ('b', 'type_of', ['onderdeel#VerlichtingstoestelLED']),
-                         ('r1', 'type_of', ['onderdeel#Bevestiging']),
-                         ('a', '-[r2]->', 'c'),
-                         ('c', 'type_of', ['onderdeel#LEDDriver']),
-                         ('e', '-[r2]->', 'a'),
-                         ('e', 'type_of', ['onderdeel#Montagekast']),
-                         ('r2', 'type_of', ['onderdeel#VoedtAangestuurd']),
-                         ('a', '-[r3]-', 'd'),
-                         ('d', 'type_of', ['onderdeel#Segmentcontroller']),
-                         ('r3', 'type_of', ['onderdeel#Sturing']),
-                         ('b', '-[r4]-', 'c'),
-                         ('r4', 'type_of', ['onderdeel#Bevestiging', 'onderdeel#Sturing']),
-                         ('d', '-[r5]->', 'f'),
-                         ('f', 'type_of', ['lgc:installatie#SegC']),
-                         ('r5', 'type_of', ['onderdeel#HoortBij']),
-                         ('b', '-[r1]-', 'g'),
-                         ('e', '-[r1]-', 'g'),
-                         ('g', 'type_of', ['onderdeel#WVLichtmast', 'onderdeel#WVConsole']),
-
-                         ('b', '-[r5]->', 'h'),
-                         ('g', '-[r5]->', 'h'),
-                         ('h', 'type_of', ['lgc:installatie#VPLMast', 'lgc:installatie#VPConsole',
-                                           'lgc:installatie#VPBevestig'])])
-
-            print('collected asset info starting from Armatuurcontroller')
-
-        for uuids in batched(asset_uuids, batch_size):
-            print('collecting asset info')
-            asset_info_collector.start_collecting_from_starting_uuids_using_pattern(
-                starting_uuids=uuids,
-                pattern=[('uuids', 'of', 'a'),
-                         ('a', 'type_of', ['onderdeel#WVLichtmast', 'onderdeel#WVConsole']),
-                         ('a', '-[r1]-', 'b'),
-                         ('a', '-[r1]-', 'd'),
-                         ('b', 'type_of', ['onderdeel#VerlichtingstoestelLED']),
-                         ('d', 'type_of', ['onderdeel#Montagekast']),
-                         ('a', '-[r2]->', 'c'),
-                         ('c', 'type_of', ['lgc:installatie#VPLMast', 'lgc:installatie#VPConsole']),
-                         ('r1', 'type_of', ['onderdeel#Bevestiging']),
-                         ('r2', 'type_of', ['onderdeel#HoortBij']),
-                         ('b', '-[r1]-', 'e'),
-                         ('b', '-[r1]-', 'f'),
-                         ('e', 'type_of', ['onderdeel#LEDDriver']),
-                         ('f', 'type_of', ['onderdeel#Armatuurcontroller']),
-                         ('d', '-[r3]->', 'f'),
-                         ('f', '-[r3]->', 'e'),
-                         ('r3', 'type_of', ['onderdeel#VoedtAangestuurd']),
-                         ('f', '-[r4]-', 'g'),
-                         ('g', 'type_of', ['onderdeel#Segmentcontroller']),
-                         ('r4', 'type_of', ['onderdeel#Sturing']),
-                         ('g', '-[r2]->', 'h'),
-                         ('h', 'type_of', ['lgc:installatie#SegC'])])
-            print('collected asset info starting from OTL drager')
-
-        for uuids in batched(asset_uuids, batch_size):
-            print('collecting asset info')
-            asset_info_collector.start_collecting_from_starting_uuids_using_pattern(
-                starting_uuids=uuids,
-                pattern=[('uuids', 'of', 'a'),
-                         ('a', 'type_of', ['lgc:installatie#VPLMast', 'lgc:installatie#VPConsole',
-                                           'lgc:installatie#VPBevestig']),
-                         ('a', '<-[r1]-', 'b'),
-                         ('a', '<-[r1]-', 'e'),
-                         ('b', 'type_of', ['onderdeel#WVLichtmast', 'onderdeel#WVConsole']),
-                         ('e', 'type_of', ['onderdeel#VerlichtingstoestelLED']),
-                         ('r1', 'type_of', ['onderdeel#HoortBij']),
-                         ('c', 'type_of', ['lgc:installatie#SegC']),
-                         ('c', '<-[r1]-', 'd'),
-                         ('d', 'type_of', ['onderdeel#Segmentcontroller']),
-                         ('b', '-[r2]-', 'e'),
-                         ('b', '-[r2]-', 'f'),
-                         ('f', 'type_of', ['onderdeel#Montagekast']),
-                         ('r2', 'type_of', ['onderdeel#Bevestiging']),
-                         ('e', '-[r2]-', 'g'),
-                         ('e', '-[r2]-', 'h'),
-                         ('g', 'type_of', ['onderdeel#LEDDriver']),
-                         ('h', 'type_of', ['onderdeel#Armatuurcontroller']),
-                         ('f', '-[r3]->', 'h'),
-                         ('h', '-[r3]->', 'g'),
-                         ('r3', 'type_of', ['onderdeel#VoedtAangestuurd']),
-                         ('h', '-[r4]-', 'd'),
-                         ('r4', 'type_of', ['onderdeel#Sturing'])])
-            print('collected asset info starting from legacy assets')
-
-    def _create_all_reports(self, asset_info_collector, installatie_nummer: str = None):
+        plans = {'onderdeel#VerlichtingstoestelLED': toestel_plan,
+                 'Armatuurcontroller': armatuurcontroller_plan,
+                 'OTL drager': drager_plan,
+                 'legacy assets': legacy_drager_plan}
+        # the assets and relations collected by a previous plan are not fetched again, the counters per plan show what
+        # was fetched and what was skipped
+        for start_description, plan in plans.items():
+            # work in batches of <batch_size> asset_uuids
+            statistics = Counter()
+            for uuids in batched(asset_uuids, batch_size):
+                print('collecting asset info')
+                asset_info_collector.start_collecting_from_starting_uuids_using_plan(starting_uuids=uuids, plan=plan,
+                                                                                     statistics=statistics)
+            print(f'collected asset info starting from {start_description}')
+            logging.info(f'collected asset info starting from {start_description}: {dict(statistics)}')
+
+    def _create_all_reports(self, asset_info_collector, installatie_nummer: str = None, max_workers: int = 1):
         report_creator = ReportCreator(collection=asset_info_collector.collection, db_manager=self.db_manager)
-        report_creator.create_all_reports(installatie_nummer=installatie_nummer)
+        report_creator.create_all_reports(installatie_nummer=installatie_nummer, max_workers=max_workers)
 
     def sync_specific_deliveries(self, context_strings: [str]):
         delivery_finder = DeliveryFinder(em_infra_client=self.em_infra_client, davie_client=self.davie_client,
-                                         db_manager=self.db_manager)
+                                         db_manager=self.db_manager, async_em_infra_client=self.async_em_infra_client)
 
         delivery_finder.sync_specific_deliveries(context_strings=context_strings)
 
@@ -0,0 +1,128 @@
+import datetime
+import json
+from itertools import batched
+from pathlib import Path
+
+import sqlalchemy
+from sqlalchemy import select, delete, or_
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import sessionmaker
+
+from Database.AssetCacheModel import CacheBase, CachedAsset, CachedRelation, CachedExpansion
+from Domain.InfoObject import full_uri_to_short_type
+
+ALL_RELATION_TYPES = '*'
+
+
+class AssetCacheManager:
+    # stay well below the maximum number of host parameters of SQLite
+    chunk_size = 500
+    # a change the feed does not name (f.e. a relation event without the uuids of its assets) is picked up at the
+    # latest when the cached rows expire, so there is no cache without a max_age
+    default_max_age = datetime.timedelta(days=1)
+
+    def __init__(self, cache_db_path: Path, max_age: datetime.timedelta = default_max_age):
+        if max_age is None:
+            raise ValueError('The asset cache needs a max_age, rows that never expire can stay stale forever.')
+        self.cache_db_path = cache_db_path
+        self.max_age = max_age
+        self.db_engine = sqlalchemy.create_engine(f'sqlite:///{cache_db_path}')
+
+        CacheBase.metadata.create_all(self.db_engine)
+        self.session_maker = sessionmaker(bind=self.db_engine, expire_on_commit=False)
+
+    def _oldest_valid_timestamp(self) -> datetime.datetime:
+        return datetime.datetime.now() - self.max_age
+
+    def get_assets(self, uuids: [str]) -> [dict]:
+        assets = []
+        with self.session_maker.begin() as session:
+            for chunk in batched(uuids, self.chunk_size):
+                assets.extend(json.loads(data) for data in session.scalars(
+                    select(CachedAsset.data).where(CachedAsset.uuid.in_(chunk),
+                                                   CachedAsset.cached_on >= self._oldest_valid_timestamp())))
+        return assets
+
+    def save_assets(self, assets: [dict]) -> None:
+        now = datetime.datetime.now()
+        asset_rows = [{'uuid': asset['@id'][39:75], 'data': json.dumps(asset), 'cached_on': now} for asset in assets]
+        if not asset_rows:
+            return
+        with self.session_maker.begin() as session:
+            session.execute(self.create_upsert(CachedAsset, index_elements=[CachedAsset.uuid]), asset_rows)
+            session.commit()
+
+    @classmethod
+    def create_upsert(cls, model, index_elements: list):
+        # one executemany insert for all rows, an existing row gets the new values
+        insert = sqlite_insert(model)
+        return insert.on_conflict_do_update(
+            index_elements=index_elements,
+            set_={column.name: insert.excluded[column.name] for column in model.__table__.columns
+                  if column.name not in {element.name for element in index_elements}})
+
+    def get_expanded_uuids(self, uuids: [str], relation_types: [str] = None) -> set[str]:
+        # the assets of which the relations (of all the given types) are complete in the cache
+        expanded_types: dict[str, set[str]] = {}
+        with self.session_maker.begin() as session:
+            for chunk in batched(uuids, self.chunk_size):
+                for uuid_asset, relation_type in session.execute(
+                        select(CachedExpansion.uuid_asset, CachedExpansion.relation_type).where(
+                            CachedExpansion.uuid_asset.in_(chunk),
+                            CachedExpansion.cached_on >= self._oldest_valid_timestamp())):
+                    expanded_types.setdefault(uuid_asset, set()).add(relation_type)
+
+        if relation_types is None:
+            return {uuid for uuid, types in expanded_types.items() if ALL_RELATION_TYPES in types}
+        return {uuid for uuid, types in expanded_types.items()
+                if ALL_RELATION_TYPES in types or types.issuperset(relation_types)}
+
+    def get_relations_of_uuids(self, uuids: [str], relation_types: [str] = None) -> [dict]:
+        relations = {}
+        with self.session_maker.begin() as session:
+            for chunk in batched(uuids, self.chunk_size):
+                query = select(CachedRelation.uuid, CachedRelation.data).where(
+                    or_(CachedRelation.bron.in_(chunk), CachedRelation.doel.in_(chunk)))
+                if relation_types is not None:
+                    query = query.where(CachedRelation.short_type.in_(relation_types))
+                for uuid, data in session.execute(query):
+                    relations[uuid] = data
+        return [json.loads(data) for data in relations.values()]
+
+    def save_relations(self, uuids: [str], relation_types: [str], relations: [dict]) -> None:
+        # saves the relations and marks the relations (of the given types) of the uuids as complete
+        now = datetime.datetime.now()
+        relation_rows = [{'uuid': relation['@id'][46:82], 'bron': relation['RelatieObject.bron']['@id'][39:75],
+                          'doel': relation['RelatieObject.doel']['@id'][39:75],
+                          'short_type': full_uri_to_short_type(relation['@type']), 'data': json.dumps(relation),
+                          'cached_on': now} for relation in relations]
+        expansion_rows = [{'uuid_asset': uuid, 'relation_type': relation_type, 'cached_on': now}
+                          for uuid in uuids for relation_type in relation_types or [ALL_RELATION_TYPES]]
+        with self.session_maker.begin() as session:
+            if relation_rows:
+                session.execute(self.create_upsert(CachedRelation, index_elements=[CachedRelation.uuid]),
+                                relation_rows)
+            if expansion_rows:
+                session.execute(self.create_upsert(CachedExpansion, index_elements=[
+                    CachedExpansion.uuid_asset, CachedExpansion.relation_type]), expansion_rows)
+            session.commit()
+
+    def invalidate_uuids(self, uuids: [str]) -> None:
+        # removes the changed assets and relations; the relations of every changed uuid are no longer complete, nor
+        # those of the assets on both sides of a changed relation in the cache. A relation that is not cached is
+        # covered by its event, which names the assets on both sides among the changed uuids
+        with self.session_maker.begin() as session:
+            for chunk in batched(uuids, self.chunk_size):
+                linked_uuids = set(chunk)
+                for bron, doel in session.execute(
+                        select(CachedRelation.bron, CachedRelation.doel).where(or_(
+                            CachedRelation.uuid.in_(chunk), CachedRelation.bron.in_(chunk),
+                            CachedRelation.doel.in_(chunk)))):
+                    linked_uuids.update((bron, doel))
+
+                session.execute(delete(CachedAsset).where(CachedAsset.uuid.in_(chunk)))
+                session.execute(delete(CachedRelation).where(or_(
+                    CachedRelation.uuid.in_(chunk), CachedRelation.bron.in_(chunk), CachedRelation.doel.in_(chunk))))
+                for linked_chunk in batched(linked_uuids, self.chunk_size):
+                    session.execute(delete(CachedExpansion).where(CachedExpansion.uuid_asset.in_(linked_chunk)))
+            session.commit()
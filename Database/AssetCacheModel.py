@@ -0,0 +1,39 @@
+import datetime
+
+from sqlalchemy import PrimaryKeyConstraint
+from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.orm import Mapped
+from sqlalchemy.orm import mapped_column
+
+
+class CacheBase(DeclarativeBase):
+    pass
+
+
+class CachedAsset(CacheBase):
+    __tablename__ = "cached_assets"
+    uuid: Mapped[str] = mapped_column(primary_key=True)
+    data: Mapped[str]
+    cached_on: Mapped[datetime.datetime]
+
+
+class CachedRelation(CacheBase):
+    __tablename__ = "cached_relations"
+    uuid: Mapped[str] = mapped_column(primary_key=True)
+    bron: Mapped[str] = mapped_column(index=True)
+    doel: Mapped[str] = mapped_column(index=True)
+    short_type: Mapped[str]
+    data: Mapped[str]
+    cached_on: Mapped[datetime.datetime]
+
+
+class CachedExpansion(CacheBase):
+    # the relations (of relation_type, '*' means all types) of the asset are complete in the cache
+    __tablename__ = "cached_expansions"
+    uuid_asset: Mapped[str] = mapped_column(index=True)
+    relation_type: Mapped[str]
+    cached_on: Mapped[datetime.datetime]
+
+    __table_args__ = (
+        PrimaryKeyConstraint("uuid_asset", "relation_type"),
+    )
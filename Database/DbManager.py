@@ -1,10 +1,12 @@
 import datetime
+from itertools import batched
 from pathlib import Path
 from typing import Generator, Iterator
 from uuid import UUID
 
 import sqlalchemy
 from sqlalchemy import Table, select, update, delete
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import sessionmaker, joinedload
 
 from Database.DatabaseModel import Base, State, Delivery, DeliveryAsset, Asset
@@ -45,6 +47,10 @@ class DbManager:
             query = session.query(Delivery.uuid_em_infra).filter(Delivery.referentie.is_(None)).limit(1)
             return query.scalar()
 
+    def get_delivery_uuids_without_reference(self) -> [UUID]:
+        with self.session_maker.begin() as session:
+            return list(session.scalars(select(Delivery.uuid_em_infra).filter(Delivery.referentie.is_(None))))
+
     def get_a_delivery_by_em_infra_uuid(self, em_infra_uuid) -> UUID:
         em_infra_guid = UUID(em_infra_uuid)
         with self.session_maker.begin() as session:
@@ -86,14 +92,27 @@ class DbManager:
             session.commit()
 
     def upsert_assets_delivery(self, delivery_em_infra_uuid: str, asset_timestamp_dict: {str: datetime.datetime}):
+        self.upsert_assets_deliveries({delivery_em_infra_uuid: asset_timestamp_dict})
+
+    def upsert_assets_deliveries(self, delivery_asset_timestamp_dict: {str: {str: datetime.datetime}}):
+        # one transaction with two executemany INSERT ... ON CONFLICT statements instead of merging asset per asset
+        asset_rows = [{'uuid': UUID(asset_uuid)} for asset_uuid in
+                      {asset_uuid for assets in delivery_asset_timestamp_dict.values() for asset_uuid in assets}]
+        delivery_asset_rows = [{'uuid_delivery_em_infra': UUID(delivery_em_infra_uuid), 'uuid_asset': UUID(asset_uuid),
+                                'last_updated': timestamp}
+                               for delivery_em_infra_uuid, assets in delivery_asset_timestamp_dict.items()
+                               for asset_uuid, timestamp in assets.items()]
+        if not delivery_asset_rows:
+            return
+
+        insert_assets = sqlite_insert(Asset).on_conflict_do_nothing(index_elements=[Asset.uuid])
+        insert_delivery_assets = sqlite_insert(DeliveryAsset)
+        insert_delivery_assets = insert_delivery_assets.on_conflict_do_update(
+            index_elements=[DeliveryAsset.uuid_delivery_em_infra, DeliveryAsset.uuid_asset],
+            set_={'last_updated': insert_delivery_assets.excluded.last_updated})
         with self.session_maker.begin() as session:
-            for asset_uuid, timestamp in asset_timestamp_dict.items():
-                session.merge(Asset(uuid=UUID(asset_uuid)))
-                session.merge(DeliveryAsset(
-                    uuid_delivery_em_infra=UUID(delivery_em_infra_uuid),
-                    uuid_asset=UUID(asset_uuid),
-                    last_updated=timestamp
-                ))
+            session.execute(insert_assets, asset_rows)
+            session.execute(insert_delivery_assets, delivery_asset_rows)
             session.commit()
 
     def get_asset_uuids_from_specific_deliveries(self, delivery_references: [str]) -> Iterator[str]:
@@ -109,6 +128,21 @@ class DbManager:
         with self.session_maker.begin() as session:
             return [str(s) for s in session.scalars(select(DeliveryAsset.uuid_asset)).all()]  # TODO add filter
 
+    def get_delivery_info_by_asset_uuids(self, asset_uuids: [str]) -> {str: ([str], [str])}:
+        # delivery references and DAVIE ids per asset uuid, in one joined query per chunk of uuids
+        delivery_info = {}
+        with self.session_maker.begin() as session:
+            for chunk in batched(asset_uuids, 500):
+                query = (select(DeliveryAsset.uuid_asset, Delivery.referentie, Delivery.uuid_davie).
+                         join(DeliveryAsset.delivery).
+                         where(DeliveryAsset.uuid_asset.in_([UUID(asset_uuid) for asset_uuid in chunk])))
+                for uuid_asset, referentie, uuid_davie in session.execute(query):
+                    referenties, davie_ids = delivery_info.setdefault(str(uuid_asset), ([], []))
+                    referenties.append(referentie or '')
+                    if uuid_davie is not None:
+                        davie_ids.append(str(uuid_davie))
+        return delivery_info
+
     def get_deliveries_by_asset_uuid(self, asset_uuid: str) -> [Delivery]:
         with self.session_maker.begin() as session:
             query = session.query(DeliveryAsset).filter(DeliveryAsset.uuid_asset == UUID(asset_uuid))
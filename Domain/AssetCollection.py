@@ -1,16 +1,28 @@
+import gc
+import pickle
+import sys
+from pathlib import Path
 from typing import Generator
 
+from Domain.AttributeProjection import ALL_TYPES
 from Domain.Enums import Direction
-from Domain.InfoObject import InfoObject, NodeInfoObject, RelationInfoObject, full_uri_to_short_type, \
-    is_directional_relation
+from Domain.InfoObject import InfoObject, NodeInfoObject, RelationInfoObject, RelationEdge, \
+    full_uri_to_short_type, is_directional_relation
 from Exceptions.AssetsMissingError import AssetsMissingError
 from Exceptions.ObjectAlreadyExistsError import ObjectAlreadyExistsError
 
 
 class AssetCollection:
-    def __init__(self):
+    # the keys add_node needs, kept regardless of the attribute projection
+    node_keys = frozenset({'uuid', 'typeURI', 'AIMDBStatus.isActief'})
+    snapshot_version = 1
+
+    def __init__(self, attribute_projection: dict[str, frozenset[str]] | None = None):
         self.object_dict: dict[str: InfoObject] = {}
         self.short_uri_dict = {}
+        # when given, the nodes only keep the attributes of their type and of ALL_TYPES
+        self.attribute_projection = attribute_projection
+        self._projected_keys_by_type: dict[str, frozenset[str]] = {}
 
     def _update_short_uri_dict(self, short_uri: str, uuid: str) -> None:
         if short_uri not in self.short_uri_dict:
@@ -27,6 +39,9 @@ class AssetCollection:
             return
 
         short_uri = full_uri_to_short_type(d['typeURI'])
+        if self.attribute_projection is not None:
+            projected_keys = self.get_projected_keys(short_type=short_uri)
+            d = {key: value for key, value in d.items() if key in projected_keys}
 
         info_object = NodeInfoObject(uuid=uuid, short_type=short_uri, attr_dict=d)
         actief = d.get("AIMDBStatus.isActief")
@@ -37,6 +52,14 @@ class AssetCollection:
 
         self._update_short_uri_dict(short_uri=short_uri, uuid=uuid)
 
+    def get_projected_keys(self, short_type: str) -> frozenset[str]:
+        projected_keys = self._projected_keys_by_type.get(short_type)
+        if projected_keys is None:
+            projected_keys = (self.node_keys | self.attribute_projection.get(ALL_TYPES, frozenset()) |
+                              self.attribute_projection.get(short_type, frozenset()))
+            self._projected_keys_by_type[short_type] = projected_keys
+        return projected_keys
+
     def add_relation(self, d: dict) -> None:
         uuid = d['uuid']
         self.check_if_exists(uuid)
@@ -56,39 +79,74 @@ class AssetCollection:
             raise asset_missing_error
 
         short_type_relation = full_uri_to_short_type(d['typeURI'])
-        relation_name = short_type_relation.split('#')[-1]
         relation_info_object = RelationInfoObject(uuid=uuid, short_type=short_type_relation, attr_dict=d,
                                                   bron=bron_object, doel=doel_object)
+        actief = d.get("AIMDBStatus.isActief")
+        if actief is not None:
+            relation_info_object.active = actief
+
+        self._add_relation_object(relation_info_object)
+        self._update_short_uri_dict(short_uri=short_type_relation, uuid=uuid)
 
-        if is_directional_relation(short_type_relation):
+    def _add_relation_object(self, relation_info_object: RelationInfoObject) -> None:
+        relation_name = sys.intern(relation_info_object.short_type.split('#')[-1])
+        if is_directional_relation(relation_info_object.short_type):
             direction_1 = Direction.WITH
             direction_2 = Direction.REVERSED
         else:
             direction_1 = Direction.NONE
             direction_2 = Direction.NONE
 
-        if relation_name not in bron_object.relations:
-            bron_object.relations[relation_name] = {}
-        bron_object.relations[relation_name][doel_object.uuid] = {
-            'direction': direction_1,
-            'relation_object': relation_info_object,
-            'node_object': doel_object
-        }
-
-        if relation_name not in doel_object.relations:
-            doel_object.relations[relation_name] = {}
-        doel_object.relations[relation_name][bron_object.uuid] = {
-            'direction': direction_2,
-            'relation_object': relation_info_object,
-            'node_object': bron_object
-        }
-
-        actief = d.get("AIMDBStatus.isActief")
-        if actief is not None:
-            relation_info_object.active = actief
-
-        self.object_dict[d['uuid']] = relation_info_object
-        self._update_short_uri_dict(short_uri=short_type_relation, uuid=uuid)
+        bron_object, doel_object = relation_info_object.bron, relation_info_object.doel
+        bron_object.add_edge(relation_name=relation_name, edge=RelationEdge(
+            direction=direction_1, relation_object=relation_info_object, node_object=doel_object))
+        doel_object.add_edge(relation_name=relation_name, edge=RelationEdge(
+            direction=direction_2, relation_object=relation_info_object, node_object=bron_object))
+
+        self.object_dict[relation_info_object.uuid] = relation_info_object
+
+    def save_snapshot(self, snapshot_path: Path) -> None:
+        # stored as rows instead of pickling the objects themselves: the edges make the object graph deeply recursive
+        # and they are cheap to rebuild from the relation rows
+        nodes, relations = [], []
+        for o in self.object_dict.values():
+            if o.is_relation:
+                relations.append((o.uuid, o.short_type, o.active, o.attr_dict, o.bron.uuid, o.doel.uuid))
+            else:
+                nodes.append((o.uuid, o.short_type, o.active, o.attr_dict))
+        snapshot = {'version': self.snapshot_version, 'attribute_projection': self.attribute_projection,
+                    'nodes': nodes, 'relations': relations, 'short_uri_dict': self.short_uri_dict}
+        with open(snapshot_path, 'wb') as snapshot_file:
+            pickle.dump(snapshot, snapshot_file, protocol=5)
+
+    @classmethod
+    def load_snapshot(cls, snapshot_path: Path) -> 'AssetCollection':
+        # only load snapshots created by save_snapshot, unpickling can run arbitrary code
+        # loading only allocates objects that stay alive, the cyclic garbage collector would rescan them over and over
+        # for nothing
+        gc_was_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            with open(snapshot_path, 'rb') as snapshot_file:
+                snapshot = pickle.load(snapshot_file)
+            if snapshot.get('version') != cls.snapshot_version:
+                raise ValueError(f"Snapshot {snapshot_path} has version {snapshot.get('version')}, "
+                                 f"expected version {cls.snapshot_version}.")
+
+            collection = cls(attribute_projection=snapshot['attribute_projection'])
+            object_dict = collection.object_dict
+            for uuid, short_type, active, attr_dict in snapshot['nodes']:
+                object_dict[uuid] = NodeInfoObject(uuid=uuid, short_type=short_type, attr_dict=attr_dict,
+                                                   active=active)
+            for uuid, short_type, active, attr_dict, bron_uuid, doel_uuid in snapshot['relations']:
+                collection._add_relation_object(RelationInfoObject(
+                    uuid=uuid, short_type=short_type, attr_dict=attr_dict, bron=object_dict[bron_uuid],
+                    doel=object_dict[doel_uuid], active=active))
+            collection.short_uri_dict = snapshot['short_uri_dict']
+        finally:
+            if gc_was_enabled:
+                gc.enable()
+        return collection
 
     def get_object_by_uuid(self, uuid: str) -> InfoObject:
         o = self.object_dict.get(uuid)
@@ -119,6 +177,14 @@ class AssetCollection:
     def get_node_objects(self) -> Generator[NodeInfoObject, None, None]:
         yield from [node for node in self.object_dict.values() if not node.is_relation]
 
+    def get_node_uuids(self) -> [str]:
+        return [uuid for uuid, o in self.object_dict.items() if not o.is_relation]
+
+    def get_node_types(self) -> [str]:
+        # a short type is either a node type or a relation type
+        return [short_type for short_type, uuids in self.short_uri_dict.items()
+                if uuids and not self.object_dict[next(iter(uuids))].is_relation]
+
     def get_node_objects_by_types(self, list_of_short_types: [str]) -> Generator[NodeInfoObject, None, None]:
         for short_type in list_of_short_types:
             for uuid in self.short_uri_dict.get(short_type, set()):
@@ -140,32 +206,44 @@ class AssetCollection:
     def traverse_graph(self, start_uuid: str, relation_types: [str] = None, allowed_directions: [Direction] = None,
                        filtered_node_types: [str] = None, return_type: str = 'uuid', return_only_active: bool = True
                        ) -> Generator[str | NodeInfoObject, None, None]:
-        starting_object = self.get_node_object_by_uuid(start_uuid)
-        if starting_object is None:
-            raise ValueError(f"Node with uuid {start_uuid} does not exist in collection.")
-
-        if relation_types is None or len(relation_types) == 0:
-            relation_types = list(starting_object.relations.keys())
-
-        if allowed_directions is None or len(allowed_directions) == 0:
-            allowed_directions = [Direction.WITH, Direction.REVERSED, Direction.NONE]
-
-        if filtered_node_types is None or len(filtered_node_types) == 0:
-            filtered_node_types = list(self.short_uri_dict.keys())
-
         if return_type not in ['uuid', 'info_object']:
             raise ValueError(f"return_type {return_type} is not supported.")
 
-        for relation_type in relation_types:
-            if relation_type not in starting_object.relations:
+        for edge in self.get_neighbour_edges(start_uuid=start_uuid, relation_types=relation_types,
+                                             directions=allowed_directions, node_types=filtered_node_types,
+                                             only_active=return_only_active):
+            if return_type == 'uuid':
+                yield edge.node_object.uuid
+            else:
+                yield edge.node_object
+
+    def get_neighbours(self, start_uuid: str, relation_types: [str] = None, directions: [Direction] = None,
+                       node_types: [str] = None, only_active: bool = True) -> [NodeInfoObject]:
+        return [edge.node_object for edge in self.get_neighbour_edges(start_uuid, relation_types, directions,
+                                                                      node_types, only_active)]
+
+    def get_neighbour_edges(self, start_uuid: str, relation_types: [str] = None, directions: [Direction] = None,
+                            node_types: [str] = None, only_active: bool = True) -> [RelationEdge]:
+        # empty or missing filters match everything, the edges are returned in the order of the relation types; the
+        # relation types are looked up by key, only the (direction, node type) keys of those relations are checked
+        starting_object = self.get_node_object_by_uuid(start_uuid)
+        direction_set = frozenset(directions) if directions else None
+        node_type_set = frozenset(node_types) if node_types else None
+        if relation_types:
+            edges_by_relation = [starting_object.edges.get(relation_type) for relation_type in relation_types]
+        else:
+            edges_by_relation = starting_object.edges.values()
+
+        neighbour_edges = []
+        for edges_by_key in edges_by_relation:
+            if edges_by_key is None:
                 continue
-            for target_uuid, relation_info in starting_object.relations[relation_type].items():
-                if (relation_info['direction'] in allowed_directions and
-                        relation_info['node_object'].short_type in filtered_node_types):
-                    if return_only_active and (not relation_info['node_object'].active or
-                                               not relation_info['relation_object'].active):
+            for (direction, node_type), edges in edges_by_key.items():
+                if ((direction_set is not None and direction not in direction_set) or
+                        (node_type_set is not None and node_type not in node_type_set)):
+                    continue
+                for edge in edges.values():
+                    if only_active and (not edge.node_object.active or not edge.relation_object.active):
                         continue
-                    if return_type == 'uuid':
-                        yield target_uuid
-                    else:
-                        yield relation_info['node_object']
+                    neighbour_edges.append(edge)
+        return neighbour_edges
@@ -1,34 +1,132 @@
-import re
+import asyncio
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from itertools import batched
 from typing import Generator
 
+from API.AsyncEMInfraRestClient import AsyncEMInfraRestClient
 from API.EMInfraRestClient import EMInfraRestClient
 from API.EMsonImporter import EMsonImporter
+from Database.AssetCacheManager import AssetCacheManager
 from Domain.AssetCollection import AssetCollection
+from Domain.InfoObject import short_type_to_full_uri
+from Domain.QueryPlan import QueryPlan
 from Exceptions.AssetsMissingError import AssetsMissingError
 from Exceptions.ObjectAlreadyExistsError import ObjectAlreadyExistsError
 
 
 class AssetInfoCollector:
-    def __init__(self, em_infra_rest_client: EMInfraRestClient, emson_importer: EMsonImporter):
+    def __init__(self, em_infra_rest_client: EMInfraRestClient, emson_importer: EMsonImporter,
+                 asset_cache_manager: AssetCacheManager | None = None,
+                 attribute_projection: dict[str, frozenset[str]] | None = None, search_max_workers: int = 1,
+                 search_chunk_size: int = 1000, search_page_size: int = 100,
+                 async_em_infra_client: AsyncEMInfraRestClient | None = None):
         self.em_infra_importer = em_infra_rest_client
         self.emson_importer = emson_importer
-        self.collection = AssetCollection()
+        self.asset_cache_manager = asset_cache_manager
+        self.collection = AssetCollection(attribute_projection=attribute_projection)
+        # (asset uuid, relation type) pairs of which the relations are already collected, None means all types
+        self.expanded_asset_relation_pairs: set[tuple[str, str | None]] = set()
+        # with more than one worker, the uuids of a search are split in chunks of <search_chunk_size> that are searched
+        # concurrently; keep the workers within the pool size of the requester
+        self.search_max_workers = search_max_workers
+        self.search_chunk_size = search_chunk_size
+        self.search_page_size = search_page_size
+        # with an async client, all chunks of a search are in flight at the same time (bounded by its requester)
+        self.async_em_infra_client = async_em_infra_client
 
     def get_assets_by_uuids(self, uuids: [str]) -> Generator[dict, None, None]:
-        return self.em_infra_importer.get_objects_from_oslo_search_endpoint_using_iterator(resource='assets',
-                                                                                           filter_dict={'uuid': uuids})
+        return self.search_by_uuids(resource='assets', uuid_key='uuid', uuids=uuids)
         # return self.emson_importer.get_assets_by_uuid_using_iterator(uuids=uuids)
 
     def get_assetrelaties_by_uuids(self, uuids: [str]) -> Generator[dict, None, None]:
-        return self.em_infra_importer.get_objects_from_oslo_search_endpoint_using_iterator(resource='assetrelaties',
-                                                                                           filter_dict={'uuid': uuids})
-
-    def get_assetrelaties_by_source_or_target_uuids(self, uuids: [str]) -> Generator[dict, None, None]:
-        return self.em_infra_importer.get_objects_from_oslo_search_endpoint_using_iterator(resource='assetrelaties',
-                                                                                           filter_dict={'asset': uuids})
+        return self.search_by_uuids(resource='assetrelaties', uuid_key='uuid', uuids=uuids)
+
+    def get_assetrelaties_by_source_or_target_uuids(self, uuids: [str], relation_types: [str] = None
+                                                    ) -> Generator[dict, None, None]:
+        filter_dict = {}
+        if relation_types is not None:
+            filter_dict['typeUri'] = [short_type_to_full_uri(relation_type) for relation_type in relation_types]
+        return self.search_by_uuids(resource='assetrelaties', uuid_key='asset', uuids=uuids, filter_dict=filter_dict)
+
+    def search_by_uuids(self, resource: str, uuid_key: str, uuids: [str], filter_dict: dict = None
+                        ) -> Generator[dict, None, None]:
+        filter_dict = filter_dict or {}
+        if self.async_em_infra_client is not None and len(uuids) > self.search_chunk_size:
+            yield from asyncio.run(self.search_by_uuids_async(resource=resource, uuid_key=uuid_key, uuids=uuids,
+                                                              filter_dict=filter_dict))
+            return
+        if self.search_max_workers <= 1 or len(uuids) <= self.search_chunk_size:
+            yield from self.em_infra_importer.get_objects_from_oslo_search_endpoint_using_iterator(
+                resource=resource, filter_dict={uuid_key: uuids, **filter_dict}, size=self.search_page_size)
+            return
+
+        def search_chunk(chunk: [str]) -> [dict]:
+            return list(self.em_infra_importer.get_objects_from_oslo_search_endpoint_using_iterator(
+                resource=resource, filter_dict={uuid_key: chunk, **filter_dict}, size=self.search_page_size))
+
+        # the objects of a chunk are yielded when the chunk is complete, a relation between assets of different chunks
+        # is found by both chunks but yielded once
+        seen_ids = set()
+        with ThreadPoolExecutor(max_workers=self.search_max_workers, thread_name_prefix='oslo_search') as executor:
+            futures = [executor.submit(search_chunk, list(chunk)) for chunk in batched(uuids, self.search_chunk_size)]
+            try:
+                for future in as_completed(futures):
+                    for obj in future.result():
+                        if obj['@id'] not in seen_ids:
+                            seen_ids.add(obj['@id'])
+                            yield obj
+            finally:
+                for future in futures:
+                    future.cancel()
+
+    async def search_by_uuids_async(self, resource: str, uuid_key: str, uuids: [str], filter_dict: dict = None
+                                    ) -> [dict]:
+        filter_dict = filter_dict or {}
+        chunk_results = await asyncio.gather(*(
+            self.async_em_infra_client.get_objects_from_oslo_search_endpoint(
+                resource=resource, filter_dict={uuid_key: list(chunk), **filter_dict}, size=self.search_page_size)
+            for chunk in batched(uuids, self.search_chunk_size)))
+        # a relation between assets of different chunks is found by both chunks but returned once
+        seen_ids = set()
+        objects = []
+        for chunk_objects in chunk_results:
+            for obj in chunk_objects:
+                if obj['@id'] not in seen_ids:
+                    seen_ids.add(obj['@id'])
+                    objects.append(obj)
+        return objects
+
+    def get_assets_by_uuids_using_cache(self, uuids: [str]) -> [dict]:
+        assets = self.asset_cache_manager.get_assets(uuids=uuids)
+        cached_uuids = {asset['@id'][39:75] for asset in assets}
+        uncached_uuids = [uuid for uuid in uuids if uuid not in cached_uuids]
+        if uncached_uuids:
+            fetched_assets = list(self.get_assets_by_uuids(uuids=uncached_uuids))
+            self.asset_cache_manager.save_assets(fetched_assets)
+            assets.extend(fetched_assets)
+        return assets
+
+    def get_assetrelaties_by_source_or_target_uuids_using_cache(self, uuids: [str], relation_types: [str] = None
+                                                                ) -> [dict]:
+        expanded_uuids = self.asset_cache_manager.get_expanded_uuids(uuids=uuids, relation_types=relation_types)
+        relations = self.asset_cache_manager.get_relations_of_uuids(uuids=list(expanded_uuids),
+                                                                    relation_types=relation_types)
+        unexpanded_uuids = [uuid for uuid in uuids if uuid not in expanded_uuids]
+        if unexpanded_uuids:
+            fetched_relations = list(self.get_assetrelaties_by_source_or_target_uuids(
+                uuids=unexpanded_uuids, relation_types=relation_types))
+            self.asset_cache_manager.save_relations(uuids=unexpanded_uuids, relation_types=relation_types,
+                                                    relations=fetched_relations)
+            relations.extend(fetched_relations)
+        return relations
 
     def collect_asset_info(self, uuids: [str]) -> None:
-        for asset in self.get_assets_by_uuids(uuids=uuids):
+        if self.asset_cache_manager is not None:
+            assets = self.get_assets_by_uuids_using_cache(uuids=uuids)
+        else:
+            assets = self.get_assets_by_uuids(uuids=uuids)
+        for asset in assets:
             asset['uuid'] = asset.pop('@id')[39:75]
             asset['typeURI'] = asset.pop('@type')
             self.collection.add_node(asset)
@@ -62,70 +160,68 @@ class AssetInfoCollector:
 
     def start_collecting_from_starting_uuids_using_pattern(self, starting_uuids: [str],
                                                            pattern: [tuple[str, str, object]]) -> None:
-        uuid_pattern = next((t[2] for t in pattern if t[:2] == ('uuids', 'of')), None)
-        type_of_patterns = [t for t in pattern if t[1] == 'type_of']
-        relation_patterns = [t for t in pattern if re.match('^(<)?-\\[r(\\d)*]-(>)?$', t[1]) is not None]
-
-        if uuid_pattern is None:
-            raise ValueError('No uuids pattern found in pattern list. '
-                             'Must contain one tuple with ("uuids", "of", object)')
-        if not type_of_patterns:
-            raise ValueError('No type_of pattern found in pattern list. '
-                             'Must contain at least one tuple with (object, "type_of", object)')
-        if not relation_patterns:
-            raise ValueError('No relation pattern found in pattern list'
-                             'Must contain at least one tuple with (object, "-[r]-", object) where r is followed by a '
-                             'number and relation may or may not be directional (using < and > symbols)')
-
-        self.collect_asset_info(uuids=starting_uuids)
-
-        matching_objects = [uuid_pattern]
-        while relation_patterns:
-            new_matching_objects = []
-            for obj in matching_objects:
-                relation_patterns = self.order_patterns_for_object(obj, relation_patterns)
-
-                for relation_pattern in relation_patterns:
-                    if relation_pattern[0] != obj:
-                        continue
-
-                    new_matching_objects.append(relation_pattern[2])
-
-                    type_of_obj_l = [t[2] for t in type_of_patterns if t[0] == relation_pattern[0]]
-                    type_of_obj = []
-                    for l in type_of_obj_l:
-                        type_of_obj.extend(l)
-                    if type_of_obj is None:
-                        raise ValueError(f'No type_of pattern found for object {relation_pattern[0]}')
-
-                    type_of_uuids = [asset.uuid for asset in self.collection.get_node_objects_by_types(type_of_obj)]
-                    if not type_of_uuids:
-                        continue
-                    try:
-                        self.collect_relation_info_by_sources_or_targets(uuids=type_of_uuids, ignore_duplicates=True)
-                    except AssetsMissingError as e:
-                        self.collect_asset_info(uuids=e.uuids)
-                        self.collect_relation_info_by_sources_or_targets(uuids=type_of_uuids, ignore_duplicates=True)
-
-                relation_patterns = [t for t in relation_patterns if t[0] != obj]
-            matching_objects = new_matching_objects
+        self.start_collecting_from_starting_uuids_using_plan(starting_uuids=starting_uuids,
+                                                             plan=QueryPlan.from_pattern(pattern))
+
+    def start_collecting_from_starting_uuids_using_plan(self, starting_uuids: [str], plan: QueryPlan,
+                                                        statistics: Counter = None) -> None:
+        if statistics is None:
+            statistics = Counter()
+        self.collect_missing_asset_info(uuids=starting_uuids, statistics=statistics)
+
+        for step in plan.steps:
+            # sorted, so the same collection sends the same searches (and a recorded cassette can be replayed)
+            type_of_uuids = sorted(asset.uuid for asset in self.collection.get_node_objects_by_types(step.source_types))
+            frontier_uuids = self.get_frontier_uuids(uuids=type_of_uuids, relation_types=step.relation_types)
+            statistics['skipped_uuids'] += len(type_of_uuids) - len(frontier_uuids)
+            if not frontier_uuids:
+                continue
+            self.expand_relations_of_uuids(uuids=frontier_uuids, relation_types=step.relation_types,
+                                           statistics=statistics)
+
+    def collect_missing_asset_info(self, uuids: [str], statistics: Counter = None) -> None:
+        missing_uuids = [uuid for uuid in uuids if uuid not in self.collection.object_dict]
+        if statistics is not None:
+            statistics['fetched_assets'] += len(missing_uuids)
+            statistics['skipped_assets'] += len(uuids) - len(missing_uuids)
+        if missing_uuids:
+            self.collect_asset_info(uuids=missing_uuids)
+
+    def get_frontier_uuids(self, uuids: [str], relation_types: [str] = None) -> [str]:
+        # only the assets of which the relations (of the given types) have not been collected yet
+        if relation_types is None:
+            return [uuid for uuid in uuids if (uuid, None) not in self.expanded_asset_relation_pairs]
+        return [uuid for uuid in uuids
+                if (uuid, None) not in self.expanded_asset_relation_pairs and
+                any((uuid, relation_type) not in self.expanded_asset_relation_pairs for relation_type in relation_types)]
+
+    def expand_relations_of_uuids(self, uuids: [str], relation_types: [str] = None, statistics: Counter = None
+                                  ) -> None:
+        # fetch the missing assets before adding the relations instead of querying the same relations twice
+        if self.asset_cache_manager is not None:
+            relations = self.get_assetrelaties_by_source_or_target_uuids_using_cache(
+                uuids=uuids, relation_types=relation_types)
+        else:
+            relations = list(self.get_assetrelaties_by_source_or_target_uuids(uuids=uuids,
+                                                                              relation_types=relation_types))
+        linked_uuids = {relation[key]['@id'][39:75] for relation in relations
+                        for key in ('RelatieObject.bron', 'RelatieObject.doel')}
+        self.collect_missing_asset_info(uuids=sorted(linked_uuids), statistics=statistics)
+        self._common_collect_relation_info(iter(relations), ignore_duplicates=True)
+        if statistics is not None:
+            statistics['relation_queries'] += 1
+            statistics['expanded_uuids'] += len(uuids)
+
+        if relation_types is None:
+            self.expanded_asset_relation_pairs.update((uuid, None) for uuid in uuids)
+        else:
+            self.expanded_asset_relation_pairs.update(
+                (uuid, relation_type) for uuid in uuids for relation_type in relation_types)
 
     @classmethod
     def order_patterns_for_object(cls, obj: str, relation_patterns: [tuple[str, str, str]]) -> [tuple[str, str, str]]:
-        ordered_patterns = []
-        for relation_pattern in relation_patterns:
-            if relation_pattern[2] == obj:
-                ordered_patterns.append(AssetInfoCollector.reverse_relation_pattern(relation_pattern))
-            else:
-                ordered_patterns.append(relation_pattern)
-        return ordered_patterns
-
+        return QueryPlan.order_patterns_for_object(obj, relation_patterns)
 
     @classmethod
     def reverse_relation_pattern(cls, relation_pattern: tuple[str, str, str]) -> tuple[str, str, str]:
-        rel_str = relation_pattern[1]
-        parts = re.match('(<?-)\\[(r.+)](->?)', rel_str).groups()
-        parts_2 = parts[0].replace('<', '>')[::-1]
-        parts_0 = parts[2].replace('>', '<')[::-1]
-
-        return relation_pattern[2], f'{parts_0}[{parts[1]}]{parts_2}', relation_pattern[0]
\ No newline at end of file
+        return QueryPlan.reverse_relation_pattern(relation_pattern)
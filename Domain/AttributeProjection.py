@@ -0,0 +1,61 @@
+ALL_TYPES = '*'
+
+# the dragers and legacy dragers of which the reports compare the location (pov legacy)
+drager_types = ['onderdeel#WVLichtmast', 'onderdeel#WVConsole', 'onderdeel#PunctueleVerlichtingsmast']
+legacy_drager_types = ['lgc:installatie#VPLMast', 'lgc:installatie#VPConsole', 'lgc:installatie#VPBevestig']
+
+# the attributes of the assets that are used to create the reports, per type ('*' for every type), all other attributes
+# are dropped when the assets are added to a collection with this projection
+report_attribute_projection = {
+    ALL_TYPES: frozenset({
+        'AIMNaamObject.naam',
+        'AIMObject.datumOprichtingObject', 'AIMObject.theoretischeLevensduur',
+        'AIMToestand.toestand',
+        'Armatuurcontroller.ipAdres', 'Armatuurcontroller.isDummydot', 'Armatuurcontroller.merk',
+        'Armatuurcontroller.modelnaam', 'Armatuurcontroller.serienummer',
+        'Buitenkast.ipKlasse', 'Buitenkast.verfraaid',
+        'Controller.batchnummer', 'Controller.dNSNaam', 'Controller.firmwareversie', 'Controller.iPAdres',
+        'Controller.serienummer',
+        'EMDraagconstructie.elekktrischeBeveiliging',
+        'FirmwareObject.firmwareversie',
+        'Kast.afmeting', 'Kast.heeftVerlichting', 'Kast.kastmateriaal',
+        'LEDDriver.maximaalVermogen', 'LEDDriver.maximaleAanstuurstroom', 'LEDDriver.merk', 'LEDDriver.modelnaam',
+        'LEDDriver.protocol',
+        'Lichtmast.beschermlaag', 'Lichtmast.dwarsdoorsnede', 'Lichtmast.heeftAntiVandalismeBeugel',
+        'Lichtmast.heeftStopcontact', 'Lichtmast.kleur', 'Lichtmast.leverancier', 'Lichtmast.masthoogte',
+        'Lichtmast.masttype', 'Lichtmast.normeringBotsvriendelijk',
+        'Montagekast.opstelhoogte',
+        'NaampadObject.naampad',
+        'Segmentcontroller.beveiligingssleutel', 'Segmentcontroller.merknaam', 'Segmentcontroller.modelnaam',
+        'Verlichtingstoestel.heeftAansluitkastGeintegreerd', 'Verlichtingstoestel.merk',
+        'Verlichtingstoestel.modelnaam', 'Verlichtingstoestel.stroomkringnummer',
+        'Verlichtingstoestel.systeemvermogen', 'Verlichtingstoestel.verlichtGebied',
+        'VerlichtingstoestelConnector.besturingsconnector',
+        'VerlichtingstoestelLED.aantalTeVerlichtenRijstroken', 'VerlichtingstoestelLED.heeftAntiVandalisme',
+        'VerlichtingstoestelLED.isFaunavriendelijk', 'VerlichtingstoestelLED.isLijnvormig',
+        'VerlichtingstoestelLED.kleurArmatuur', 'VerlichtingstoestelLED.kleurTemperatuur',
+        'VerlichtingstoestelLED.lichtkleur', 'VerlichtingstoestelLED.lichtpuntHoogte',
+        'VerlichtingstoestelLED.lumenOutput', 'VerlichtingstoestelLED.overhang', 'VerlichtingstoestelLED.protector',
+        'VerlichtingstoestelLED.tussenafstandLED', 'VerlichtingstoestelLED.verlichtingsNiveau',
+        'WVLichtmast.aantalArmen', 'WVLichtmast.armlengte', 'WVLichtmast.bevestigingToestellen',
+        'lgc:EMObject.aantalTeVerlichtenRijvakkenLed', 'lgc:EMObject.aantalVerlichtingstoestellen',
+        'lgc:EMObject.contractnummerLeveringLed', 'lgc:EMObject.datumInstallatieLed',
+        'lgc:EMObject.kleurtemperatuurLed', 'lgc:EMObject.lampType', 'lgc:EMObject.ledVerlichting',
+        'lgc:EMObject.lichtpunthoogteTovRijweg', 'lgc:EMObject.lumenPakketLed', 'lgc:EMObject.overhangLed',
+        'lgc:EMObject.serienummerArmatuurcontroller', 'lgc:EMObject.verlichtingsniveauLed',
+        'lgc:EMObject.verlichtingstoestelMerkEnType', 'lgc:EMObject.verlichtingstoestelSysteemvermogen',
+        'lgc:EMObject.verlichtingstype',
+        'lgc:VPBevestig.bevestigingBuitenGebruik',
+        'lgc:VPConsole.consoleBuitenGebruik', 'lgc:VPConsole.ralKleurVpconsole',
+        'lgc:VPLMast.aantalArmen', 'lgc:VPLMast.armlengte', 'lgc:VPLMast.lichtmastBuitenGebruik',
+        'lgc:VPLMast.merkEnTypeArmatuurcontroller1', 'lgc:VPLMast.merkEnTypeArmatuurcontroller2',
+        'lgc:VPLMast.merkEnTypeArmatuurcontroller3', 'lgc:VPLMast.merkEnTypeArmatuurcontroller4',
+        'lgc:VPLMast.paalhoogte', 'lgc:VPLMast.ralKleurVplmast', 'lgc:VPLMast.serienummerArmatuurcontroller1',
+        'lgc:VPLMast.serienummerArmatuurcontroller2', 'lgc:VPLMast.serienummerArmatuurcontroller3',
+        'lgc:VPLMast.serienummerArmatuurcontroller4',
+        'loc:Locatie.geometrie'
+    }),
+    # only used to compare the location of dragers and legacy dragers
+    **{short_type: frozenset({'geo:Geometrie.log'}) for short_type in drager_types},
+    **{short_type: frozenset({'loc:Locatie.puntlocatie'}) for short_type in legacy_drager_types},
+}
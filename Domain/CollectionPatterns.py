@@ -0,0 +1,104 @@
+from Domain.QueryPlan import QueryPlan
+
+# the patterns used to collect the asset info of the assets in a delivery, compiled once into reusable plans
+toestel_pattern = [('uuids', 'of', 'a'),
+                   ('a', 'type_of', ['VerlichtingstoestelLED']),
+                   ('a', '-[r1]-', 'b'),
+                   ('b', 'type_of', ['onderdeel#WVLichtmast', 'onderdeel#WVConsole']),
+                   ('r1', 'type_of', ['onderdeel#Bevestiging']),
+                   ('a', '-[r1]-', 'c'),
+                   ('c', 'type_of', ['onderdeel#Armatuurcontroller']),
+                   ('a', '-[r2]-', 'd'),
+                   ('d', 'type_of', ['onderdeel#LEDDriver']),
+                   ('r2', 'type_of', ['onderdeel#Bevestiging', 'onderdeel#Sturing']),
+                   ('c', '-[r3]->', 'd'),
+                   ('r3', 'type_of', ['onderdeel#VoedtAangestuurd']),
+                   ('e', '-[r3]->', 'c'),
+                   ('e', 'type_of', ['onderdeel#Montagekast']),
+                   ('b', '-[r1]-', 'e'),
+                   ('b', '-[r4]->', 'f'),
+                   ('a', '-[r4]->', 'f'),
+                   ('f', 'type_of', ['lgc:installatie#VPLMast', 'lgc:installatie#VPConsole',
+                                     'lgc:installatie#VPBevestig']),
+                   ('r4', 'type_of', ['onderdeel#HoortBij']),
+                   ('c', '-[r5]-', 'g'),
+                   ('g', 'type_of', ['onderdeel#Segmentcontroller']),
+                   ('r5', 'type_of', ['onderdeel#Sturing']),
+                   ('g', '-[r4]-', 'h'),
+                   ('h', 'type_of', ['lgc:installatie#SegC'])]
+armatuurcontroller_pattern = [('uuids', 'of', 'a'),
+                              ('a', 'type_of', ['onderdeel#Armatuurcontroller']),
+                              ('a', '-[r1]-', 'b'),
+                              ('b', 'type_of', ['onderdeel#VerlichtingstoestelLED']),
+                              ('r1', 'type_of', ['onderdeel#Bevestiging']),
+                              ('a', '-[r2]->', 'c'),
+                              ('c', 'type_of', ['onderdeel#LEDDriver']),
+                              ('e', '-[r2]->', 'a'),
+                              ('e', 'type_of', ['onderdeel#Montagekast']),
+                              ('r2', 'type_of', ['onderdeel#VoedtAangestuurd']),
+                              ('a', '-[r3]-', 'd'),
+                              ('d', 'type_of', ['onderdeel#Segmentcontroller']),
+                              ('r3', 'type_of', ['onderdeel#Sturing']),
+                              ('b', '-[r4]-', 'c'),
+                              ('r4', 'type_of', ['onderdeel#Bevestiging', 'onderdeel#Sturing']),
+                              ('d', '-[r5]->', 'f'),
+                              ('f', 'type_of', ['lgc:installatie#SegC']),
+                              ('r5', 'type_of', ['onderdeel#HoortBij']),
+                              ('b', '-[r1]-', 'g'),
+                              ('e', '-[r1]-', 'g'),
+                              ('g', 'type_of', ['onderdeel#WVLichtmast', 'onderdeel#WVConsole']),
+                              ('b', '-[r5]->', 'h'),
+                              ('g', '-[r5]->', 'h'),
+                              ('h', 'type_of', ['lgc:installatie#VPLMast', 'lgc:installatie#VPConsole',
+                                                'lgc:installatie#VPBevestig'])]
+drager_pattern = [('uuids', 'of', 'a'),
+                  ('a', 'type_of', ['onderdeel#WVLichtmast', 'onderdeel#WVConsole']),
+                  ('a', '-[r1]-', 'b'),
+                  ('a', '-[r1]-', 'd'),
+                  ('b', 'type_of', ['onderdeel#VerlichtingstoestelLED']),
+                  ('d', 'type_of', ['onderdeel#Montagekast']),
+                  ('a', '-[r2]->', 'c'),
+                  ('c', 'type_of', ['lgc:installatie#VPLMast', 'lgc:installatie#VPConsole']),
+                  ('r1', 'type_of', ['onderdeel#Bevestiging']),
+                  ('r2', 'type_of', ['onderdeel#HoortBij']),
+                  ('b', '-[r1]-', 'e'),
+                  ('b', '-[r1]-', 'f'),
+                  ('e', 'type_of', ['onderdeel#LEDDriver']),
+                  ('f', 'type_of', ['onderdeel#Armatuurcontroller']),
+                  ('d', '-[r3]->', 'f'),
+                  ('f', '-[r3]->', 'e'),
+                  ('r3', 'type_of', ['onderdeel#VoedtAangestuurd']),
+                  ('f', '-[r4]-', 'g'),
+                  ('g', 'type_of', ['onderdeel#Segmentcontroller']),
+                  ('r4', 'type_of', ['onderdeel#Sturing']),
+                  ('g', '-[r2]->', 'h'),
+                  ('h', 'type_of', ['lgc:installatie#SegC'])]
+legacy_drager_pattern = [('uuids', 'of', 'a'),
+                         ('a', 'type_of', ['lgc:installatie#VPLMast', 'lgc:installatie#VPConsole',
+                                           'lgc:installatie#VPBevestig']),
+                         ('a', '<-[r1]-', 'b'),
+                         ('a', '<-[r1]-', 'e'),
+                         ('b', 'type_of', ['onderdeel#WVLichtmast', 'onderdeel#WVConsole']),
+                         ('e', 'type_of', ['onderdeel#VerlichtingstoestelLED']),
+                         ('r1', 'type_of', ['onderdeel#HoortBij']),
+                         ('c', 'type_of', ['lgc:installatie#SegC']),
+                         ('c', '<-[r1]-', 'd'),
+                         ('d', 'type_of', ['onderdeel#Segmentcontroller']),
+                         ('b', '-[r2]-', 'e'),
+                         ('b', '-[r2]-', 'f'),
+                         ('f', 'type_of', ['onderdeel#Montagekast']),
+                         ('r2', 'type_of', ['onderdeel#Bevestiging']),
+                         ('e', '-[r2]-', 'g'),
+                         ('e', '-[r2]-', 'h'),
+                         ('g', 'type_of', ['onderdeel#LEDDriver']),
+                         ('h', 'type_of', ['onderdeel#Armatuurcontroller']),
+                         ('f', '-[r3]->', 'h'),
+                         ('h', '-[r3]->', 'g'),
+                         ('r3', 'type_of', ['onderdeel#VoedtAangestuurd']),
+                         ('h', '-[r4]-', 'd'),
+                         ('r4', 'type_of', ['onderdeel#Sturing'])]
+
+toestel_plan = QueryPlan.from_pattern(toestel_pattern)
+armatuurcontroller_plan = QueryPlan.from_pattern(armatuurcontroller_pattern)
+drager_plan = QueryPlan.from_pattern(drager_pattern)
+legacy_drager_plan = QueryPlan.from_pattern(legacy_drager_pattern)
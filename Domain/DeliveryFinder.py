@@ -1,21 +1,35 @@
+import asyncio
 import datetime
 import logging
 import time
 import traceback
+from concurrent.futures import ThreadPoolExecutor, Future
 from typing import Tuple
 
+from API.AsyncEMInfraRestClient import AsyncEMInfraRestClient
 from API.DavieRestClient import DavieRestClient
 from API.EMInfraRestClient import EMInfraRestClient
+from Database.AssetCacheManager import AssetCacheManager
 from Database.DbManager import DbManager
 from Domain.DavieDomain import ZoekTerm
 from Domain.EMInfraDomain import FeedProxyPage, ProxyEntryObject
 
 
 class DeliveryFinder:
-    def __init__(self, em_infra_client: EMInfraRestClient, davie_client: DavieRestClient, db_manager: DbManager):
+    def __init__(self, em_infra_client: EMInfraRestClient, davie_client: DavieRestClient, db_manager: DbManager,
+                 batch_page_size: int = 5, prefetch_page_count: int = 0,
+                 asset_cache_manager: AssetCacheManager | None = None,
+                 async_em_infra_client: AsyncEMInfraRestClient | None = None):
         self.em_infra_client = em_infra_client
         self.davie_client = davie_client
         self.db_manager = db_manager
+        # the assets and relations that change in the feed are removed from the local asset cache
+        self.asset_cache_manager = asset_cache_manager
+        self.batch_page_size = batch_page_size
+        # with an async client, the event contexts and events of the deliveries are requested at the same time
+        self.async_em_infra_client = async_em_infra_client
+        # catch-up mode: number of 'previous' feed pages that are fetched ahead while the current page is filtered
+        self.prefetch_page_count = prefetch_page_count
         self.allowed_dossiers = {
             'VWT/WU/2020/007.001', 'VWT/WU/2020/007.002', 'VWT/WU/2020/007.003', 'VWT/WU/2020/007.004',
             'VWT/WU/2020/007.005', 'WVT/WU/2020/007.003', 'VWT/EW/2020/024-1', 'VWT/EW/2020/024-2', 'VWT/EW/2020/024-3',
@@ -68,11 +82,14 @@ class DeliveryFinder:
                     self.sleep(30)
                     continue
 
+                changed_uuids = set()
                 events, feed_page_number, event_id = self.find_events_with_context(
                     current_feedproxy_event=current_feedproxy_event, current_feedproxy_page=current_feedproxy_page,
-                    proxy_feed_page=proxy_feed_page)
+                    proxy_feed_page=proxy_feed_page, batch_page_size=self.batch_page_size,
+                    prefetch_page_count=self.prefetch_page_count, changed_uuids=changed_uuids)
                 events_to_process = self.get_events_ready_to_process(events=events)
-                self.save_events_to_process_to_db(events_to_process, feed_page_number, event_id)
+                self.save_events_to_process_to_db(events_to_process, feed_page_number, event_id,
+                                                  changed_uuids=changed_uuids)
 
             except Exception as e:
                 print(e)
@@ -94,6 +111,13 @@ class DeliveryFinder:
 
     def get_additional_attributes_of_deliveries(self) -> Tuple[str, str]:
         # find aanlevering in db without davie_uuid or referentie, get them and store them in db
+        if self.async_em_infra_client is not None:
+            em_infra_uuids = self.db_manager.get_delivery_uuids_without_reference()
+            event_contexts = asyncio.run(self.async_em_infra_client.get_event_contexts_by_uuids(
+                uuids=[str(em_infra_uuid) for em_infra_uuid in em_infra_uuids]))
+            for em_infra_uuid, event_context in zip(em_infra_uuids, event_contexts):
+                self.db_manager.update_delivery_description(em_infra_uuid=em_infra_uuid,
+                                                            description=event_context.omschrijving)
         while True:
             em_infra_uuid = self.db_manager.get_a_delivery_uuid_without_reference()
             if em_infra_uuid is None:
@@ -136,7 +160,10 @@ class DeliveryFinder:
     def find_asset_ids_by_delivery(self, context_string: str) -> set:
         context_list = self.em_infra_client.get_delivery_from_context_string(context_string=context_string)
         context_uuid = context_list.data[0].uuid
-        events = list(self.em_infra_client.get_feed_events_by_eventcontext_id(context_uuid))
+        if self.async_em_infra_client is not None:
+            events = asyncio.run(self.async_em_infra_client.get_feed_events_by_eventcontext_id(context_uuid))
+        else:
+            events = list(self.em_infra_client.get_feed_events_by_eventcontext_id(context_uuid))
 
         event_dict = {}
         for event in events:
@@ -157,43 +184,92 @@ class DeliveryFinder:
         # get em-infra uuid by delivery context string
         # get events from
 
-    def find_events_with_context(self, current_feedproxy_event: str, current_feedproxy_page: str, 
-                                 proxy_feed_page: FeedProxyPage, batch_page_size: int = 5
+    def find_events_with_context(self, current_feedproxy_event: str, current_feedproxy_page: str,
+                                 proxy_feed_page: FeedProxyPage, batch_page_size: int = 5,
+                                 prefetch_page_count: int = 0, changed_uuids: set[str] | None = None
                                  ) -> tuple[list[ProxyEntryObject], str, str]:
         collected_events = []
         page_count = 0
-        while True:
-            if proxy_feed_page is None:
-                proxy_feed_page = self.fetch_current_feed_page(current_feedproxy_page)
-
-            entries = reversed(proxy_feed_page.entries)
-            for entry in entries:
-                if current_feedproxy_event is not None:
-                    if entry.id == current_feedproxy_event:
-                        current_feedproxy_event = None
-                    continue
-
-                if entry.content.value.context_id is None:
-                    continue
-                asset_types = [t[37:] for t in entry.content.value.aim_ids]
-                if any(t in self.filtered_asset_types for t in asset_types):
-                    collected_events.append(entry)
-
-            current_feedproxy_event = proxy_feed_page.entries[0].id
-            if page_count >= batch_page_size:
-                break
-            page_count += 1
-
-            previous_link = next((l for l in proxy_feed_page.links if l.rel == 'previous'), None)
-            if previous_link is None:
-                break
-
-            proxy_feed_page = None
-            current_feedproxy_page = previous_link.href.split('/')[1]
-            current_feedproxy_event = None
+        prefetched_pages: dict[str, Future] = {}
+        executor = None
+        last_feedproxy_page = None
+        if prefetch_page_count > 0:
+            executor = ThreadPoolExecutor(max_workers=prefetch_page_count, thread_name_prefix='feed_prefetch')
+            # pages past the newest page do not exist yet, so they are never prefetched
+            last_feedproxy_page = self.get_last_feedproxy_page_number()
+
+        try:
+            while True:
+                if proxy_feed_page is None:
+                    proxy_feed_page = self.get_prefetched_or_fetch_feed_page(
+                        current_feedproxy_page=current_feedproxy_page, prefetched_pages=prefetched_pages)
+
+                if executor is not None:
+                    self.prefetch_feed_pages(executor=executor, prefetched_pages=prefetched_pages,
+                                             current_feedproxy_page=current_feedproxy_page,
+                                             page_count=min(prefetch_page_count, batch_page_size - page_count),
+                                             last_feedproxy_page=last_feedproxy_page)
+
+                entries = reversed(proxy_feed_page.entries)
+                for entry in entries:
+                    if current_feedproxy_event is not None:
+                        if entry.id == current_feedproxy_event:
+                            current_feedproxy_event = None
+                        continue
+
+                    if changed_uuids is not None:
+                        # the uuids of the event as well: an event of a relation also names the assets on both sides,
+                        # which are not known to the cache when the relation is new or was never cached
+                        changed_uuids.update(aim_id[:36] for aim_id in entry.content.value.aim_ids or [])
+                        changed_uuids.update(entry.content.value.uuids or [])
+                    if entry.content.value.context_id is None:
+                        continue
+                    asset_types = [t[37:] for t in entry.content.value.aim_ids]
+                    if any(t in self.filtered_asset_types for t in asset_types):
+                        collected_events.append(entry)
+
+                current_feedproxy_event = proxy_feed_page.entries[0].id
+                if page_count >= batch_page_size:
+                    break
+                page_count += 1
+
+                previous_link = next((l for l in proxy_feed_page.links if l.rel == 'previous'), None)
+                if previous_link is None:
+                    break
+
+                proxy_feed_page = None
+                current_feedproxy_page = previous_link.href.split('/')[1]
+                current_feedproxy_event = None
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=False, cancel_futures=True)
 
         return collected_events, current_feedproxy_page, current_feedproxy_event
 
+    def get_last_feedproxy_page_number(self) -> int:
+        feedproxy_page = self.em_infra_client.get_current_feed_page()
+        return int(next(l for l in feedproxy_page.links if l.rel == 'self').href.split('/')[1])
+
+    def prefetch_feed_pages(self, executor: ThreadPoolExecutor, prefetched_pages: dict[str, Future],
+                            current_feedproxy_page: str, page_count: int, last_feedproxy_page: int) -> None:
+        # the 'previous' link of page n points to page n + 1, so the next pages can be requested up front
+        last_page_number = min(int(current_feedproxy_page) + page_count, last_feedproxy_page)
+        for page_number in range(int(current_feedproxy_page) + 1, last_page_number + 1):
+            if str(page_number) in prefetched_pages:
+                continue
+            prefetched_pages[str(page_number)] = executor.submit(self.fetch_current_feed_page, str(page_number))
+
+    def get_prefetched_or_fetch_feed_page(self, current_feedproxy_page: str, prefetched_pages: dict[str, Future]
+                                          ) -> FeedProxyPage:
+        future = prefetched_pages.pop(current_feedproxy_page, None)
+        if future is not None:
+            try:
+                return future.result()
+            except Exception as e:
+                # a prefetched page can fail (f.e. a timeout), fetch it again to raise a real error
+                logging.info(f'prefetching feed page {current_feedproxy_page} failed: {e}')
+        return self.fetch_current_feed_page(current_feedproxy_page)
+
     @staticmethod
     def get_events_ready_to_process(events: list[ProxyEntryObject]) -> {str: {str: datetime.datetime}}:
         # may be used to also add asset uuid and save those to the db as well
@@ -207,17 +283,23 @@ class DeliveryFinder:
         return event_dict
 
     def save_events_to_process_to_db(self, events_to_process: {str: {str: datetime.datetime}}, feed_page_number: str,
-                                     event_id: str):
-        for context_id, assets in events_to_process.items():
+                                     event_id: str, changed_uuids: set[str] | None = None):
+        for context_id in events_to_process:
             if self.db_manager.get_a_delivery_by_em_infra_uuid(em_infra_uuid=context_id) is not None:
                 logging.info(f'No need to add delivery {context_id} to the database.')
             else:
                 self.db_manager.add_delivery(context_id)
 
+        if events_to_process:
             self.get_additional_attributes_of_deliveries()
-            if self.db_manager.get_a_delivery_by_em_infra_uuid(em_infra_uuid=context_id) is not None:
-                # only insert assets if the delivery is a correct one
-                self.db_manager.upsert_assets_delivery(delivery_em_infra_uuid=context_id, asset_timestamp_dict=assets)
+        # only insert assets if the delivery is a correct one, all deliveries of the feed batch in one write
+        self.db_manager.upsert_assets_deliveries(
+            {context_id: assets for context_id, assets in events_to_process.items()
+             if self.db_manager.get_a_delivery_by_em_infra_uuid(em_infra_uuid=context_id) is not None})
+
+        # invalidate before moving the checkpoint, so no change in the feed can be missed by the cache
+        if changed_uuids and self.asset_cache_manager is not None:
+            self.asset_cache_manager.invalidate_uuids(uuids=list(changed_uuids))
 
         self.db_manager.set_state_variable('feedproxy_page', feed_page_number)
         self.db_manager.set_state_variable('feedproxy_event_id', event_id)
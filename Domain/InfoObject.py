@@ -1,4 +1,8 @@
 import abc
+import sys
+from typing import NamedTuple
+
+from Domain.Enums import Direction
 
 directional_relations = {
     "onderdeel#HeeftAanvullendeGeometrie",
@@ -38,30 +42,72 @@ def full_uri_to_short_type(uri: str) -> str:
     return f'lgc:{short_uri}' if uri.startswith('https://lgc') else short_uri
 
 
+def short_type_to_full_uri(short_type: str) -> str:
+    if short_type.startswith('lgc:'):
+        return f'https://lgc.data.wegenenverkeer.be/ns/{short_type[4:]}'
+    if short_type == 'onderdeel#HoortBij':
+        return 'https://grp.data.wegenenverkeer.be/ns/onderdeel#HoortBij'
+    return f'https://wegenenverkeer.data.vlaanderen.be/ns/{short_type}'
+
+
 class InfoObject(abc.ABC):
+    # slotted and with interned type strings, a collection holds hundreds of thousands of these objects
+    __slots__ = ('uuid', 'short_type', 'active', 'attr_dict')
+    is_relation: bool
+    is_directional_relation: bool
+
     @abc.abstractmethod
     def __init__(self, uuid: str, short_type: str, attr_dict: dict, active: bool = True):
         self.uuid: str = uuid
-        self.short_type: str = short_type
+        self.short_type: str = sys.intern(short_type)
         self.active: bool = active
         self.attr_dict: dict = attr_dict
-        self.is_relation: bool
-        self.is_directional_relation: bool
+
+
+edge_keys: dict[tuple[Direction, str], tuple[Direction, str]] = {}
+
+
+class RelationEdge(NamedTuple):
+    direction: Direction
+    relation_object: 'RelationInfoObject'
+    node_object: 'NodeInfoObject'
 
 
 class NodeInfoObject(InfoObject):
+    __slots__ = ('edges',)
+    is_relation = False
+    is_directional_relation = False
+
     def __init__(self, uuid: str, short_type: str, attr_dict: dict, active: bool = True):
         super().__init__(uuid, short_type, attr_dict, active)
-        self.relations: dict = {}
-        self.is_relation: bool = False
-        self.is_directional_relation: bool = False
+        # adjacency index: relation name > (direction, short type of the node on the other side) > uuid of that node
+        # > edge, so a filtered traversal looks up the relation names and only visits the matching edges
+        self.edges: dict[str, dict[tuple[Direction, str], dict[str, RelationEdge]]] = {}
+
+    def add_edge(self, relation_name: str, edge: RelationEdge) -> None:
+        key = (edge.direction, edge.node_object.short_type)
+        # like the interned strings, all nodes share one tuple per distinct key
+        key = edge_keys.setdefault(key, key)
+        self.edges.setdefault(relation_name, {}).setdefault(key, {})[edge.node_object.uuid] = edge
+
+    @property
+    def relations(self) -> dict[str, dict[str, RelationEdge]]:
+        # slow compatibility path: merges the edges per relation name on every access, use edges or
+        # AssetCollection.get_neighbour_edges instead
+        return {relation_name: {uuid: edge for edges in edges_by_key.values() for uuid, edge in edges.items()}
+                for relation_name, edges_by_key in self.edges.items()}
 
 
 class RelationInfoObject(InfoObject):
+    __slots__ = ('bron', 'doel')
+    is_relation = True
+
     def __init__(self, uuid: str, short_type: str, attr_dict: dict, bron: NodeInfoObject, doel: NodeInfoObject,
                  active: bool = True):
         super().__init__(uuid, short_type, attr_dict, active)
-        self.is_relation: bool = True
-        self.is_directional_relation: bool = (self.is_relation and short_type not in non_directional_relations)
         self.bron: NodeInfoObject = bron
         self.doel: NodeInfoObject = doel
+
+    @property
+    def is_directional_relation(self) -> bool:
+        return self.short_type not in non_directional_relations
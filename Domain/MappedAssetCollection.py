@@ -0,0 +1,193 @@
+import json
+from pathlib import Path
+from typing import Generator
+from weakref import WeakValueDictionary
+
+import numpy as np
+
+from Domain.AssetCollection import AssetCollection
+from Domain.Enums import Direction
+from Exceptions.AssetsMissingError import AssetsMissingError
+
+
+class MappedNodeInfoObject:
+    # a node of a MappedAssetCollection, the attributes are only decoded when they are used
+    __slots__ = ('collection', 'index', '_attr_dict', '__weakref__')
+    is_relation = False
+
+    def __init__(self, collection: 'MappedAssetCollection', index: int):
+        self.collection = collection
+        self.index = index
+        self._attr_dict = None
+
+    def __reduce__(self):
+        # pickles as the collection (its path) and the index of the node
+        return self.collection.get_node_object_by_index, (self.index,)
+
+    @property
+    def uuid(self) -> str:
+        return self.collection.node_uuids[self.index].decode()
+
+    @property
+    def short_type(self) -> str:
+        return self.collection.type_names[self.collection.node_types[self.index]]
+
+    @property
+    def active(self) -> bool:
+        return bool(self.collection.node_active[self.index])
+
+    @property
+    def attr_dict(self) -> dict:
+        if self._attr_dict is None:
+            start, end = self.collection.node_attr_offsets[self.index:self.index + 2]
+            self._attr_dict = json.loads(self.collection.node_attr_data[start:end].tobytes())
+        return self._attr_dict
+
+
+class MappedAssetCollection:
+    # read-only collection of which the node table, the edges (CSR layout) and the attributes are memory-mapped from
+    # the files of a graph image, so worker processes share the pages of one image instead of copying the collection
+    array_names = ['node_uuids', 'sorted_uuids', 'sorted_uuid_indices', 'node_types', 'node_active',
+                   'node_attr_offsets', 'node_attr_data', 'type_node_offsets', 'type_nodes', 'edge_offsets',
+                   'edge_relation_names', 'edge_directions', 'edge_nodes', 'edge_active']
+    directions = [Direction.NONE, Direction.WITH, Direction.REVERSED]
+
+    def __init__(self, image_path: Path):
+        self.image_path = image_path
+        for array_name in self.array_names:
+            # plain ndarray views on the mapped files, indexing a np.memmap goes through python code
+            setattr(self, array_name, np.asarray(np.load(image_path / f'{array_name}.npy', mmap_mode='r')))
+        with open(image_path / 'type_names.json') as type_names_file:
+            self.type_names: [str] = json.load(type_names_file)
+        self.type_ids: dict[str, int] = {type_name: type_id for type_id, type_name in enumerate(self.type_names)}
+        # a node is returned as the same object as long as it is used, within one process
+        self._node_objects: WeakValueDictionary[int, MappedNodeInfoObject] = WeakValueDictionary()
+
+    def __reduce__(self):
+        # a worker process maps the same files again instead of receiving a copy of the arrays
+        return MappedAssetCollection, (self.image_path,)
+
+    @classmethod
+    def write_graph_image(cls, collection: AssetCollection, image_path: Path) -> None:
+        image_path.mkdir(parents=True, exist_ok=True)
+        node_objects = list(collection.get_node_objects())
+        node_indices = {node.uuid: index for index, node in enumerate(node_objects)}
+        type_ids: dict[str, int] = {}
+
+        def get_type_id(type_name: str) -> int:
+            return type_ids.setdefault(type_name, len(type_ids))
+
+        node_uuids = np.array([node.uuid.encode() for node in node_objects], dtype=bytes)
+        sorted_uuid_indices = np.argsort(node_uuids, kind='stable').astype(np.int32)
+        attr_data = [json.dumps(node.attr_dict).encode() for node in node_objects]
+
+        # the nodes grouped by type (the node types get the first ids) and the edges grouped by node, in the order of
+        # the in-memory collection
+        type_nodes = []
+        for short_type in collection.get_node_types():
+            get_type_id(short_type)
+            type_nodes.extend(node_indices[uuid] for uuid in collection.short_uri_dict[short_type])
+        node_types = np.array([get_type_id(node.short_type) for node in node_objects], dtype=np.int32)
+        type_node_counts = np.bincount(node_types, minlength=len(type_ids))
+
+        edge_counts, edge_relation_names, edge_directions, edge_nodes, edge_active = [], [], [], [], []
+        for node in node_objects:
+            edge_counts.append(sum(len(edges) for edges_by_key in node.edges.values()
+                                   for edges in edges_by_key.values()))
+            for relation_name, edges_by_key in node.edges.items():
+                for (direction, _), edges in edges_by_key.items():
+                    for edge in edges.values():
+                        edge_relation_names.append(get_type_id(relation_name))
+                        edge_directions.append(cls.directions.index(direction))
+                        edge_nodes.append(node_indices[edge.node_object.uuid])
+                        edge_active.append(edge.relation_object.active)
+
+        arrays = {
+            'node_uuids': node_uuids,
+            'sorted_uuids': node_uuids[sorted_uuid_indices],
+            'sorted_uuid_indices': sorted_uuid_indices,
+            'node_types': node_types,
+            'node_active': np.array([node.active for node in node_objects], dtype=bool),
+            'node_attr_offsets': np.concatenate([[0], np.cumsum([len(data) for data in attr_data])]).astype(np.int64),
+            'node_attr_data': np.frombuffer(b''.join(attr_data), dtype=np.uint8),
+            'type_node_offsets': np.concatenate([[0], np.cumsum(type_node_counts)]).astype(np.int64),
+            'type_nodes': np.array(type_nodes, dtype=np.int32),
+            'edge_offsets': np.concatenate([[0], np.cumsum(edge_counts)]).astype(np.int64),
+            'edge_relation_names': np.array(edge_relation_names, dtype=np.int32),
+            'edge_directions': np.array(edge_directions, dtype=np.int8),
+            'edge_nodes': np.array(edge_nodes, dtype=np.int32),
+            'edge_active': np.array(edge_active, dtype=bool)}
+        for array_name in cls.array_names:
+            np.save(image_path / f'{array_name}.npy', arrays[array_name])
+        with open(image_path / 'type_names.json', 'w') as type_names_file:
+            json.dump(list(type_ids), type_names_file)
+
+    def get_node_object_by_index(self, index: int) -> MappedNodeInfoObject:
+        node = self._node_objects.get(index)
+        if node is None:
+            node = self._node_objects[index] = MappedNodeInfoObject(collection=self, index=index)
+        return node
+
+    def get_node_index(self, uuid: str) -> int:
+        encoded_uuid = uuid.encode()
+        position = int(np.searchsorted(self.sorted_uuids, encoded_uuid))
+        if position == len(self.sorted_uuids) or self.sorted_uuids[position] != encoded_uuid:
+            raise AssetsMissingError(f"Object with uuid {uuid} does not exist within the collection.")
+        return int(self.sorted_uuid_indices[position])
+
+    def get_node_object_by_uuid(self, uuid: str) -> MappedNodeInfoObject:
+        return self.get_node_object_by_index(self.get_node_index(uuid))
+
+    def get_node_uuids(self) -> [str]:
+        return [uuid.decode() for uuid in self.node_uuids]
+
+    def get_node_types(self) -> [str]:
+        return [self.type_names[type_id] for type_id in range(len(self.type_node_offsets) - 1)
+                if self.type_node_offsets[type_id + 1] > self.type_node_offsets[type_id]]
+
+    def get_node_objects_by_types(self, list_of_short_types: [str]
+                                  ) -> Generator[MappedNodeInfoObject, None, None]:
+        for short_type in list_of_short_types:
+            type_id = self.type_ids.get(short_type)
+            if type_id is None:
+                continue
+            for index in self.type_nodes[self.type_node_offsets[type_id]:self.type_node_offsets[type_id + 1]]:
+                yield self.get_node_object_by_index(int(index))
+
+    def traverse_graph(self, start_uuid: str, relation_types: [str] = None, allowed_directions: [Direction] = None,
+                       filtered_node_types: [str] = None, return_type: str = 'uuid', return_only_active: bool = True
+                       ) -> Generator[str | MappedNodeInfoObject, None, None]:
+        if return_type not in ['uuid', 'info_object']:
+            raise ValueError(f"return_type {return_type} is not supported.")
+
+        for node in self.get_neighbours(start_uuid=start_uuid, relation_types=relation_types,
+                                        directions=allowed_directions, node_types=filtered_node_types,
+                                        only_active=return_only_active):
+            if return_type == 'uuid':
+                yield node.uuid
+            else:
+                yield node
+
+    def get_neighbours(self, start_uuid: str, relation_types: [str] = None, directions: [Direction] = None,
+                       node_types: [str] = None, only_active: bool = True) -> [MappedNodeInfoObject]:
+        # same filters and order as AssetCollection.get_neighbours; a node has few edges, so they are filtered in
+        # python, vectorising them costs more than it saves
+        start_index = self.get_node_index(start_uuid)
+        start, end = self.edge_offsets[start_index:start_index + 2].tolist()
+        edges = list(zip(self.edge_relation_names[start:end].tolist(), self.edge_directions[start:end].tolist(),
+                         self.edge_nodes[start:end].tolist(), self.edge_active[start:end].tolist()))
+        direction_ids = {self.directions.index(direction) for direction in directions or []}
+        node_type_ids = {self.type_ids.get(node_type, -1) for node_type in node_types or []}
+
+        neighbour_indices = []
+        for relation_type in relation_types or [None]:
+            relation_id = None if relation_type is None else self.type_ids.get(relation_type, -1)
+            for edge_relation_id, direction_id, node_index, edge_active in edges:
+                if ((relation_id is not None and edge_relation_id != relation_id) or
+                        (direction_ids and direction_id not in direction_ids) or
+                        (node_type_ids and self.node_types[node_index] not in node_type_ids)):
+                    continue
+                if only_active and (not edge_active or not self.node_active[node_index]):
+                    continue
+                neighbour_indices.append(node_index)
+        return [self.get_node_object_by_index(index) for index in neighbour_indices]
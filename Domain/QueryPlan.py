@@ -0,0 +1,100 @@
+import re
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class QueryPlanStep:
+    source: str
+    relation: str
+    target: str
+    source_types: tuple[str, ...]
+    relation_types: tuple[str, ...] | None  # None means all relation types
+
+
+@dataclass(frozen=True)
+class QueryPlan:
+    start_object: str
+    steps: tuple[QueryPlanStep, ...]
+
+    _cache = {}
+
+    @classmethod
+    def from_pattern(cls, pattern: [tuple[str, str, object]]) -> 'QueryPlan':
+        # compiling is only done once per distinct pattern, the plan is reused across batches
+        key = cls.pattern_to_key(pattern)
+        plan = cls._cache.get(key)
+        if plan is None:
+            plan = cls.compile(pattern)
+            cls._cache[key] = plan
+        return plan
+
+    @staticmethod
+    def pattern_to_key(pattern: [tuple[str, str, object]]) -> tuple:
+        return tuple((t[0], t[1], tuple(t[2]) if isinstance(t[2], list) else t[2]) for t in pattern)
+
+    @classmethod
+    def compile(cls, pattern: [tuple[str, str, object]]) -> 'QueryPlan':
+        uuid_pattern = next((t[2] for t in pattern if t[:2] == ('uuids', 'of')), None)
+        type_of_patterns = [t for t in pattern if t[1] == 'type_of']
+        relation_patterns = [t for t in pattern if re.match('^(<)?-\\[r(\\d)*]-(>)?$', t[1]) is not None]
+
+        if uuid_pattern is None:
+            raise ValueError('No uuids pattern found in pattern list. '
+                             'Must contain one tuple with ("uuids", "of", object)')
+        if not type_of_patterns:
+            raise ValueError('No type_of pattern found in pattern list. '
+                             'Must contain at least one tuple with (object, "type_of", object)')
+        if not relation_patterns:
+            raise ValueError('No relation pattern found in pattern list'
+                             'Must contain at least one tuple with (object, "-[r]-", object) where r is followed by a '
+                             'number and relation may or may not be directional (using < and > symbols)')
+
+        types_by_object: dict[str, list[str]] = {}
+        for type_of_pattern in type_of_patterns:
+            types = types_by_object.setdefault(type_of_pattern[0], [])
+            types.extend(t for t in type_of_pattern[2] if t not in types)
+
+        steps = []
+        matching_objects = [uuid_pattern]
+        while relation_patterns:
+            new_matching_objects = []
+            for obj in matching_objects:
+                relation_patterns = cls.order_patterns_for_object(obj, relation_patterns)
+
+                for relation_pattern in relation_patterns:
+                    if relation_pattern[0] != obj:
+                        continue
+
+                    new_matching_objects.append(relation_pattern[2])
+                    if obj not in types_by_object:
+                        raise ValueError(f'No type_of pattern found for object {obj}')
+
+                    relation = re.match('<?-\\[(r.*)]->?', relation_pattern[1]).group(1)
+                    relation_types = types_by_object.get(relation)
+                    steps.append(QueryPlanStep(
+                        source=obj, relation=relation, target=relation_pattern[2],
+                        source_types=tuple(types_by_object[obj]),
+                        relation_types=tuple(relation_types) if relation_types is not None else None))
+
+                relation_patterns = [t for t in relation_patterns if t[0] != obj]
+
+            if not new_matching_objects:
+                raise ValueError(f'The relation patterns {relation_patterns} are not connected to the object '
+                                 f'{uuid_pattern} of the uuids pattern')
+            matching_objects = new_matching_objects
+
+        return cls(start_object=uuid_pattern, steps=tuple(steps))
+
+    @classmethod
+    def order_patterns_for_object(cls, obj: str, relation_patterns: [tuple[str, str, str]]) -> [tuple[str, str, str]]:
+        return [cls.reverse_relation_pattern(relation_pattern) if relation_pattern[2] == obj else relation_pattern
+                for relation_pattern in relation_patterns]
+
+    @classmethod
+    def reverse_relation_pattern(cls, relation_pattern: tuple[str, str, str]) -> tuple[str, str, str]:
+        rel_str = relation_pattern[1]
+        parts = re.match('(<?-)\\[(r.+)](->?)', rel_str).groups()
+        parts_2 = parts[0].replace('<', '>')[::-1]
+        parts_0 = parts[2].replace('>', '<')[::-1]
+
+        return relation_pattern[2], f'{parts_0}[{parts[1]}]{parts_2}', relation_pattern[0]
@@ -2,118 +2,282 @@ import json
 import logging
 import math
 import re
-from datetime import datetime
+from concurrent.futures import Future, ProcessPoolExecutor, as_completed
+from datetime import date, datetime
+from multiprocessing.context import BaseContext
 from pathlib import Path
+from tempfile import TemporaryDirectory
+from typing import Generator
 
+from numpy import generic
+from openpyxl import Workbook
 from openpyxl.formatting.rule import CellIsRule
-from openpyxl.reader.excel import load_workbook
 from openpyxl.styles import PatternFill, Font
-from pandas import DataFrame, concat, ExcelWriter, read_excel
+from pandas import DataFrame, isna, read_excel
+from pandas.api.types import is_scalar
 
 from Database.DbManager import DbManager
 from Domain.AssetCollection import AssetCollection
+from Domain.AttributeProjection import drager_types, legacy_drager_types
 from Domain.Enums import Direction
 from Domain.InfoObject import NodeInfoObject
+from Domain.MappedAssetCollection import MappedAssetCollection
 
 
 class ReportCreator:
-    def __init__(self, collection: AssetCollection, db_manager: DbManager):
+    sheet_method_names = ['start_creating_report_pov_legacy', 'start_creating_report_pov_toestel',
+                          'start_creating_report_pov_armatuur_controller', 'start_creating_report_pov_drager',
+                          'start_creating_asset_data_drager', 'start_creating_asset_data_toestel',
+                          'start_creating_asset_data_ac', 'start_creating_asset_data_segment_controller',
+                          'start_creating_asset_data_leddriver', 'start_creating_asset_data_montagekast']
+    _worker_report_creator: 'ReportCreator | None' = None
+    # the start method of the worker processes, None is the default of the platform (spawn on macOS and Windows,
+    # forkserver on Linux from Python 3.14)
+    worker_mp_context: BaseContext | None = None
+
+    def __init__(self, collection: AssetCollection | MappedAssetCollection, db_manager: DbManager):
         self.collection = collection
         self.db_manager = db_manager
+        self.delivery_info_by_asset_uuid: dict[str, tuple[list[str], list[str]]] | None = None
+        self.nodes_by_installatie_nummer: dict[str, dict[str, list[NodeInfoObject]]] | None = None
+
+    def load_delivery_info(self) -> None:
+        # the deliveries of all assets in the collection are fetched in one go and reused for every sheet
+        if self.delivery_info_by_asset_uuid is None:
+            self.delivery_info_by_asset_uuid = self.db_manager.get_delivery_info_by_asset_uuids(
+                asset_uuids=self.collection.get_node_uuids())
+
+    def get_aanlevering_naam_and_id(self, asset_uuid: str) -> tuple[str, str]:
+        self.load_delivery_info()
+        referenties, davie_ids = self.delivery_info_by_asset_uuid.get(asset_uuid, ([], []))
+        return '|'.join(referenties), '|'.join(davie_ids)
+
+    def group_nodes_by_installatie_nummer(self) -> None:
+        # one pass over the collection, so a report per installatie does not rescan the whole collection
+        self.nodes_by_installatie_nummer = {}
+        for short_type in self.collection.get_node_types():
+            for node in self.collection.get_node_objects_by_types([short_type]):
+                if short_type.startswith('lgc:'):
+                    installatie_nummer = self.get_installatie_nummer_from_naampad(
+                        naampad=node.attr_dict.get('NaampadObject.naampad', ''))
+                else:
+                    installatie_nummer = self.get_installatie_nummer_from_toestel_name(
+                        toestel_name=node.attr_dict.get('AIMNaamObject.naam', ''))
+                self.nodes_by_installatie_nummer.setdefault(installatie_nummer, {}).setdefault(
+                    short_type, []).append(node)
+
+    def get_node_objects_by_types(self, short_types: [str], installatie_nummer: str = None
+                                  ) -> Generator[NodeInfoObject, None, None]:
+        if installatie_nummer is None or self.nodes_by_installatie_nummer is None:
+            yield from self.collection.get_node_objects_by_types(short_types)
+            return
+        nodes_by_type = self.nodes_by_installatie_nummer.get(installatie_nummer, {})
+        for short_type in short_types:
+            yield from nodes_by_type.get(short_type, [])
+
+    def create_reports_per_installatie(self, max_workers: int = 1) -> None:
+        # one workbook per installatie nummer found in the collection, built by a pool of worker processes
+        self.group_nodes_by_installatie_nummer()
+        installatie_nummers = sorted(installatie_nummer for installatie_nummer in self.nodes_by_installatie_nummer
+                                     if installatie_nummer)
+        if max_workers <= 1:
+            for installatie_nummer in installatie_nummers:
+                self.create_all_reports(installatie_nummer=installatie_nummer)
+            return
+
+        with TemporaryDirectory() as snapshot_dir, ProcessPoolExecutor(
+                max_workers=max_workers, mp_context=self.worker_mp_context, initializer=ReportCreator.init_worker,
+                initargs=self.create_worker_initargs(snapshot_dir=Path(snapshot_dir))) as executor:
+            futures = {executor.submit(ReportCreator.create_report_in_worker, installatie_nummer): installatie_nummer
+                       for installatie_nummer in installatie_nummers}
+            for future in as_completed(futures):
+                future.result()
+                print(f'done writing report for installatie {futures[future]}')
+
+    @staticmethod
+    def create_dataframe_from_records(records: [dict], all_column_names: [str]) -> DataFrame:
+        # build the sheet at once from the records instead of concatenating a DataFrame per record, keeping the
+        # concatenated layout: fixed columns first, other columns in order of appearance, index 0 and object dtype
+        if not records:
+            return DataFrame(columns=all_column_names)
+        column_names = list(dict.fromkeys(all_column_names + [key for record in records for key in record]))
+        rows = [{key: value[0] if isinstance(value, list) else value for key, value in record.items()}
+                for record in records]
+        return DataFrame(rows, columns=column_names, index=[0] * len(rows), dtype=object)
 
-    def create_all_reports(self, installatie_nummer: str = None):
-        df_report_pov_legacy = self.start_creating_report_pov_legacy(installatie_nummer=installatie_nummer)
+    @classmethod
+    def init_worker(cls, collection: Path | MappedAssetCollection,
+                    delivery_info_by_asset_uuid: dict[str, tuple[list[str], list[str]]],
+                    group_by_installatie_nummer: bool) -> None:
+        # runs once in every worker process, so the collection is not sent along with every task
+        if isinstance(collection, Path):
+            collection = AssetCollection.load_snapshot(collection)
+        report_creator = ReportCreator(collection=collection, db_manager=None)
+        report_creator.delivery_info_by_asset_uuid = delivery_info_by_asset_uuid
+        if group_by_installatie_nummer:
+            report_creator.group_nodes_by_installatie_nummer()
+        cls._worker_report_creator = report_creator
+
+    @classmethod
+    def create_sheet_in_worker(cls, method_name: str, installatie_nummer: str = None) -> DataFrame:
+        return getattr(cls._worker_report_creator, method_name)(installatie_nummer=installatie_nummer)
+
+    @classmethod
+    def create_report_in_worker(cls, installatie_nummer: str) -> None:
+        cls._worker_report_creator.create_all_reports(installatie_nummer=installatie_nummer)
+
+    def create_worker_initargs(self, snapshot_dir: Path) -> tuple:
+        # the workers do not get the object graph of an AssetCollection: it is too deeply recursive to pickle (a chain
+        # of relations is enough) and only forked workers inherit it. They load a snapshot of it instead, a
+        # MappedAssetCollection is pickled as the path of its graph image.
+        self.load_delivery_info()
+        collection = self.collection
+        if isinstance(collection, AssetCollection):
+            collection = snapshot_dir / 'collection.snapshot'
+            self.collection.save_snapshot(collection)
+        return collection, self.delivery_info_by_asset_uuid, self.nodes_by_installatie_nummer is not None
+
+    def get_sheet_df(self, sheet_futures: dict[str, Future], method_name: str, installatie_nummer: str = None
+                     ) -> DataFrame:
+        future = sheet_futures.pop(method_name, None)
+        if future is not None:
+            return future.result()
+        return getattr(self, method_name)(installatie_nummer=installatie_nummer)
+
+    @classmethod
+    def write_sheet(cls, workbook: Workbook, sheet_name: str, df: DataFrame, formatting_ranges: [str] = None) -> None:
+        sheet = workbook.create_sheet(title=sheet_name)
+        red_fill = PatternFill(start_color='F4CCCC', end_color='F4CCCC', fill_type='solid')
+        red_font = Font(size=11, color='FF0000')
+        for range_str in formatting_ranges or []:
+            sheet.conditional_formatting.add(range_string=range_str, cfRule=CellIsRule(
+                operator='equal', formula=[0], stopIfTrue=True, fill=red_fill, font=red_font))
+            sheet.conditional_formatting.add(range_string=range_str, cfRule=CellIsRule(
+                operator='equal', formula=['FALSE'], stopIfTrue=True, fill=red_fill, font=red_font))
+
+        sheet.append(list(df.columns))
+        for row in df.itertuples(index=False, name=None):
+            sheet.append([cls.to_excel_value(value) for value in row])
+
+    @classmethod
+    def to_excel_value(cls, value):
+        # same conversion as pandas to_excel: missing values become empty cells, unknown types are written as text
+        if is_scalar(value) and isna(value):
+            return None
+        if isinstance(value, generic):
+            value = value.item()
+        if value is None or isinstance(value, (str, bool, int, float, date, datetime)):
+            return value
+        return str(value)
+
+    def create_all_reports(self, installatie_nummer: str = None, max_workers: int = 1):
+        # with more than one worker, the sheets are built concurrently in a process pool and written in a fixed order
+        sheet_futures = {}
+        executor = None
+        snapshot_dir = None
+        if max_workers > 1:
+            snapshot_dir = TemporaryDirectory()
+            executor = ProcessPoolExecutor(max_workers=max_workers, mp_context=self.worker_mp_context,
+                                           initializer=ReportCreator.init_worker,
+                                           initargs=self.create_worker_initargs(snapshot_dir=Path(snapshot_dir.name)))
+            sheet_futures = {method_name: executor.submit(ReportCreator.create_sheet_in_worker, method_name,
+                                                          installatie_nummer)
+                             for method_name in self.sheet_method_names}
+        try:
+            self.write_all_reports(sheet_futures=sheet_futures, installatie_nummer=installatie_nummer)
+        finally:
+            if executor is not None:
+                executor.shutdown(cancel_futures=True)
+                snapshot_dir.cleanup()
+
+    def write_all_reports(self, sheet_futures: dict[str, Future], installatie_nummer: str = None):
+        df_report_pov_legacy = self.get_sheet_df(
+            sheet_futures=sheet_futures, method_name='start_creating_report_pov_legacy',
+            installatie_nummer=installatie_nummer)
         try:
             excel_name = df_report_pov_legacy['legacy_drager_naampad'].iloc[0]
         except IndexError:
             now = datetime.now()
             excel_name = f'Report_unnamed_{now.strftime("%Y%m%d_%H%M%S")}'
+            if installatie_nummer is not None:
+                excel_name = installatie_nummer
         if excel_name is not None and '/' in excel_name:
             excel_name = excel_name.split('/')[0]
-        with ExcelWriter(path=f'Reports/{excel_name}.xlsx') as writer:
-            df_report_pov_legacy.to_excel(writer, sheet_name='pov_legacy', index=False)
-            print('done writing report pov legacy')
-            df_report_pov_toestel = self.start_creating_report_pov_toestel(installatie_nummer=installatie_nummer)
-            df_report_pov_toestel.to_excel(writer, sheet_name='pov_toestel', index=False)
-            print('done writing report pov toestel')
-            df_report_pov_armatuur_controller = self.start_creating_report_pov_armatuur_controller(
-                installatie_nummer=installatie_nummer)
-            df_report_pov_armatuur_controller.to_excel(writer, sheet_name='pov_ac', index=False)
-            print('done writing report pov ac')
-            df_report_pov_drager = self.start_creating_report_pov_drager(installatie_nummer=installatie_nummer)
-            df_report_pov_drager.to_excel(writer, sheet_name='pov_drager', index=False)
-            print('done writing report pov drager')
-            df = self.start_creating_asset_data_drager(installatie_nummer=installatie_nummer)
-            df.to_excel(writer, sheet_name='asset_data_otl_drager', index=False)
-            print('done writing asset data drager')
-            df = self.start_creating_asset_data_toestel(installatie_nummer=installatie_nummer)
-            df.to_excel(writer, sheet_name='asset_data_toestel', index=False)
-            print('done writing asset data toestel')
-            df = self.start_creating_asset_data_ac(installatie_nummer=installatie_nummer)
-            df.to_excel(writer, sheet_name='asset_data_ac', index=False)
-            print('done writing asset data armatuur controller')
-            df = self.start_creating_asset_data_segment_controller(installatie_nummer=installatie_nummer)
-            df.to_excel(writer, sheet_name='asset_data_segm_c', index=False)
-            print('done writing asset data segment controller')
-            df = self.start_creating_asset_data_leddriver(installatie_nummer=installatie_nummer)
-            df.to_excel(writer, sheet_name='asset_data_leddriver', index=False)
-            print('done writing asset data leddriver')
-            df = self.start_creating_asset_data_montagekast(installatie_nummer=installatie_nummer)
-            df.to_excel(writer, sheet_name='asset_data_montagekast', index=False)
-            print('done writing asset data montagekast')
-            summary_dict = {
-                'pov_toestel_alles_ok': [
-                    len(df_report_pov_toestel['alles_ok']) == df_report_pov_toestel['alles_ok'].sum()],
-                'pov_drager_alles_ok': [
-                    len(df_report_pov_drager['alles_ok']) == df_report_pov_drager['alles_ok'].sum()],
-                'pov_armatuur_controller_alles_ok': [
-                    len(df_report_pov_armatuur_controller['alles_ok']) == df_report_pov_armatuur_controller[
-                        'alles_ok'].sum()],
-            }
-            df_summary = DataFrame(summary_dict)
-            df_summary.to_excel(writer, sheet_name='Overzicht', index=False)
-
-        sheet_dict = {
-            'pov_legacy': [f'F2:V{max(len(df_report_pov_legacy) + 1, 2)}',
-                           f'X2:X{max(len(df_report_pov_legacy) + 1, 2)}',
-                           f'Z2:Z{max(len(df_report_pov_legacy) + 1, 2)}'],
-            'pov_toestel': [f'E2:S{max(len(df_report_pov_toestel)+1, 2)}'],
-            'pov_ac': [f'E2:K{max(len(df_report_pov_armatuur_controller) + 1, 2)}'],
-            'pov_drager': [f'E2:J{max(len(df_report_pov_drager) + 1, 2)}'],
-            'Overzicht': [f'A2:C2'],
+        # the rows are streamed to a write-only workbook, so the sheets are written in their final order with their
+        # formatting and the file is saved only once
+        workbook = Workbook(write_only=True)
+        df_report_pov_toestel = self.get_sheet_df(
+            sheet_futures=sheet_futures, method_name='start_creating_report_pov_toestel',
+            installatie_nummer=installatie_nummer)
+        df_report_pov_armatuur_controller = self.get_sheet_df(
+            sheet_futures=sheet_futures, method_name='start_creating_report_pov_armatuur_controller',
+            installatie_nummer=installatie_nummer)
+        df_report_pov_drager = self.get_sheet_df(
+            sheet_futures=sheet_futures, method_name='start_creating_report_pov_drager',
+            installatie_nummer=installatie_nummer)
+        summary_dict = {
+            'pov_toestel_alles_ok': [
+                len(df_report_pov_toestel['alles_ok']) == df_report_pov_toestel['alles_ok'].sum()],
+            'pov_drager_alles_ok': [
+                len(df_report_pov_drager['alles_ok']) == df_report_pov_drager['alles_ok'].sum()],
+            'pov_armatuur_controller_alles_ok': [
+                len(df_report_pov_armatuur_controller['alles_ok']) == df_report_pov_armatuur_controller[
+                    'alles_ok'].sum()],
         }
-
-        red_fill = PatternFill(start_color='F4CCCC', end_color='F4CCCC', fill_type='solid')
-        red_font = Font(size=11, color='FF0000')
-        workbook = load_workbook(f'Reports/{excel_name}.xlsx')
-        for sheet_name, ranges in sheet_dict.items():
-            sheet = workbook[sheet_name]
-            for range_str in ranges:
-                sheet.conditional_formatting.add(range_string=range_str, cfRule=CellIsRule(
-                    operator='equal', formula=[0], stopIfTrue=True, fill=red_fill, font=red_font))
-                sheet.conditional_formatting.add(range_string=range_str, cfRule=CellIsRule(
-                    operator='equal', formula=['FALSE'], stopIfTrue=True, fill=red_fill, font=red_font))
-
-        # move summary sheet to the front
-        sheets = workbook._sheets
-        index_summary = len(sheets) - 1
-        summary_sheet = sheets.pop(index_summary)
-        sheets.insert(0, summary_sheet)
+        self.write_sheet(workbook=workbook, sheet_name='Overzicht', df=DataFrame(summary_dict),
+                         formatting_ranges=['A2:C2'])
+
+        self.write_sheet(workbook=workbook, sheet_name='pov_legacy', df=df_report_pov_legacy,
+                         formatting_ranges=[f'F2:V{max(len(df_report_pov_legacy) + 1, 2)}',
+                                            f'X2:X{max(len(df_report_pov_legacy) + 1, 2)}',
+                                            f'Z2:Z{max(len(df_report_pov_legacy) + 1, 2)}'])
+        print('done writing report pov legacy')
+        self.write_sheet(workbook=workbook, sheet_name='pov_toestel', df=df_report_pov_toestel,
+                         formatting_ranges=[f'E2:S{max(len(df_report_pov_toestel) + 1, 2)}'])
+        print('done writing report pov toestel')
+        self.write_sheet(workbook=workbook, sheet_name='pov_ac', df=df_report_pov_armatuur_controller,
+                         formatting_ranges=[f'E2:K{max(len(df_report_pov_armatuur_controller) + 1, 2)}'])
+        print('done writing report pov ac')
+        self.write_sheet(workbook=workbook, sheet_name='pov_drager', df=df_report_pov_drager,
+                         formatting_ranges=[f'E2:J{max(len(df_report_pov_drager) + 1, 2)}'])
+        print('done writing report pov drager')
+        df = self.get_sheet_df(sheet_futures=sheet_futures, method_name='start_creating_asset_data_drager',
+                               installatie_nummer=installatie_nummer)
+        self.write_sheet(workbook=workbook, sheet_name='asset_data_otl_drager', df=df)
+        print('done writing asset data drager')
+        df = self.get_sheet_df(sheet_futures=sheet_futures, method_name='start_creating_asset_data_toestel',
+                               installatie_nummer=installatie_nummer)
+        self.write_sheet(workbook=workbook, sheet_name='asset_data_toestel', df=df)
+        print('done writing asset data toestel')
+        df = self.get_sheet_df(sheet_futures=sheet_futures, method_name='start_creating_asset_data_ac',
+                               installatie_nummer=installatie_nummer)
+        self.write_sheet(workbook=workbook, sheet_name='asset_data_ac', df=df)
+        print('done writing asset data armatuur controller')
+        df = self.get_sheet_df(sheet_futures=sheet_futures, method_name='start_creating_asset_data_segment_controller',
+                               installatie_nummer=installatie_nummer)
+        self.write_sheet(workbook=workbook, sheet_name='asset_data_segm_c', df=df)
+        print('done writing asset data segment controller')
+        df = self.get_sheet_df(sheet_futures=sheet_futures, method_name='start_creating_asset_data_leddriver',
+                               installatie_nummer=installatie_nummer)
+        self.write_sheet(workbook=workbook, sheet_name='asset_data_leddriver', df=df)
+        print('done writing asset data leddriver')
+        df = self.get_sheet_df(sheet_futures=sheet_futures, method_name='start_creating_asset_data_montagekast',
+                               installatie_nummer=installatie_nummer)
+        self.write_sheet(workbook=workbook, sheet_name='asset_data_montagekast', df=df)
+        print('done writing asset data montagekast')
 
         workbook.save(f'Reports/{excel_name}.xlsx')
         print(f'done writing file {excel_name}.xlsx')
 
     def start_creating_asset_data_leddriver(self, installatie_nummer: str = None) -> DataFrame:
-        df = DataFrame()
+        records = []
         all_column_names = [
             'aanlevering_id', 'aanlevering_naam', 'uuid', 'naam', 'toestand', 'geometrie', 'datumOprichtingObject',
             'maximaalVermogen', 'maximaleAanstuurstroom', 'merk', 'modelnaam', 'protocol']
 
-        for missing_column_name in all_column_names:
-            df[missing_column_name] = None
-
         # get all ac's
-        drivers = self.collection.get_node_objects_by_types(['onderdeel#LEDDriver'])
+        drivers = self.get_node_objects_by_types(
+            short_types=['onderdeel#LEDDriver'], installatie_nummer=installatie_nummer)
 
         for driver in drivers:
             if not driver.active:
@@ -123,13 +287,7 @@ class ReportCreator:
             if installatie_nummer is not None and not driver_naam.startswith(installatie_nummer):
                 continue
 
-            deliveries = self.db_manager.get_deliveries_by_asset_uuid(asset_uuid=driver.uuid)
-            if len(deliveries) == 0:
-                aanlevering_naam = ''
-                aanlevering_id = ''
-            else:
-                aanlevering_naam = '|'.join([d.referentie for d in deliveries])
-                aanlevering_id = '|'.join([d.uuid_davie for d in deliveries if d.uuid_davie is not None])
+            aanlevering_naam, aanlevering_id = self.get_aanlevering_naam_and_id(asset_uuid=driver.uuid)
 
             driver_uuid = driver.uuid
 
@@ -162,22 +320,21 @@ class ReportCreator:
                 'protocol': [protocol],
             }
 
-            df_current = DataFrame(current_toestel_dict)
-            df = concat([df, df_current])
+            records.append(current_toestel_dict)
+
+        df = self.create_dataframe_from_records(records=records, all_column_names=all_column_names)
 
         return df.sort_values('naam')
 
     def start_creating_asset_data_montagekast(self, installatie_nummer: str = None) -> DataFrame:
-        df = DataFrame()
+        records = []
         all_column_names = [
             'aanlevering_id', 'aanlevering_naam', 'uuid', 'naam', 'toestand', 'geometrie', 'datumOprichtingObject',
             'opstelhoogte', 'verfraaid', 'afmeting', 'heeftVerlichting', 'kastmateriaal', 'ipKlasse']
 
-        for missing_column_name in all_column_names:
-            df[missing_column_name] = None
-
         # get all kasten
-        kasten = self.collection.get_node_objects_by_types(['onderdeel#Montagekast'])
+        kasten = self.get_node_objects_by_types(
+            short_types=['onderdeel#Montagekast'], installatie_nummer=installatie_nummer)
 
         for kast in kasten:
             if not kast.active:
@@ -187,13 +344,7 @@ class ReportCreator:
             if installatie_nummer is not None and not kast_naam.startswith(installatie_nummer):
                 continue
 
-            deliveries = self.db_manager.get_deliveries_by_asset_uuid(asset_uuid=kast.uuid)
-            if len(deliveries) == 0:
-                aanlevering_naam = ''
-                aanlevering_id = ''
-            else:
-                aanlevering_naam = '|'.join([d.referentie for d in deliveries])
-                aanlevering_id = '|'.join([d.uuid_davie for d in deliveries if d.uuid_davie is not None])
+            aanlevering_naam, aanlevering_id = self.get_aanlevering_naam_and_id(asset_uuid=kast.uuid)
 
             kast_uuid = kast.uuid
 
@@ -227,22 +378,21 @@ class ReportCreator:
                 'ipKlasse': [ipKlasse],
             }
 
-            df_current = DataFrame(current_toestel_dict)
-            df = concat([df, df_current])
+            records.append(current_toestel_dict)
+
+        df = self.create_dataframe_from_records(records=records, all_column_names=all_column_names)
 
         return df.sort_values('naam')
 
     def start_creating_asset_data_ac(self, installatie_nummer: str = None) -> DataFrame:
-        df = DataFrame()
+        records = []
         all_column_names = [
             'aanlevering_id', 'aanlevering_naam', 'uuid', 'naam', 'toestand', 'geometrie', 'datumOprichtingObject',
             'merk', 'serienummer', 'modelnaam', 'firmwareversie', 'ipAdres', 'isDummydot']
 
-        for missing_column_name in all_column_names:
-            df[missing_column_name] = None
-
         # get all ac's
-        acs = self.collection.get_node_objects_by_types(['onderdeel#Armatuurcontroller'])
+        acs = self.get_node_objects_by_types(
+            short_types=['onderdeel#Armatuurcontroller'], installatie_nummer=installatie_nummer)
 
         for ac in acs:
             if not ac.active:
@@ -252,13 +402,7 @@ class ReportCreator:
             if installatie_nummer is not None and not toestel_naam.startswith(installatie_nummer):
                 continue
 
-            deliveries = self.db_manager.get_deliveries_by_asset_uuid(asset_uuid=ac.uuid)
-            if len(deliveries) == 0:
-                aanlevering_naam = ''
-                aanlevering_id = ''
-            else:
-                aanlevering_naam = '|'.join([d.referentie for d in deliveries])
-                aanlevering_id = '|'.join([d.uuid_davie for d in deliveries if d.uuid_davie is not None])
+            aanlevering_naam, aanlevering_id = self.get_aanlevering_naam_and_id(asset_uuid=ac.uuid)
 
             toestel_uuid = ac.uuid
 
@@ -280,23 +424,22 @@ class ReportCreator:
                 'isDummydot': [ac.attr_dict.get('Armatuurcontroller.isDummydot', None)]
             }
 
-            df_current = DataFrame(current_toestel_dict)
-            df = concat([df, df_current])
+            records.append(current_toestel_dict)
+
+        df = self.create_dataframe_from_records(records=records, all_column_names=all_column_names)
 
         return df.sort_values('naam')
 
     def start_creating_asset_data_segment_controller(self, installatie_nummer: str = None) -> DataFrame:
-        df = DataFrame()
+        records = []
         all_column_names = [
             'aanlevering_id', 'aanlevering_naam', 'uuid', 'naam', 'toestand', 'geometrie', 'datumOprichtingObject',
             'beveiligingssleutel', 'merknaam', 'modelnaam', 'batchnummer', 'dNSNaam', 'firmwareversie',
             'iPAdres', 'serienummer']
 
-        for missing_column_name in all_column_names:
-            df[missing_column_name] = None
-
         # get all ac's
-        segm_cs = self.collection.get_node_objects_by_types(['onderdeel#Segmentcontroller'])
+        segm_cs = self.get_node_objects_by_types(
+            short_types=['onderdeel#Segmentcontroller'], installatie_nummer=installatie_nummer)
 
         for segm_c in segm_cs:
             if not segm_c.active:
@@ -306,13 +449,7 @@ class ReportCreator:
             if installatie_nummer is not None and not toestel_naam.startswith(installatie_nummer):
                 continue
 
-            deliveries = self.db_manager.get_deliveries_by_asset_uuid(asset_uuid=segm_c.uuid)
-            if len(deliveries) == 0:
-                aanlevering_naam = ''
-                aanlevering_id = ''
-            else:
-                aanlevering_naam = '|'.join([d.referentie for d in deliveries])
-                aanlevering_id = '|'.join([d.uuid_davie for d in deliveries if d.uuid_davie is not None])
+            aanlevering_naam, aanlevering_id = self.get_aanlevering_naam_and_id(asset_uuid=segm_c.uuid)
 
             segm_c_uuid = segm_c.uuid
 
@@ -348,13 +485,14 @@ class ReportCreator:
                 'serienummer': [segm_c.attr_dict.get('Controller.serienummer', None)]
             }
 
-            df_current = DataFrame(current_segm_c_dict)
-            df = concat([df, df_current])
+            records.append(current_segm_c_dict)
+
+        df = self.create_dataframe_from_records(records=records, all_column_names=all_column_names)
 
         return df.sort_values('naam')
 
     def start_creating_asset_data_toestel(self, installatie_nummer: str = None) -> DataFrame:
-        df = DataFrame()
+        records = []
         all_column_names = [
             'aanlevering_id', 'aanlevering_naam', 'uuid', 'naam', 'toestand', 'geometrie', 'datumOprichtingObject',
             'modelnaam', 'kleurTemperatuur', 'merk', 'lumenOutput', 'protector', 'lichtpuntHoogte', 'lichtkleur',
@@ -363,11 +501,9 @@ class ReportCreator:
             'heeftAansluitkastGeintegreerd', 'isFaunavriendelijk', 'kleurArmatuur', 'tussenafstandLED',
             'isLijnvormig']
 
-        for missing_column_name in all_column_names:
-            df[missing_column_name] = None
-
         # get all toestellen
-        toestellen = self.collection.get_node_objects_by_types(['onderdeel#VerlichtingstoestelLED'])
+        toestellen = self.get_node_objects_by_types(
+            short_types=['onderdeel#VerlichtingstoestelLED'], installatie_nummer=installatie_nummer)
 
         for toestel in toestellen:
             if not toestel.active:
@@ -377,13 +513,7 @@ class ReportCreator:
             if installatie_nummer is not None and not toestel_naam.startswith(installatie_nummer):
                 continue
 
-            deliveries = self.db_manager.get_deliveries_by_asset_uuid(asset_uuid=toestel.uuid)
-            if len(deliveries) == 0:
-                aanlevering_naam = ''
-                aanlevering_id = ''
-            else:
-                aanlevering_naam = '|'.join([d.referentie for d in deliveries])
-                aanlevering_id = '|'.join([d.uuid_davie for d in deliveries if d.uuid_davie is not None])
+            aanlevering_naam, aanlevering_id = self.get_aanlevering_naam_and_id(asset_uuid=toestel.uuid)
 
             toestel_uuid = toestel.uuid
             toestand = toestel.attr_dict.get('AIMToestand.toestand', None)
@@ -459,24 +589,23 @@ class ReportCreator:
                 'isLijnvormig': [toestel.attr_dict.get('VerlichtingstoestelLED.isLijnvormig', None)]
             }
 
-            df_current = DataFrame(current_toestel_dict)
-            df = concat([df, df_current])
+            records.append(current_toestel_dict)
+
+        df = self.create_dataframe_from_records(records=records, all_column_names=all_column_names)
 
         return df.sort_values('naam')
 
     def start_creating_asset_data_drager(self, installatie_nummer: str = None) -> DataFrame:
-        df = DataFrame()
+        records = []
         all_column_names = [
             'aanlevering_id', 'aanlevering_naam', 'uuid', 'naam', 'toestand', 'geometrie', 'datumOprichtingObject',
             'aantalArmen', 'masttype', 'masthoogte', 'kleur', 'beschermlaag', 'heeftStopcontact', 'armlengte',
             'elekktrischeBeveiliging', 'dwarsdoorsnede', 'leverancier', 'bevestigingToestellen',
             'normeringBotsvriendelijk', 'heeftAntiVandalismeBeugel', 'theoretischeLevensduur']
 
-        for missing_column_name in all_column_names:
-            df[missing_column_name] = None
-
         # get all dragers
-        dragers = self.collection.get_node_objects_by_types(['onderdeel#WVLichtmast', 'onderdeel#WVConsole'])
+        dragers = self.get_node_objects_by_types(
+            short_types=['onderdeel#WVLichtmast', 'onderdeel#WVConsole'], installatie_nummer=installatie_nummer)
 
         for drager in dragers:
             if not drager.active:
@@ -486,13 +615,7 @@ class ReportCreator:
             if installatie_nummer is not None and not drager_naam.startswith(installatie_nummer):
                 continue
 
-            deliveries = self.db_manager.get_deliveries_by_asset_uuid(asset_uuid=drager.uuid)
-            if len(deliveries) == 0:
-                aanlevering_naam = ''
-                aanlevering_id = ''
-            else:
-                aanlevering_naam = '|'.join([d.referentie for d in deliveries])
-                aanlevering_id = '|'.join([d.uuid_davie for d in deliveries if d.uuid_davie is not None])
+            aanlevering_naam, aanlevering_id = self.get_aanlevering_naam_and_id(asset_uuid=drager.uuid)
 
             drager_uuid = drager.uuid
 
@@ -548,23 +671,22 @@ class ReportCreator:
                 'heeftAntiVandalismeBeugel': [drager.attr_dict.get('Lichtmast.heeftAntiVandalismeBeugel', None)],
             }
 
-            df_current = DataFrame(current_drager_dict)
-            df = concat([df, df_current])
+            records.append(current_drager_dict)
+
+        df = self.create_dataframe_from_records(records=records, all_column_names=all_column_names)
 
         return df.sort_values('naam')
 
     def start_creating_report_pov_drager(self, installatie_nummer: str = None) -> DataFrame:
-        df = DataFrame()
+        records = []
         all_column_names = [
             'aanlevering_id', 'aanlevering_naam', 'drager_uuid', 'drager_naam', 'alles_ok',
             'drager_naam_conform_conventie', 'relatie_naar_toestel', 'relatie_naar_legacy_drager',
             'kleur_van_toepassing', 'kleur_ingevuld']
 
-        for missing_column_name in all_column_names:
-            df[missing_column_name] = None
-
         # get all dragers
-        dragers = self.collection.get_node_objects_by_types(['onderdeel#WVLichtmast', 'onderdeel#WVConsole'])
+        dragers = self.get_node_objects_by_types(
+            short_types=['onderdeel#WVLichtmast', 'onderdeel#WVConsole'], installatie_nummer=installatie_nummer)
 
         for drager in dragers:
             if not drager.active:
@@ -574,13 +696,7 @@ class ReportCreator:
             if installatie_nummer is not None and not drager_naam.startswith(installatie_nummer):
                 continue
 
-            deliveries = self.db_manager.get_deliveries_by_asset_uuid(asset_uuid=drager.uuid)
-            if len(deliveries) == 0:
-                aanlevering_naam = ''
-                aanlevering_id = ''
-            else:
-                aanlevering_naam = '|'.join([d.referentie for d in deliveries])
-                aanlevering_id = '|'.join([d.uuid_davie for d in deliveries if d.uuid_davie is not None])
+            aanlevering_naam, aanlevering_id = self.get_aanlevering_naam_and_id(asset_uuid=drager.uuid)
 
             drager_uuid = drager.uuid
 
@@ -591,8 +707,9 @@ class ReportCreator:
             }
 
             record_dict = self.get_report_record_for_one_drager(drager=drager, record_dict=current_ac_drager_dict)
-            df_current = DataFrame(record_dict)
-            df = concat([df, df_current])
+            records.append(record_dict)
+
+        df = self.create_dataframe_from_records(records=records, all_column_names=all_column_names)
 
         return df.sort_values('drager_naam')
 
@@ -604,15 +721,15 @@ class ReportCreator:
             drager_naam=drager_naam)]
         alles_ok = record_dict['drager_naam_conform_conventie'][0]
 
-        toestellen = list(self.collection.traverse_graph(
-            start_uuid=drager_uuid, relation_types=['Bevestiging'], allowed_directions=[Direction.NONE],
-            return_type='info_object', filtered_node_types=['onderdeel#VerlichtingstoestelLED']))
+        toestellen = self.collection.get_neighbours(
+            start_uuid=drager_uuid, relation_types=['Bevestiging'], directions=[Direction.NONE],
+            node_types=['onderdeel#VerlichtingstoestelLED'])
         record_dict['relatie_naar_toestel'] = [(len(toestellen) > 0)]
         alles_ok = record_dict['relatie_naar_toestel'][0] and alles_ok
 
-        legacy_dragers = list(self.collection.traverse_graph(
-            start_uuid=drager_uuid, relation_types=['HoortBij'], allowed_directions=[Direction.WITH],
-            return_type='info_object', filtered_node_types=['lgc:installatie#VPLMast', 'lgc:installatie#VPConsole']))
+        legacy_dragers = self.collection.get_neighbours(
+            start_uuid=drager_uuid, relation_types=['HoortBij'], directions=[Direction.WITH],
+            node_types=['lgc:installatie#VPLMast', 'lgc:installatie#VPConsole'])
         record_dict['relatie_naar_legacy_drager'] = [(len(legacy_dragers) > 0)]
         alles_ok = record_dict['relatie_naar_legacy_drager'][0] and alles_ok
 
@@ -635,17 +752,15 @@ class ReportCreator:
         return record_dict
 
     def start_creating_report_pov_armatuur_controller(self, installatie_nummer: str = None) -> DataFrame:
-        df = DataFrame()
+        records = []
         all_column_names = [
             'aanlevering_id', 'aanlevering_naam', 'ac_uuid', 'ac_naam', 'alles_ok',
             'ac_naam_conform_conventie', 'relatie_naar_toestel', 'serienummer', 'serienummer_ingevuld',
             'serienummer_conform', 'serienummer_uniek']
 
-        for missing_column_name in all_column_names:
-            df[missing_column_name] = None
-
         # get all armatuur controllers
-        armatuur_controllers = self.collection.get_node_objects_by_types(['onderdeel#Armatuurcontroller'])
+        armatuur_controllers = self.get_node_objects_by_types(
+            short_types=['onderdeel#Armatuurcontroller'], installatie_nummer=installatie_nummer)
 
         for ac in armatuur_controllers:
             if not ac.active:
@@ -655,13 +770,7 @@ class ReportCreator:
             if installatie_nummer is not None and not ac_naam.startswith(installatie_nummer):
                 continue
 
-            deliveries = self.db_manager.get_deliveries_by_asset_uuid(asset_uuid=ac.uuid)
-            if len(deliveries) == 0:
-                aanlevering_naam = ''
-                aanlevering_id = ''
-            else:
-                aanlevering_naam = '|'.join([d.referentie for d in deliveries])
-                aanlevering_id = '|'.join([d.uuid_davie for d in deliveries if d.uuid_davie is not None])
+            aanlevering_naam, aanlevering_id = self.get_aanlevering_naam_and_id(asset_uuid=ac.uuid)
 
             ac_uuid = ac.uuid
             ac_naam = ac.attr_dict.get('AIMNaamObject.naam', '')
@@ -673,8 +782,9 @@ class ReportCreator:
 
             record_dict = self.get_report_record_for_one_armatuur_controller(armatuur_controller=ac,
                                                                              record_dict=current_ac_drager_dict)
-            df_current = DataFrame(record_dict)
-            df = concat([df, df_current])
+            records.append(record_dict)
+
+        df = self.create_dataframe_from_records(records=records, all_column_names=all_column_names)
 
         df['serienummer_uniek'] = df.duplicated(subset=['serienummer'], keep=False)
         df['serienummer_uniek'] = ~df['serienummer_uniek'] # reverse
@@ -692,9 +802,9 @@ class ReportCreator:
             ac_naam=ac_naam)]
         alles_ok = record_dict['ac_naam_conform_conventie'][0]
 
-        toestellen = list(self.collection.traverse_graph(
-            start_uuid=ac_uuid, relation_types=['Bevestiging'], allowed_directions=[Direction.NONE],
-            return_type='info_object', filtered_node_types=['onderdeel#VerlichtingstoestelLED']))
+        toestellen = self.collection.get_neighbours(
+            start_uuid=ac_uuid, relation_types=['Bevestiging'], directions=[Direction.NONE],
+            node_types=['onderdeel#VerlichtingstoestelLED'])
         record_dict['relatie_naar_toestel'] = [(len(toestellen) > 0)]
         alles_ok = record_dict['relatie_naar_toestel'][0] and alles_ok
 
@@ -715,7 +825,7 @@ class ReportCreator:
         return record_dict
 
     def start_creating_report_pov_toestel(self, installatie_nummer: str = None) -> DataFrame:
-        df = DataFrame()
+        records = []
         all_column_names = [
             'aanlevering_id', 'aanlevering_naam', 'toestel_uuid', 'toestel_naam', 'alles_ok',
             'toestel_naam_conform_conventie',
@@ -724,11 +834,9 @@ class ReportCreator:
             'lichtpuntHoogte_ingevuld', 'lumenOutput_ingevuld', 'overhang_ingevuld', 'verlichtingsNiveau_ingevuld',
             'merk_ingevuld', 'modelnaam_ingevuld', 'verlichtGebied_ingevuld', 'systeemvermogen_ingevuld']
 
-        for missing_column_name in all_column_names:
-            df[missing_column_name] = None
-
         # get all toestellen
-        toestellen = self.collection.get_node_objects_by_types(['onderdeel#VerlichtingstoestelLED'])
+        toestellen = self.get_node_objects_by_types(
+            short_types=['onderdeel#VerlichtingstoestelLED'], installatie_nummer=installatie_nummer)
 
         for toestel in toestellen:
             if not toestel.active:
@@ -738,13 +846,7 @@ class ReportCreator:
             if installatie_nummer is not None and not toestel_naam.startswith(installatie_nummer):
                 continue
 
-            deliveries = self.db_manager.get_deliveries_by_asset_uuid(asset_uuid=toestel.uuid)
-            if len(deliveries) == 0:
-                aanlevering_naam = ''
-                aanlevering_id = ''
-            else:
-                aanlevering_naam = '|'.join([d.referentie for d in deliveries])
-                aanlevering_id = '|'.join([d.uuid_davie for d in deliveries if d.uuid_davie is not None])
+            aanlevering_naam, aanlevering_id = self.get_aanlevering_naam_and_id(asset_uuid=toestel.uuid)
 
             toestel_uuid = toestel.uuid
 
@@ -756,8 +858,9 @@ class ReportCreator:
 
             record_dict = self.get_report_record_for_one_toestel(toestel=toestel,
                                                                  record_dict=current_toestel_drager_dict)
-            df_current = DataFrame(record_dict)
-            df = concat([df, df_current])
+            records.append(record_dict)
+
+        df = self.create_dataframe_from_records(records=records, all_column_names=all_column_names)
 
         return df.sort_values('toestel_naam')
 
@@ -769,16 +872,16 @@ class ReportCreator:
             toestel_naam=toestel_naam)]
         alles_ok = record_dict['toestel_naam_conform_conventie'][0]
 
-        armatuur_controllers = list(self.collection.traverse_graph(
-            start_uuid=toestel_uuid, relation_types=['Bevestiging'], allowed_directions=[Direction.NONE],
-            return_type='info_object', filtered_node_types=['onderdeel#Armatuurcontroller']))
+        armatuur_controllers = self.collection.get_neighbours(
+            start_uuid=toestel_uuid, relation_types=['Bevestiging'], directions=[Direction.NONE],
+            node_types=['onderdeel#Armatuurcontroller'])
         record_dict['relatie_naar_armatuur_controller'] = [(len(armatuur_controllers) > 0)]
         alles_ok = record_dict['relatie_naar_armatuur_controller'][0] and alles_ok
 
-        dragers = list(self.collection.traverse_graph(
+        dragers = self.collection.get_neighbours(
             start_uuid=toestel_uuid, relation_types=['HoortBij', 'Bevestiging'],
-            allowed_directions=[Direction.REVERSED, Direction.NONE], return_type='info_object',
-            filtered_node_types=['onderdeel#WVLichtmast', 'onderdeel#WVConsole', 'lgc:installatie#VPBevestig']))
+            directions=[Direction.REVERSED, Direction.NONE],
+            node_types=['onderdeel#WVLichtmast', 'onderdeel#WVConsole', 'lgc:installatie#VPBevestig'])
         record_dict['relatie_naar_otl_of_legacy_drager'] = [(len(dragers) > 0)]
         alles_ok = record_dict['relatie_naar_otl_of_legacy_drager'][0] and alles_ok
 
@@ -830,7 +933,7 @@ class ReportCreator:
         return record_dict
 
     def start_creating_report_pov_legacy(self, installatie_nummer: str = None) -> DataFrame:
-        df = DataFrame()
+        records = []
         all_column_names = [
             'aanlevering_id', 'aanlevering_naam', 'legacy_drager_uuid', 'legacy_drager_type',
             'legacy_drager_naampad', 'legacy_drager_naampad_conform_conventie',
@@ -853,12 +956,10 @@ class ReportCreator:
             'armatuur_controller_3_uuid', 'armatuur_controller_3_naam', 'armatuur_controller_3_naam_conform_conventie',
             'relatie_naar_armatuur_controller_4_aanwezig',
             'armatuur_controller_4_uuid', 'armatuur_controller_4_naam', 'armatuur_controller_4_naam_conform_conventie']
-        for missing_column_name in all_column_names:
-            df[missing_column_name] = None
 
         # get all legacy dragers
-        dragers = self.collection.get_node_objects_by_types([
-            'lgc:installatie#VPLMast', 'lgc:installatie#VPConsole', 'lgc:installatie#VPBevestig'])
+        dragers = self.get_node_objects_by_types(
+            short_types=legacy_drager_types, installatie_nummer=installatie_nummer)
 
         for drager in dragers:
             if not drager.active:
@@ -868,13 +969,7 @@ class ReportCreator:
             if installatie_nummer is not None and not legacy_drager_naampad.startswith(installatie_nummer):
                 continue
 
-            deliveries = self.db_manager.get_deliveries_by_asset_uuid(asset_uuid=drager.uuid)
-            if len(deliveries) == 0:
-                aanlevering_naam = ''
-                aanlevering_id = ''
-            else:
-                aanlevering_naam = '|'.join([d.referentie for d in deliveries])
-                aanlevering_id = '|'.join([d.uuid_davie for d in deliveries if d.uuid_davie is not None])
+            aanlevering_naam, aanlevering_id = self.get_aanlevering_naam_and_id(asset_uuid=drager.uuid)
             legacy_drager_uuid = drager.uuid
             legacy_drager_type = drager.short_type.split('#')[-1]
             current_lgc_drager_dict = {
@@ -885,8 +980,9 @@ class ReportCreator:
 
             record_dict = self.get_report_record_for_one_lgc_drager(lgc_drager=drager,
                                                                     record_dict=current_lgc_drager_dict)
-            df_current = DataFrame(record_dict)
-            df = concat([df, df_current])
+            records.append(record_dict)
+
+        df = self.create_dataframe_from_records(records=records, all_column_names=all_column_names)
 
         return df.sort_values('legacy_drager_naampad')
 
@@ -906,10 +1002,9 @@ class ReportCreator:
 
         toestellen: [str | NodeInfoObject]
         if record_dict['drager_verwacht'][0]:
-            dragers = list(self.collection.traverse_graph(
-                start_uuid=legacy_drager_uuid, relation_types=['HoortBij'], allowed_directions=[Direction.REVERSED],
-                return_type='info_object', filtered_node_types=['onderdeel#WVLichtmast', 'onderdeel#WVConsole',
-                                                                'onderdeel#PunctueleVerlichtingsmast']))
+            dragers = self.collection.get_neighbours(
+                start_uuid=legacy_drager_uuid, relation_types=['HoortBij'], directions=[Direction.REVERSED],
+                node_types=drager_types)
             if not dragers:
                 logging.info(f"{legacy_drager_naampad} heeft geen HoortBij relatie naar een drager")
                 record_dict['relatie_legacy_naar_drager_aanwezig'] = [False]
@@ -926,9 +1021,9 @@ class ReportCreator:
                 self.is_conform_name_convention_drager(drager_name=drager_naam, installatie_nummer=installatie_nummer,
                                                        lichtpunt_nummer=lichtpunt_nummer))
 
-            toestellen = list(self.collection.traverse_graph(
-                start_uuid=drager_uuid, relation_types=['Bevestiging'], allowed_directions=[Direction.NONE],
-                return_type='info_object', filtered_node_types=['onderdeel#VerlichtingstoestelLED']))
+            toestellen = self.collection.get_neighbours(
+                start_uuid=drager_uuid, relation_types=['Bevestiging'], directions=[Direction.NONE],
+                node_types=['onderdeel#VerlichtingstoestelLED'])
             if not toestellen:
                 if drager_naam == '':
                     drager_naam = drager_uuid
@@ -937,9 +1032,9 @@ class ReportCreator:
                 record_dict['relatie_drager_naar_toestel_aanwezig'] = [False]
                 return record_dict
         else:
-            toestellen = list(self.collection.traverse_graph(
-                start_uuid=legacy_drager_uuid, relation_types=['HoortBij'], allowed_directions=[Direction.REVERSED],
-                return_type='info_object', filtered_node_types=['onderdeel#VerlichtingstoestelLED']))
+            toestellen = self.collection.get_neighbours(
+                start_uuid=legacy_drager_uuid, relation_types=['HoortBij'], directions=[Direction.REVERSED],
+                node_types=['onderdeel#VerlichtingstoestelLED'])
             if not toestellen:
                 logging.info(f"{legacy_drager_naampad} heeft geen HoortBij relatie naar een LED toestel")
                 record_dict['relatie_drager_naar_toestel_aanwezig'] = [False]
@@ -960,9 +1055,9 @@ class ReportCreator:
                 toestel_name=toestel_name, installatie_nummer=installatie_nummer, lichtpunt_nummer=lichtpunt_nummer,
                 toestel_index=toestel_index)
 
-            controllers = list(self.collection.traverse_graph(
-                start_uuid=toestel_uuid, relation_types=['Bevestiging'], allowed_directions=[Direction.NONE],
-                return_type='info_object', filtered_node_types=['onderdeel#Armatuurcontroller']))
+            controllers = self.collection.get_neighbours(
+                start_uuid=toestel_uuid, relation_types=['Bevestiging'], directions=[Direction.NONE],
+                node_types=['onderdeel#Armatuurcontroller'])
 
             if not controllers:
                 logging.info(f"toestel {toestel_index} van {legacy_drager_naampad} heeft geen relatie "
@@ -0,0 +1,281 @@
+import argparse
+import base64
+import datetime
+import json
+import random
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from threading import Lock, Thread
+
+from API.Cassette import Cassette
+from Domain.InfoObject import short_type_to_full_uri
+
+
+def encode_short_type(short_type: str) -> str:
+    # the suffix of the asset ids and aim ids, f.e. b25kZXJkZWVsI1dWTGljaHRtYXN0 for onderdeel#WVLichtmast
+    return base64.b64encode(short_type.encode()).decode().rstrip('=')
+
+
+class SyntheticEMInfraData:
+    # lichtpunten (a VerlichtingstoestelLED with an Armatuurcontroller on a WVLichtmast that belongs to a VPLMast),
+    # spread over <delivery_count> deliveries, and the feed of their events with <feed_page_size> entries per page
+    lichtpunt_types = ['onderdeel#VerlichtingstoestelLED', 'onderdeel#WVLichtmast', 'onderdeel#Armatuurcontroller',
+                       'lgc:installatie#VPLMast']
+    lichtpunt_relations = [('onderdeel#Bevestiging', 0, 1), ('onderdeel#Bevestiging', 2, 0),
+                           ('onderdeel#HoortBij', 1, 3)]
+    start_date = datetime.datetime(2024, 1, 1, tzinfo=datetime.UTC)
+
+    def __init__(self, lichtpunt_count: int = 1000, delivery_count: int = 10, feed_page_size: int = 100):
+        self.feed_page_size = feed_page_size
+        self.assets: dict[str, dict] = {}
+        self.relations: dict[str, dict] = {}
+        self.relation_uuids_by_asset: dict[str, list[str]] = {}
+        self.event_contexts = [{'uuid': f'00000000-0000-0002-0000-{index:012}', 'omschrijving': f'DA-2024-{index:05}'}
+                               for index in range(delivery_count)]
+        self.events_by_context: dict[str, list[dict]] = {context['uuid']: [] for context in self.event_contexts}
+        self.feed_entries: list[dict] = []
+
+        for index in range(lichtpunt_count):
+            uuids = [f'00000000-0000-0000-{type_index:04}-{index:012}'
+                     for type_index in range(len(self.lichtpunt_types))]
+            for uuid, short_type in zip(uuids, self.lichtpunt_types):
+                self.add_asset(uuid=uuid, short_type=short_type, naam=f'WW{index // 100:04}.A{index % 100:02}')
+            for relation_index, (short_type, bron_index, doel_index) in enumerate(self.lichtpunt_relations):
+                self.add_relation(uuid=f'00000000-0000-0001-{relation_index:04}-{index:012}', short_type=short_type,
+                                  bron_uuid=uuids[bron_index], doel_uuid=uuids[doel_index])
+            context_uuid = self.event_contexts[index % delivery_count]['uuid']
+            for uuid, short_type in zip(uuids[:3], self.lichtpunt_types[:3]):
+                self.add_event(uuid=uuid, short_type=short_type, context_uuid=context_uuid)
+
+    def add_asset(self, uuid: str, short_type: str, naam: str) -> None:
+        self.assets[uuid] = {
+            '@type': short_type_to_full_uri(short_type),
+            '@id': f'https://data.awvvlaanderen.be/id/asset/{uuid}-{encode_short_type(short_type)}',
+            'AIMDBStatus.isActief': True,
+            'AIMNaamObject.naam': naam,
+            'AIMToestand.toestand': 'https://wegenenverkeer.data.vlaanderen.be/id/concept/KlAIMToestand/in-gebruik'}
+
+    def add_relation(self, uuid: str, short_type: str, bron_uuid: str, doel_uuid: str) -> None:
+        self.relations[uuid] = {
+            '@type': short_type_to_full_uri(short_type),
+            '@id': f'https://data.awvvlaanderen.be/id/assetrelatie/{uuid}-{encode_short_type(short_type)}',
+            'AIMDBStatus.isActief': True,
+            'RelatieObject.bron': {key: self.assets[bron_uuid][key] for key in ('@type', '@id')},
+            'RelatieObject.doel': {key: self.assets[doel_uuid][key] for key in ('@type', '@id')}}
+        for asset_uuid in (bron_uuid, doel_uuid):
+            self.relation_uuids_by_asset.setdefault(asset_uuid, []).append(uuid)
+
+    def add_event(self, uuid: str, short_type: str, context_uuid: str) -> None:
+        event_number = len(self.feed_entries)
+        created_on = (self.start_date + datetime.timedelta(seconds=event_number)).isoformat()
+        self.events_by_context[context_uuid].append({
+            'eventNumber': event_number, 'createdOn': created_on, 'type': {'name': 'ONDERDEEL_GEWIJZIGD'},
+            'data': {'aggregateId': {'_type': 'onderdeel', 'uuid': uuid}, 'contextId': context_uuid}})
+        self.feed_entries.append({
+            'id': f'00000000-0000-0003-0000-{event_number:012}', '_type': 'atom-entry', 'updated': created_on,
+            'content': {'value': {'event-type': 'NAAM_GEWIJZIGD', 'asset-type': short_type_to_full_uri(short_type),
+                                  'event-id': str(event_number), 'context-id': context_uuid, 'uuids': [uuid],
+                                  'aim-ids': [f'{uuid}-{encode_short_type(short_type)}']}}})
+
+    def search_oslo(self, resource: str, body: dict) -> tuple[list[dict], str | None]:
+        # the objects of one page and the cursor of the next page, the cursor is the offset of the next page
+        filters = body.get('filters') or {}
+        if resource == 'assets':
+            objects = [self.assets[uuid] for uuid in filters.get('uuid', self.assets) if uuid in self.assets]
+        elif resource == 'assetrelaties':
+            if 'asset' in filters:
+                relation_uuids = dict.fromkeys(relation_uuid for asset_uuid in filters['asset']
+                                               for relation_uuid in self.relation_uuids_by_asset.get(asset_uuid, []))
+            else:
+                relation_uuids = filters.get('uuid', self.relations)
+            objects = [self.relations[uuid] for uuid in relation_uuids if uuid in self.relations]
+            if 'typeUri' in filters:
+                objects = [obj for obj in objects if obj['@type'] in filters['typeUri']]
+        else:
+            objects = []
+        start = int(body.get('fromCursor') or 0)
+        end = start + body.get('size', 100)
+        return objects[start:end], str(end) if end < len(objects) else None
+
+    def get_last_feed_page_number(self) -> int:
+        return max(0, (len(self.feed_entries) - 1) // self.feed_page_size)
+
+    def get_feed_page(self, page_number: int) -> dict | None:
+        # the newest entry first; 'previous' links to the newer page, like the feedproxy
+        if not 0 <= page_number <= self.get_last_feed_page_number():
+            return None
+        entries = self.feed_entries[page_number * self.feed_page_size:(page_number + 1) * self.feed_page_size]
+        links = [{'rel': 'self', 'href': f'/{page_number}/100'}]
+        if page_number < self.get_last_feed_page_number():
+            links.append({'rel': 'previous', 'href': f'/{page_number + 1}/100'})
+        if page_number > 0:
+            links.append({'rel': 'next', 'href': f'/{page_number - 1}/100'})
+        return {'id': f'feed-{page_number}', 'links': links, 'entries': entries[::-1]}
+
+    def get_event_context(self, uuid: str) -> dict | None:
+        return next((context for context in self.event_contexts if context['uuid'] == uuid), None)
+
+    @classmethod
+    def get_query_term(cls, body: dict, property_name: str) -> object:
+        for expression in (body.get('selection') or {}).get('expressions') or []:
+            for term in expression.get('terms') or []:
+                if term.get('property') == property_name:
+                    return term.get('value')
+        return None
+
+    def search_events(self, body: dict) -> dict:
+        events = self.events_by_context.get(self.get_query_term(body, 'contextId'), [])
+        start = body.get('from') or 0
+        return {'data': events[start:start + body['size']], 'from': start, 'size': body['size'],
+                'totalCount': len(events)}
+
+    def search_event_contexts(self, body: dict) -> dict:
+        omschrijving = self.get_query_term(body, 'omschrijving') or ''
+        contexts = [context for context in self.event_contexts if omschrijving in context['omschrijving']]
+        return {'data': contexts[:body.get('size') or 10], 'from': 0, 'size': body.get('size'),
+                'totalCount': len(contexts)}
+
+
+class StubEMInfraServer:
+    # a local EM-Infra (under /eminfra/) for benchmarks and tests: a request recorded in the cassette gets its recorded
+    # answer, the others are answered from the synthetic data; every answer waits <latency> seconds
+    # faults: above <throttle_rate> requests per second (counted per window of 0.1s) the answer is a 429 with
+    # Retry-After, a fraction <error_rate> of the other answers is a 503
+    def __init__(self, data: SyntheticEMInfraData | None = None, cassette: Cassette | None = None,
+                 latency: float = 0.0, throttle_rate: float | None = None, error_rate: float = 0.0,
+                 host: str = '127.0.0.1', port: int = 0):
+        self.data = data
+        self.cassette = cassette
+        self.latency = latency
+        self.throttle_rate = throttle_rate
+        self.error_rate = error_rate
+        self.lock = Lock()
+        self.request_count = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.window_start = time.monotonic()
+        self.window_count = 0
+        stub = self
+
+        class StubHandler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                self.answer(*stub.get_answer('GET', self.path, None))
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get('Content-Length') or 0))
+                self.answer(*stub.get_answer('POST', self.path, body))
+
+            def answer(self, status_code: int, headers: dict, body: str):
+                data = body.encode()
+                self.send_response(status_code)
+                for name, value in {**headers, 'Content-Length': str(len(data))}.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), StubHandler)
+        self.server.daemon_threads = True
+        self.server.request_queue_size = 1024
+        self.thread: Thread | None = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f'http://{host}:{port}/'
+
+    def start(self) -> 'StubEMInfraServer':
+        self.thread = Thread(target=self.server.serve_forever, name='stub_em_infra', daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self) -> 'StubEMInfraServer':
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.stop()
+
+    def get_answer(self, method: str, path: str, body: bytes | None) -> tuple[int, dict, str]:
+        with self.lock:
+            self.request_count += 1
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            fault = self.get_fault()
+        time.sleep(self.latency)
+        with self.lock:
+            self.in_flight -= 1
+        if fault is not None:
+            return fault
+        if self.cassette is not None:
+            response = self.cassette.find_response(method=method, path=path, body=body)
+            if response is not None:
+                return response['status_code'], response['headers'], response['body']
+        if self.data is not None:
+            answer = self.get_synthetic_answer(method, path, json.loads(body) if body else None)
+            if answer is not None:
+                status_code, headers, content = answer
+                return status_code, {**headers, 'Content-Type': 'application/json'}, json.dumps(content)
+        return 404, {'Content-Type': 'application/json'}, json.dumps({'message': f'{method} {path} is not stubbed'})
+
+    def get_fault(self) -> tuple[int, dict, str] | None:
+        if self.throttle_rate is not None:
+            now = time.monotonic()
+            if now - self.window_start >= 0.1:
+                self.window_start, self.window_count = now, 0
+            self.window_count += 1
+            if self.window_count > self.throttle_rate * 0.1:
+                return 429, {'Retry-After': '1', 'Content-Type': 'application/json'}, '{}'
+        if self.error_rate and random.random() < self.error_rate:
+            return 503, {'Content-Type': 'application/json'}, '{}'
+        return None
+
+    def get_synthetic_answer(self, method: str, path: str, body: dict | None) -> tuple[int, dict, object] | None:
+        parts = path.strip('/').split('/')
+        if method == 'POST' and parts[:4] == ['eminfra', 'core', 'api', 'otl'] and parts[-1] == 'search':
+            objects, cursor = self.data.search_oslo(resource=parts[4], body=body)
+            return 200, {'em-paging-next-cursor': cursor} if cursor is not None else {}, {'@graph': objects}
+        if method == 'POST' and path == '/eminfra/core/api/events/search':
+            return 200, {}, self.data.search_events(body)
+        if method == 'POST' and path == '/eminfra/core/api/eventcontexts/search':
+            return 200, {}, self.data.search_event_contexts(body)
+        if method == 'GET' and parts[:3] == ['eminfra', 'core', 'api'] and parts[3:4] == ['eventcontexts']:
+            event_context = self.data.get_event_context(parts[4])
+            return None if event_context is None else (200, {}, event_context)
+        if method == 'GET' and parts[:4] == ['eminfra', 'feedproxy', 'feed', 'assets']:
+            page_number = int(parts[4]) if len(parts) > 4 else self.data.get_last_feed_page_number()
+            feed_page = self.data.get_feed_page(page_number)
+            return None if feed_page is None else (200, {}, feed_page)
+        return None
+
+
+if __name__ == '__main__':
+    # point the requester settings at the stub with "base_url": "http://127.0.0.1:<port>/"
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--port', type=int, default=8123)
+    parser.add_argument('--latency', type=float, default=0.05, help='seconds every answer waits')
+    parser.add_argument('--throttle_rate', type=float, help='requests per second above which the answer is a 429')
+    parser.add_argument('--error_rate', type=float, default=0.0, help='fraction of the answers that is a 503')
+    parser.add_argument('--cassette', type=Path, help='a cassette recorded with record_cassette_path')
+    parser.add_argument('--lichtpunten', type=int, default=1000, help='amount of synthetic lichtpunten, 0 for none')
+    parser.add_argument('--deliveries', type=int, default=10)
+    args = parser.parse_args()
+
+    stub_server = StubEMInfraServer(
+        data=SyntheticEMInfraData(lichtpunt_count=args.lichtpunten, delivery_count=args.deliveries)
+        if args.lichtpunten else None,
+        cassette=Cassette.load(args.cassette) if args.cassette else None, latency=args.latency,
+        throttle_rate=args.throttle_rate, error_rate=args.error_rate, port=args.port)
+    print(f'Serving EM-Infra on {stub_server.url}')
+    try:
+        stub_server.server.serve_forever()
+    except KeyboardInterrupt:
+        stub_server.server.server_close()
@@ -0,0 +1,147 @@
+import datetime
+import time
+from email.utils import format_datetime
+from unittest.mock import Mock
+
+import pytest
+from requests import Response
+from requests.adapters import BaseAdapter
+from requests.exceptions import ConnectionError
+
+from API.CertRequester import CertRequester
+from API.RetryPolicy import RetryPolicy
+from API.TokenBucket import TokenBucket
+
+
+class FakeAdapter(BaseAdapter):
+    # answers the requests with the given status codes (or raises the given exceptions) in order
+    def __init__(self, answers: list):
+        super().__init__()
+        self.answers = list(answers)
+        self.requests = []
+
+    def send(self, request, **kwargs) -> Response:
+        self.requests.append(request)
+        answer = self.answers.pop(0)
+        if isinstance(answer, Exception):
+            raise answer
+        status_code, headers = answer if isinstance(answer, tuple) else (answer, {})
+        response = Response()
+        response.status_code = status_code
+        response.headers.update(headers)
+        response.url = request.url
+        response.request = request
+        response._content = b'{}'
+        return response
+
+    def close(self):
+        pass
+
+
+def create_requester(tmp_path, answers: list, retry_policy: RetryPolicy = None,
+                     rate_limiter: TokenBucket = None) -> (CertRequester, FakeAdapter):
+    (tmp_path / 'cert.crt').touch()
+    (tmp_path / 'cert.key').touch()
+    requester = CertRequester(cert_path=tmp_path / 'cert.crt', key_path=tmp_path / 'cert.key',
+                              first_part_url='https://services.test/',
+                              retry_policy=retry_policy or RetryPolicy(max_retries=3, backoff_factor=0),
+                              rate_limiter=rate_limiter)
+    adapter = FakeAdapter(answers)
+    requester.mount('https://', adapter)
+    return requester, adapter
+
+
+def test_get_is_retried_on_retry_statuses_and_connection_errors(tmp_path):
+    requester, adapter = create_requester(tmp_path, [503, ConnectionError('connection reset'), 200])
+
+    response = requester.get(url='core/api/assets')
+
+    assert response.status_code == 200
+    assert len(adapter.requests) == 3
+
+
+def test_last_response_is_returned_when_the_retries_run_out(tmp_path):
+    requester, adapter = create_requester(tmp_path, [502, 502, 502, 502, 200])
+
+    response = requester.get(url='core/api/assets')
+
+    assert response.status_code == 502
+    assert len(adapter.requests) == 4
+
+
+def test_post_is_only_retried_when_marked_idempotent(tmp_path):
+    requester, adapter = create_requester(tmp_path, [503, 503, 200])
+
+    assert requester.post(url='core/api/assets', json={}).status_code == 503
+    assert requester.post(url='core/api/assets/search', json={}, idempotent=True).status_code == 200
+    assert len(adapter.requests) == 3
+
+
+def test_connection_error_of_post_is_raised(tmp_path):
+    requester, adapter = create_requester(tmp_path, [ConnectionError('connection reset'), 200])
+
+    with pytest.raises(ConnectionError):
+        requester.post(url='core/api/assets', json={})
+    assert len(adapter.requests) == 1
+
+
+def test_client_errors_are_not_retried(tmp_path):
+    requester, adapter = create_requester(tmp_path, [404, 200])
+
+    assert requester.get(url='core/api/assets').status_code == 404
+    assert len(adapter.requests) == 1
+
+
+def test_retry_after_is_honoured(tmp_path, monkeypatch):
+    sleep = Mock()
+    monkeypatch.setattr(time, 'sleep', sleep)
+    retry_at = datetime.datetime.now(datetime.UTC) + datetime.timedelta(seconds=30)
+    requester, _ = create_requester(
+        tmp_path, [(429, {'Retry-After': '7'}), (503, {'Retry-After': format_datetime(retry_at, usegmt=True)}),
+                   (503, {'Retry-After': '3600'}), 200],
+        retry_policy=RetryPolicy(max_retries=3, backoff_factor=0, max_retry_after=60))
+
+    assert requester.get(url='core/api/assets').status_code == 200
+
+    delays = [call.args[0] for call in sleep.call_args_list]
+    assert delays[0] == 7
+    assert 25 < delays[1] <= 30
+    assert delays[2] == 60
+
+
+def test_retry_after_date_without_zone_is_utc(tmp_path, monkeypatch):
+    sleep = Mock()
+    monkeypatch.setattr(time, 'sleep', sleep)
+    retry_at = datetime.datetime.now(datetime.UTC) + datetime.timedelta(seconds=30)
+    requester, _ = create_requester(
+        tmp_path, [(503, {'Retry-After': retry_at.strftime('%a, %d %b %Y %H:%M:%S -0000')}),
+                   (503, {'Retry-After': 'Wed, 21 Oct 2015 07:28:00 -0000'}), 200],
+        retry_policy=RetryPolicy(max_retries=2, backoff_factor=0))
+
+    assert requester.get(url='core/api/assets').status_code == 200
+
+    delays = [call.args[0] for call in sleep.call_args_list]
+    assert 25 < delays[0] <= 30
+    assert delays[1] == 0
+
+
+def test_backoff_grows_exponentially_with_jitter():
+    retry_policy = RetryPolicy(backoff_factor=0.5, max_backoff=3)
+
+    for attempt, maximum in enumerate([0.5, 1, 2, 3, 3]):
+        delays = [retry_policy.get_delay(attempt) for _ in range(100)]
+        assert all(0 <= delay <= maximum for delay in delays)
+        assert max(delays) > maximum / 2
+
+
+def test_token_bucket_paces_the_requests(tmp_path):
+    requester, adapter = create_requester(tmp_path, [200] * 6, rate_limiter=TokenBucket(rate=50, capacity=2))
+
+    start = time.monotonic()
+    for _ in range(6):
+        requester.get(url='core/api/assets')
+    elapsed = time.monotonic() - start
+
+    # the first 2 requests are a burst, the other 4 wait 1/50s each
+    assert len(adapter.requests) == 6
+    assert elapsed >= 0.07
@@ -0,0 +1,96 @@
+import datetime
+from pathlib import Path
+from unittest.mock import Mock
+
+import pytest
+
+from API.EMInfraRestClient import EMInfraRestClient
+from Database.AssetCacheManager import AssetCacheManager
+from Domain.AssetInfoCollector import AssetInfoCollector
+from UnitTests.FakeEminfraImporter import fake_get_objects_from_oslo_search_endpoint_using_iterator
+
+pattern = [('uuids', 'of', 'a'),
+           ('a', 'type_of', ['onderdeel#VerlichtingstoestelLED']),
+           ('a', '-[r1]-', 'b'),
+           ('b', 'type_of', ['onderdeel#WVLichtmast', 'onderdeel#WVConsole']),
+           ('b', '-[r2]->', 'c'),
+           ('c', 'type_of', ['lgc:installatie#VPLMast', 'lgc:installatie#VPConsole']),
+           ('r1', 'type_of', ['onderdeel#Bevestiging']),
+           ('r2', 'type_of', ['onderdeel#HoortBij'])]
+
+
+def create_collector(cache_manager: AssetCacheManager) -> AssetInfoCollector:
+    collector = AssetInfoCollector(em_infra_rest_client=Mock(), emson_importer=Mock(),
+                                   asset_cache_manager=cache_manager)
+    collector.em_infra_importer = Mock(spec=EMInfraRestClient)
+    collector.em_infra_importer.get_objects_from_oslo_search_endpoint_using_iterator = Mock(
+        side_effect=fake_get_objects_from_oslo_search_endpoint_using_iterator)
+    return collector
+
+
+def test_asset_info_collector_reads_from_cache(tmp_path: Path):
+    cache_manager = AssetCacheManager(cache_db_path=tmp_path / 'asset_cache.db')
+    starting_uuids = ['00000000-0000-0000-0000-000000000002', '00000000-0000-0000-0000-000000000003']
+
+    first_collector = create_collector(cache_manager)
+    first_collector.start_collecting_from_starting_uuids_using_pattern(starting_uuids=starting_uuids, pattern=pattern)
+    assert first_collector.em_infra_importer.get_objects_from_oslo_search_endpoint_using_iterator.call_count > 0
+
+    second_collector = create_collector(cache_manager)
+    second_collector.start_collecting_from_starting_uuids_using_pattern(starting_uuids=starting_uuids, pattern=pattern)
+    assert second_collector.em_infra_importer.get_objects_from_oslo_search_endpoint_using_iterator.call_count == 0
+    assert second_collector.collection.short_uri_dict == first_collector.collection.short_uri_dict
+
+
+def test_invalidate_uuids_only_refetches_changed_assets(tmp_path: Path):
+    cache_manager = AssetCacheManager(cache_db_path=tmp_path / 'asset_cache.db')
+    starting_uuids = ['00000000-0000-0000-0000-000000000002', '00000000-0000-0000-0000-000000000003']
+    create_collector(cache_manager).start_collecting_from_starting_uuids_using_pattern(
+        starting_uuids=starting_uuids, pattern=pattern)
+
+    cache_manager.invalidate_uuids(['00000000-0000-0000-0000-000000000004'])
+    assert cache_manager.get_assets(['00000000-0000-0000-0000-000000000004']) == []
+    # the relations of the led on the changed mast are no longer complete
+    assert cache_manager.get_expanded_uuids(['00000000-0000-0000-0000-000000000002'],
+                                            relation_types=['onderdeel#Bevestiging']) == set()
+    assert cache_manager.get_expanded_uuids(['00000000-0000-0000-0000-000000000003'],
+                                            relation_types=['onderdeel#Bevestiging']) == {
+        '00000000-0000-0000-0000-000000000003'}
+
+    collector = create_collector(cache_manager)
+    collector.start_collecting_from_starting_uuids_using_pattern(starting_uuids=starting_uuids, pattern=pattern)
+    calls = collector.em_infra_importer.get_objects_from_oslo_search_endpoint_using_iterator.call_args_list
+    assert [(c.kwargs['resource'], c.kwargs['filter_dict'].get('uuid', c.kwargs['filter_dict'].get('asset')))
+            for c in calls] == [
+        ('assetrelaties', ['00000000-0000-0000-0000-000000000002']),
+        ('assets', ['00000000-0000-0000-0000-000000000004']),
+        ('assetrelaties', ['00000000-0000-0000-0000-000000000004'])]
+
+
+def test_invalidate_uuids_of_a_new_relation_event_clears_both_assets(tmp_path: Path):
+    cache_manager = AssetCacheManager(cache_db_path=tmp_path / 'asset_cache.db')
+    starting_uuids = ['00000000-0000-0000-0000-000000000002', '00000000-0000-0000-0000-000000000003']
+    create_collector(cache_manager).start_collecting_from_starting_uuids_using_pattern(
+        starting_uuids=starting_uuids, pattern=pattern)
+
+    # a new relation between two unchanged assets: the relation itself is not in the cache, its event names both assets
+    cache_manager.invalidate_uuids(['00000000-0000-0000-0001-000000000099'] + starting_uuids)
+
+    assert cache_manager.get_expanded_uuids(starting_uuids, relation_types=['onderdeel#Bevestiging']) == set()
+    assert len(cache_manager.get_assets(['00000000-0000-0000-0000-000000000004'])) == 1
+
+
+def test_cached_rows_expire_after_max_age(tmp_path: Path):
+    cache_manager = AssetCacheManager(cache_db_path=tmp_path / 'asset_cache.db')
+    starting_uuids = ['00000000-0000-0000-0000-000000000002']
+    create_collector(cache_manager).start_collecting_from_starting_uuids_using_pattern(
+        starting_uuids=starting_uuids, pattern=pattern)
+    expired_cache_manager = AssetCacheManager(cache_db_path=tmp_path / 'asset_cache.db',
+                                              max_age=datetime.timedelta(seconds=0))
+
+    assert cache_manager.get_expanded_uuids(starting_uuids, relation_types=['onderdeel#Bevestiging']) == set(
+        starting_uuids)
+    assert expired_cache_manager.get_expanded_uuids(starting_uuids, relation_types=['onderdeel#Bevestiging']) == set()
+    assert expired_cache_manager.get_assets(starting_uuids) == []
+    with pytest.raises(ValueError):
+        AssetCacheManager(cache_db_path=tmp_path / 'asset_cache.db', max_age=None)
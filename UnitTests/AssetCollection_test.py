@@ -4,6 +4,7 @@ import pytest
 
 from Domain.AssetCollection import AssetCollection
 from Domain.Enums import Direction
+from Domain.InfoObject import RelationEdge
 from Exceptions.AssetsMissingError import AssetsMissingError
 from Exceptions.ObjectAlreadyExistsError import ObjectAlreadyExistsError
 
@@ -221,19 +222,15 @@ def test_check_attributes_after_adding_relation():
     assert m1_object.is_relation is False
     assert m1_object.relations == {
         'Bevestiging': {
-            '0002': {
-                'direction': Direction.NONE,
-                'relation_object': relation_object,
-                'node_object': m2_object}
+            '0002': RelationEdge(
+                direction=Direction.NONE, relation_object=relation_object, node_object=m2_object)
         }
     }
     assert m2_object.is_relation is False
     assert m2_object.relations == {
         'Bevestiging': {
-            '0001': {
-                'direction': Direction.NONE,
-                'relation_object': relation_object,
-                'node_object': m1_object}
+            '0001': RelationEdge(
+                direction=Direction.NONE, relation_object=relation_object, node_object=m1_object)
         }
     }
 
@@ -267,19 +264,15 @@ def test_check_attributes_after_adding_directional_relation():
     assert m1_object.is_relation is False
     assert m1_object.relations == {
         'Voedt': {
-            '0002': {
-                'direction': Direction.WITH,
-                'relation_object': relation_object,
-                'node_object': m2_object}
+            '0002': RelationEdge(
+                direction=Direction.WITH, relation_object=relation_object, node_object=m2_object)
         }
     }
     assert m2_object.is_relation is False
     assert m2_object.relations == {
         'Voedt': {
-            '0001': {
-                'direction': Direction.REVERSED,
-                'relation_object': relation_object,
-                'node_object': m1_object}
+            '0001': RelationEdge(
+                direction=Direction.REVERSED, relation_object=relation_object, node_object=m1_object)
         }
     }
 
@@ -394,3 +387,110 @@ def test_traverse_graph_invalid_start():
     collection.add_node(a1)
     with pytest.raises(ValueError):
         collection.traverse_graph(start_uuid='0002')
+
+
+def test_info_objects_are_slotted_and_share_type_strings():
+    collection = AssetCollection()
+    collection.add_node({'uuid': '0001', 'typeURI': 'https://wegenenverkeer.data.vlaanderen.be/ns/onderdeel#WVLichtmast'})
+    collection.add_node({'uuid': '0002', 'typeURI': 'https://wegenenverkeer.data.vlaanderen.be/ns/onderdeel#WVLichtmast'})
+    collection.add_relation({'uuid': '0001-0002', 'bron': '0001', 'doel': '0002',
+                             'typeURI': 'https://wegenenverkeer.data.vlaanderen.be/ns/onderdeel#Bevestiging'})
+
+    m1_object = collection.get_node_object_by_uuid('0001')
+    m2_object = collection.get_node_object_by_uuid('0002')
+    assert not hasattr(m1_object, '__dict__')
+    assert not hasattr(collection.get_relation_object_by_uuid('0001-0002'), '__dict__')
+    assert m1_object.short_type is m2_object.short_type
+    assert next(iter(m1_object.relations)) is next(iter(m2_object.relations))
+
+
+def test_add_node_with_attribute_projection():
+    collection = AssetCollection(attribute_projection={
+        '*': frozenset({'AIMNaamObject.naam'}), 'onderdeel#WVLichtmast': frozenset({'geo:Geometrie.log'})})
+    collection.add_node({'uuid': '0001', 'typeURI': 'https://wegenenverkeer.data.vlaanderen.be/ns/onderdeel#WVLichtmast',
+                         'AIMDBStatus.isActief': False, 'AIMNaamObject.naam': 'A0000.A01', 'geo:Geometrie.log': [],
+                         'tz:Toezicht.toezichter': {}})
+    collection.add_node({'uuid': '0002', 'typeURI': 'https://wegenenverkeer.data.vlaanderen.be/ns/onderdeel#WVConsole',
+                         'AIMNaamObject.naam': 'A0000.C01', 'geo:Geometrie.log': []})
+
+    m1_object = collection.get_node_object_by_uuid('0001')
+    assert m1_object.attr_dict == {
+        'uuid': '0001', 'typeURI': 'https://wegenenverkeer.data.vlaanderen.be/ns/onderdeel#WVLichtmast',
+        'AIMDBStatus.isActief': False, 'AIMNaamObject.naam': 'A0000.A01', 'geo:Geometrie.log': []}
+    assert m1_object.active is False
+    assert collection.get_attribute_dict_by_uuid('0002') == {
+        'uuid': '0002', 'typeURI': 'https://wegenenverkeer.data.vlaanderen.be/ns/onderdeel#WVConsole',
+        'AIMNaamObject.naam': 'A0000.C01'}
+
+
+def test_get_neighbours():
+    collection = AssetCollection()
+    collection.add_node({'uuid': '0001', 'typeURI': 'https://wegenenverkeer.data.vlaanderen.be/ns/onderdeel#WVLichtmast'})
+    collection.add_node({'uuid': '0002', 'typeURI': 'https://wegenenverkeer.data.vlaanderen.be/ns/onderdeel#'
+                                                    'VerlichtingstoestelLED'})
+    collection.add_node({'uuid': '0003', 'typeURI': 'https://wegenenverkeer.data.vlaanderen.be/ns/onderdeel#'
+                                                    'Armatuurcontroller'})
+    collection.add_node({'uuid': '0004', 'typeURI': 'https://wegenenverkeer.data.vlaanderen.be/ns/onderdeel#'
+                                                    'VerlichtingstoestelLED', 'AIMDBStatus.isActief': False})
+    collection.add_node({'uuid': '0005', 'typeURI': 'https://wegenenverkeer.data.vlaanderen.be/ns/onderdeel#Montagekast'})
+    for bron, doel, relation_type in [('0002', '0001', 'Bevestiging'), ('0003', '0001', 'Bevestiging'),
+                                      ('0004', '0001', 'Bevestiging'), ('0005', '0001', 'Voedt')]:
+        collection.add_relation({'uuid': f'{bron}-{doel}', 'bron': bron, 'doel': doel,
+                                 'typeURI': f'https://wegenenverkeer.data.vlaanderen.be/ns/onderdeel#{relation_type}'})
+
+    neighbours = collection.get_neighbours(start_uuid='0001', relation_types=['Bevestiging'],
+                                           directions=[Direction.NONE],
+                                           node_types=['onderdeel#VerlichtingstoestelLED'])
+    assert [node.uuid for node in neighbours] == ['0002']
+
+    neighbours = collection.get_neighbours(start_uuid='0001', node_types=['onderdeel#VerlichtingstoestelLED'],
+                                           only_active=False)
+    assert [node.uuid for node in neighbours] == ['0002', '0004']
+
+    neighbours = collection.get_neighbours(start_uuid='0001', directions=[Direction.REVERSED])
+    assert [node.uuid for node in neighbours] == ['0005']
+
+    assert collection.get_neighbours(start_uuid='0001', relation_types=['Voedt'], directions=[Direction.WITH]) == []
+    edges = collection.get_node_object_by_uuid('0001').edges
+    assert {relation_name: list(edges_by_key) for relation_name, edges_by_key in edges.items()} == {
+        'Bevestiging': [(Direction.NONE, 'onderdeel#VerlichtingstoestelLED'),
+                        (Direction.NONE, 'onderdeel#Armatuurcontroller')],
+        'Voedt': [(Direction.REVERSED, 'onderdeel#Montagekast')]}
+
+
+def test_save_and_load_snapshot(tmp_path):
+    collection = AssetCollection(attribute_projection={'*': frozenset({'AIMNaamObject.naam'})})
+    collection.add_node({'uuid': '0001', 'typeURI': 'https://wegenenverkeer.data.vlaanderen.be/ns/onderdeel#WVLichtmast',
+                         'AIMNaamObject.naam': 'A0000.A01'})
+    collection.add_node({'uuid': '0002', 'typeURI': 'https://wegenenverkeer.data.vlaanderen.be/ns/onderdeel#'
+                                                    'VerlichtingstoestelLED', 'AIMDBStatus.isActief': False})
+    collection.add_node({'uuid': '0003', 'typeURI': 'https://wegenenverkeer.data.vlaanderen.be/ns/onderdeel#Montagekast'})
+    collection.add_relation({'uuid': '0002-0001', 'bron': '0002', 'doel': '0001',
+                             'typeURI': 'https://wegenenverkeer.data.vlaanderen.be/ns/onderdeel#Bevestiging'})
+    collection.add_relation({'uuid': '0003-0001', 'bron': '0003', 'doel': '0001',
+                             'typeURI': 'https://wegenenverkeer.data.vlaanderen.be/ns/onderdeel#Voedt'})
+
+    collection.save_snapshot(tmp_path / 'snapshot.pkl')
+    loaded = AssetCollection.load_snapshot(tmp_path / 'snapshot.pkl')
+
+    assert list(loaded.object_dict) == ['0001', '0002', '0003', '0002-0001', '0003-0001']
+    assert loaded.short_uri_dict == collection.short_uri_dict
+    assert loaded.attribute_projection == collection.attribute_projection
+    assert loaded.get_attribute_dict_by_uuid('0001') == collection.get_attribute_dict_by_uuid('0001')
+    assert loaded.get_node_object_by_uuid('0002').active is False
+    loaded_edges = loaded.get_node_object_by_uuid('0001').edges
+    edges = collection.get_node_object_by_uuid('0001').edges
+    assert ({name: list(keys) for name, keys in loaded_edges.items()} ==
+            {name: list(keys) for name, keys in edges.items()})
+    assert [node.uuid for node in loaded.get_neighbours(start_uuid='0001', only_active=False)] == ['0002', '0003']
+    assert [node.uuid for node in loaded.get_neighbours(start_uuid='0001', directions=[Direction.REVERSED])] == ['0003']
+    assert loaded.get_relation_object_by_uuid('0003-0001').doel is loaded.get_node_object_by_uuid('0001')
+
+
+def test_load_snapshot_other_version(tmp_path):
+    collection = AssetCollection()
+    collection.snapshot_version = 0
+    collection.save_snapshot(tmp_path / 'snapshot.pkl')
+
+    with pytest.raises(ValueError):
+        AssetCollection.load_snapshot(tmp_path / 'snapshot.pkl')
@@ -1,7 +1,12 @@
-﻿from unittest.mock import Mock
+﻿from collections import Counter
+from copy import deepcopy
+from unittest.mock import Mock
 
 from API.AbstractRequester import AbstractRequester
+from API.EMInfraRestClient import EMInfraRestClient
 from Domain.AssetInfoCollector import AssetInfoCollector
+from Domain.CollectionPatterns import toestel_plan, armatuurcontroller_plan, drager_plan, legacy_drager_plan
+from Domain.QueryPlan import QueryPlan
 from UnitTests.FakeEminfraImporter import fake_get_objects_from_oslo_search_endpoint_using_iterator, \
     fake_em_infra_importer
 
@@ -64,18 +69,12 @@ def test_start_collecting_from_starting_uuids_using_pattern_giving_uuids_of_a():
                            '000000000002-Bevestigin-000000000026',
                            '000000000003-Bevestigin-000000000007',
                            '000000000005-Bevestigin-000000000003',
-                           '000000000006-Bevestigin-000000000002',
-                           '000000000022-Bevestigin-000000000004',
-                           '000000000023-Bevestigin-000000000004',
-                           '000000000024-Bevestigin-000000000004'},
+                           '000000000006-Bevestigin-000000000002'},
  'onderdeel#HoortBij': {'000000000004--HoortBij--000000000008',
                         '000000000005--HoortBij--000000000009',
                         '000000000025--HoortBij--000000000021'},
  'onderdeel#VerlichtingstoestelLED': {'00000000-0000-0000-0000-000000000002',
                                       '00000000-0000-0000-0000-000000000003',
-                                      '00000000-0000-0000-0000-000000000022',
-                                      '00000000-0000-0000-0000-000000000023',
-                                      '00000000-0000-0000-0000-000000000024',
                                       '00000000-0000-0000-0000-000000000025'},
  'onderdeel#WVConsole': {'00000000-0000-0000-0000-000000000005'},
  'onderdeel#WVLichtmast': {'00000000-0000-0000-0000-000000000004'}}
@@ -157,17 +156,11 @@ def test_start_collecting_from_starting_uuids_using_pattern_giving_uuids_of_d_mu
                                   '000000000002-Bevestigin-000000000026',
                                   '000000000003-Bevestigin-000000000007',
                                   '000000000005-Bevestigin-000000000003',
-                                  '000000000006-Bevestigin-000000000002',
-                                  '000000000022-Bevestigin-000000000004',
-                                  '000000000023-Bevestigin-000000000004',
-                                  '000000000024-Bevestigin-000000000004'},
+                                  '000000000006-Bevestigin-000000000002'},
         'onderdeel#HoortBij': {'000000000004--HoortBij--000000000008',
                                '000000000005--HoortBij--000000000009'},
         'onderdeel#VerlichtingstoestelLED': {'00000000-0000-0000-0000-000000000002',
-                                             '00000000-0000-0000-0000-000000000003',
-                                             '00000000-0000-0000-0000-000000000022',
-                                             '00000000-0000-0000-0000-000000000023',
-                                             '00000000-0000-0000-0000-000000000024'},
+                                             '00000000-0000-0000-0000-000000000003'},
         'onderdeel#WVConsole': {'00000000-0000-0000-0000-000000000005'},
         'onderdeel#WVLichtmast': {'00000000-0000-0000-0000-000000000004'}}
 
@@ -202,17 +195,11 @@ def test_start_collecting_from_starting_uuids_using_pattern_giving_uuids_of_d():
                                   '000000000002-Bevestigin-000000000026',
                                   '000000000003-Bevestigin-000000000007',
                                   '000000000005-Bevestigin-000000000003',
-                                  '000000000006-Bevestigin-000000000002',
-                                  '000000000022-Bevestigin-000000000004',
-                                  '000000000023-Bevestigin-000000000004',
-                                  '000000000024-Bevestigin-000000000004'},
+                                  '000000000006-Bevestigin-000000000002'},
         'onderdeel#HoortBij': {'000000000004--HoortBij--000000000008',
                                '000000000005--HoortBij--000000000009'},
         'onderdeel#VerlichtingstoestelLED': {'00000000-0000-0000-0000-000000000002',
-                                             '00000000-0000-0000-0000-000000000003',
-                                             '00000000-0000-0000-0000-000000000022',
-                                             '00000000-0000-0000-0000-000000000023',
-                                             '00000000-0000-0000-0000-000000000024'},
+                                             '00000000-0000-0000-0000-000000000003'},
         'onderdeel#WVConsole': {'00000000-0000-0000-0000-000000000005'},
         'onderdeel#WVLichtmast': {'00000000-0000-0000-0000-000000000004'}}
 
@@ -274,3 +261,113 @@ def test_reverse_relation_pattern():
 
     reversed4 = AssetInfoCollector.reverse_relation_pattern(('a', '<-[r1]-', 'b'))
     assert reversed4 == ('b', '-[r1]->', 'a')
+
+
+def test_start_collecting_from_starting_uuids_using_pattern_only_queries_frontier():
+    collector = AssetInfoCollector(em_infra_rest_client=Mock(), emson_importer=Mock())
+    collector.em_infra_importer = Mock(spec=EMInfraRestClient)
+    collector.em_infra_importer.get_objects_from_oslo_search_endpoint_using_iterator = Mock(
+        side_effect=fake_get_objects_from_oslo_search_endpoint_using_iterator)
+    pattern = [('uuids', 'of', 'a'),
+               ('a', 'type_of', ['onderdeel#VerlichtingstoestelLED']),
+               ('a', '-[r1]-', 'b'),
+               ('b', 'type_of', ['onderdeel#WVLichtmast', 'onderdeel#WVConsole', 'onderdeel#Armatuurcontroller']),
+               ('b', '-[r2]->', 'c'),
+               ('c', 'type_of', ['lgc:installatie#VPLMast', 'lgc:installatie#VPConsole']),
+               ('r1', 'type_of', ['onderdeel#Bevestiging']),
+               ('r2', 'type_of', ['onderdeel#HoortBij'])]
+
+    collector.start_collecting_from_starting_uuids_using_pattern(
+        starting_uuids=['00000000-0000-0000-0000-000000000002', '00000000-0000-0000-0000-000000000003'],
+        pattern=pattern)
+    relation_calls = [c for c in collector.em_infra_importer.get_objects_from_oslo_search_endpoint_using_iterator.
+                      call_args_list if c.kwargs['resource'] == 'assetrelaties']
+    queried_uuids = [uuid for c in relation_calls for uuid in c.kwargs['filter_dict']['asset']]
+    assert len(queried_uuids) == len(set(queried_uuids))
+    short_uri_dict_after_first_run = deepcopy(collector.collection.short_uri_dict)
+
+    collector.em_infra_importer.get_objects_from_oslo_search_endpoint_using_iterator.reset_mock()
+    collector.start_collecting_from_starting_uuids_using_pattern(
+        starting_uuids=['00000000-0000-0000-0000-000000000002', '00000000-0000-0000-0000-000000000003'],
+        pattern=pattern)
+    relation_calls = [c for c in collector.em_infra_importer.get_objects_from_oslo_search_endpoint_using_iterator.
+                      call_args_list if c.kwargs['resource'] == 'assetrelaties']
+    assert relation_calls == []
+    assert collector.collection.short_uri_dict == short_uri_dict_after_first_run
+
+
+def test_start_collecting_from_starting_uuids_using_pattern_pushes_relation_types_to_search():
+    collector = AssetInfoCollector(em_infra_rest_client=Mock(), emson_importer=Mock())
+    collector.em_infra_importer = Mock(spec=EMInfraRestClient)
+    collector.em_infra_importer.get_objects_from_oslo_search_endpoint_using_iterator = Mock(
+        side_effect=fake_get_objects_from_oslo_search_endpoint_using_iterator)
+
+    collector.start_collecting_from_starting_uuids_using_pattern(
+        starting_uuids=['00000000-0000-0000-0000-000000000004'],
+        pattern=[('uuids', 'of', 'a'),
+                 ('a', 'type_of', ['onderdeel#WVLichtmast']),
+                 ('a', '-[r1]->', 'b'),
+                 ('b', 'type_of', ['lgc:installatie#VPLMast']),
+                 ('r1', 'type_of', ['onderdeel#HoortBij'])])
+
+    relation_calls = [c for c in collector.em_infra_importer.get_objects_from_oslo_search_endpoint_using_iterator.
+                      call_args_list if c.kwargs['resource'] == 'assetrelaties']
+    assert relation_calls[0].kwargs['filter_dict'] == {
+        'asset': ['00000000-0000-0000-0000-000000000004'],
+        'typeUri': ['https://grp.data.wegenenverkeer.be/ns/onderdeel#HoortBij']}
+    assert collector.collection.short_uri_dict == {
+        'lgc:installatie#VPLMast': {'00000000-0000-0000-0000-000000000008'},
+        'onderdeel#HoortBij': {'000000000004--HoortBij--000000000008'},
+        'onderdeel#WVLichtmast': {'00000000-0000-0000-0000-000000000004'}}
+
+
+def test_start_collecting_from_starting_uuids_using_plan_fetches_shared_assets_once():
+    plans = {'toestel': QueryPlan.from_pattern(
+        [('uuids', 'of', 'a'),
+         ('a', 'type_of', ['onderdeel#VerlichtingstoestelLED']),
+         ('a', '-[r1]-', 'b'),
+         ('b', 'type_of', ['onderdeel#WVLichtmast', 'onderdeel#WVConsole']),
+         ('r1', 'type_of', ['onderdeel#Bevestiging'])]),
+        'drager': QueryPlan.from_pattern(
+        [('uuids', 'of', 'a'),
+         ('a', 'type_of', ['onderdeel#WVLichtmast', 'onderdeel#WVConsole']),
+         ('a', '-[r1]-', 'b'),
+         ('b', 'type_of', ['onderdeel#VerlichtingstoestelLED']),
+         ('r1', 'type_of', ['onderdeel#Bevestiging'])])}
+    starting_uuids = ['00000000-0000-0000-0000-000000000002', '00000000-0000-0000-0000-000000000004']
+
+    collector = AssetInfoCollector(em_infra_rest_client=Mock(), emson_importer=Mock())
+    collector.em_infra_importer = fake_em_infra_importer
+    statistics = {}
+    for name, plan in plans.items():
+        collector.start_collecting_from_starting_uuids_using_plan(
+            starting_uuids=starting_uuids, plan=plan, statistics=statistics.setdefault(name, Counter()))
+
+    # the second plan does not fetch the starting assets again
+    assert statistics['toestel']['relation_queries'] == 1
+    assert statistics['toestel']['fetched_assets'] >= len(starting_uuids)
+    assert statistics['drager']['skipped_assets'] >= len(starting_uuids)
+
+
+def test_search_in_parallel_uuid_chunks_collects_the_same():
+    plans = {'toestel': toestel_plan, 'armatuurcontroller': armatuurcontroller_plan, 'drager': drager_plan,
+             'legacy': legacy_drager_plan}
+    starting_uuids = [f'00000000-0000-0000-0000-0000000000{index:02}' for index in [2, 3, 4, 5, 6, 7, 8, 9, 22, 26]]
+
+    serial_collector = AssetInfoCollector(em_infra_rest_client=Mock(), emson_importer=Mock())
+    serial_collector.em_infra_importer = fake_em_infra_importer
+    for plan in plans.values():
+        serial_collector.start_collecting_from_starting_uuids_using_plan(starting_uuids=starting_uuids, plan=plan)
+
+    collector = AssetInfoCollector(em_infra_rest_client=Mock(), emson_importer=Mock(), search_max_workers=3,
+                                   search_chunk_size=2, search_page_size=500)
+    collector.em_infra_importer = Mock(spec=EMInfraRestClient)
+    collector.em_infra_importer.get_objects_from_oslo_search_endpoint_using_iterator = Mock(
+        side_effect=fake_get_objects_from_oslo_search_endpoint_using_iterator)
+    for plan in plans.values():
+        collector.start_collecting_from_starting_uuids_using_plan(starting_uuids=starting_uuids, plan=plan)
+
+    assert collector.collection.short_uri_dict == serial_collector.collection.short_uri_dict
+    calls = collector.em_infra_importer.get_objects_from_oslo_search_endpoint_using_iterator.call_args_list
+    assert all(len(c.kwargs['filter_dict'].get('uuid', c.kwargs['filter_dict'].get('asset'))) <= 2 for c in calls)
+    assert all(c.kwargs['size'] == 500 for c in calls)
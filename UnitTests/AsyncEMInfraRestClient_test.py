@@ -0,0 +1,103 @@
+import asyncio
+from unittest.mock import Mock
+
+import pytest
+
+from API.AsyncEMInfraRestClient import AsyncEMInfraRestClient
+from API.AsyncRequester import AsyncRequester
+from API.CertRequester import CertRequester
+from API.EMInfraRestClient import EMInfraRestClient
+from API.EMsonImporter import EMsonImporter
+from API.PrefixedRequester import PrefixedRequester
+from Database.DbManager import DbManager
+from Domain.AssetInfoCollector import AssetInfoCollector
+from Domain.DeliveryFinder import DeliveryFinder
+from TestSupport.StubEMInfraServer import StubEMInfraServer, SyntheticEMInfraData
+
+data = SyntheticEMInfraData(lichtpunt_count=23, delivery_count=12)
+asset_uuids = [uuid for uuid in data.assets if uuid[19:23] == '0001']
+context_uuids = [event_context['uuid'] for event_context in data.event_contexts]
+
+
+@pytest.fixture
+def stub_server():
+    with StubEMInfraServer(data=data) as server:
+        yield server
+
+
+@pytest.fixture
+def requester(stub_server, tmp_path):
+    (tmp_path / 'cert.crt').touch()
+    (tmp_path / 'cert.key').touch()
+    requester = CertRequester(cert_path=tmp_path / 'cert.crt', key_path=tmp_path / 'cert.key',
+                              first_part_url=stub_server.url)
+    yield requester
+    requester.close()
+
+
+@pytest.fixture
+def async_client(requester):
+    async_requester = AsyncRequester(requester, max_concurrency=4)
+    yield AsyncEMInfraRestClient(async_requester)
+    async_requester.close()
+
+
+def test_search_follows_the_cursor_like_the_sync_client(requester, async_client):
+    sync_client = EMInfraRestClient(PrefixedRequester(requester))
+
+    objects = asyncio.run(async_client.get_objects_from_oslo_search_endpoint(
+        resource='assets', size=5, filter_dict={'uuid': asset_uuids}))
+
+    assert [obj['@id'][39:75] for obj in objects] == asset_uuids
+    assert objects == list(sync_client.get_objects_from_oslo_search_endpoint_using_iterator(
+        resource='assets', size=5, filter_dict={'uuid': asset_uuids}))
+
+
+def test_requests_in_flight_are_bounded(stub_server, async_client):
+    stub_server.latency = 0.05
+
+    event_contexts = asyncio.run(async_client.get_event_contexts_by_uuids(uuids=context_uuids))
+
+    assert [event_context.uuid for event_context in event_contexts] == context_uuids
+    assert 1 < stub_server.max_in_flight <= 4
+
+
+def test_events_of_eventcontext_are_collected_in_order(async_client):
+    events = asyncio.run(async_client.get_feed_events_by_eventcontext_id(context_id=context_uuids[0], size=2))
+
+    assert [event.eventNumber for event in events] == [
+        event['eventNumber'] for event in data.events_by_context[context_uuids[0]]]
+
+
+def test_failing_request_raises(async_client):
+    async_client.requester.first_part_url += 'unknown/'
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(async_client.get_current_feed_page())
+
+
+def test_asset_info_collector_searches_chunks_with_async_client(requester, async_client):
+    sync_collector = AssetInfoCollector(em_infra_rest_client=EMInfraRestClient(PrefixedRequester(requester)),
+                                        emson_importer=Mock(spec=EMsonImporter), search_page_size=2)
+    async_collector = AssetInfoCollector(em_infra_rest_client=Mock(spec=EMInfraRestClient),
+                                         emson_importer=Mock(spec=EMsonImporter), search_chunk_size=5,
+                                         search_page_size=2, async_em_infra_client=async_client)
+
+    sync_collector.collect_asset_info(uuids=asset_uuids)
+    async_collector.collect_asset_info(uuids=asset_uuids)
+
+    assert sorted(async_collector.collection.object_dict) == sorted(sync_collector.collection.object_dict)
+    async_collector.em_infra_importer.get_objects_from_oslo_search_endpoint_using_iterator.assert_not_called()
+
+
+def test_delivery_finder_gets_event_contexts_with_async_client(async_client, tmp_path):
+    db_manager = DbManager(state_db_path=tmp_path / 'state.db')
+    for context_uuid in context_uuids:
+        db_manager.add_delivery(context_uuid)
+    delivery_finder = DeliveryFinder(em_infra_client=Mock(spec=EMInfraRestClient), davie_client=Mock(),
+                                     db_manager=db_manager, async_em_infra_client=async_client)
+
+    delivery_finder.get_additional_attributes_of_deliveries()
+
+    assert db_manager.get_a_delivery_uuid_without_reference() is None
+    delivery_finder.em_infra_client.get_event_context_by_uuid.assert_not_called()
@@ -0,0 +1,42 @@
+import re
+from pathlib import Path
+
+import pytest
+
+from Domain.AssetCollection import AssetCollection
+from Domain.AttributeProjection import drager_types, legacy_drager_types, report_attribute_projection
+from Domain.InfoObject import NodeInfoObject, short_type_to_full_uri
+from Domain.ReportCreator import ReportCreator
+
+
+def test_report_attribute_projection_contains_all_attributes_read_by_report_creator():
+    source = (Path(__file__).parent.parent / 'Domain' / 'ReportCreator.py').read_text()
+    read_keys = set(re.findall(r"attr_dict(?:\.get\(\s*|\[)'([^']+)'", source))
+    projected_keys = set().union(*report_attribute_projection.values())
+
+    assert read_keys
+    assert read_keys - projected_keys == set()
+
+
+@pytest.mark.parametrize('short_type', drager_types)
+def test_projected_drager_keeps_the_location_the_report_compares(short_type):
+    collection = AssetCollection(attribute_projection=report_attribute_projection)
+    collection.add_node({'uuid': '0001', 'typeURI': short_type_to_full_uri(short_type), 'geo:Geometrie.log': [{
+        'geo:DtcLog.niveau': 'https://geo.data.wegenenverkeer.be/id/concept/KlLogNiveau/0',
+        'geo:DtcLog.geometrie': {'geo:DtuGeometrie.punt': 'POINT Z (200000.00 200001.00 0)'}}]})
+
+    assert ReportCreator.get_drager_x_y(drager=collection.get_node_object_by_uuid('0001')) == (200000.0, 200001.0)
+
+
+@pytest.mark.parametrize('short_type', legacy_drager_types)
+def test_projected_legacy_drager_keeps_the_location_the_report_compares(short_type):
+    collection = AssetCollection(attribute_projection=report_attribute_projection)
+    collection.add_node({'uuid': '0001', 'typeURI': short_type_to_full_uri(short_type), 'loc:Locatie.puntlocatie': {
+        'loc:3Dpunt.puntgeometrie': {'loc:DtcCoord.lambert72': {
+            'loc:DtcCoordLambert72.xcoordinaat': 200000.0, 'loc:DtcCoordLambert72.ycoordinaat': 200001.0}}}})
+    drager = NodeInfoObject(uuid='0002', short_type=drager_types[0], attr_dict={'geo:Geometrie.log': [{
+        'geo:DtcLog.niveau': 'https://geo.data.wegenenverkeer.be/id/concept/KlLogNiveau/0',
+        'geo:DtcLog.geometrie': {'geo:DtuGeometrie.punt': 'POINT Z (200003.00 200005.00 0)'}}]})
+
+    assert ReportCreator.distance_between_drager_and_legacy_drager(
+        legacy_drager=collection.get_node_object_by_uuid('0001'), drager=drager) == 5.0
@@ -1,7 +1,10 @@
+import datetime
 import os
 import sqlite3
 from pathlib import Path
+from uuid import UUID
 
+from Database.DatabaseModel import Asset, DeliveryAsset
 from Database.DbManager import DbManager
 
 
@@ -26,3 +29,58 @@ def test_set_state_variable():
     assert result_page == '3'
 
     os.unlink(Path('test.db'))
+
+
+def test_upsert_assets_deliveries():
+    manager = DbManager(state_db_path=Path('test.db'))
+    manager.add_delivery('00000001-0000-0000-0000-000000000000')
+    manager.add_delivery('00000002-0000-0000-0000-000000000000')
+    manager.upsert_assets_delivery(delivery_em_infra_uuid='00000001-0000-0000-0000-000000000000',
+                                   asset_timestamp_dict={'00000000-0000-0000-0000-000000000001':
+                                                         datetime.datetime(2024, 1, 1)})
+
+    manager.upsert_assets_deliveries({
+        '00000001-0000-0000-0000-000000000000': {
+            '00000000-0000-0000-0000-000000000001': datetime.datetime(2024, 1, 2),
+            '00000000-0000-0000-0000-000000000002': datetime.datetime(2024, 1, 2)},
+        '00000002-0000-0000-0000-000000000000': {
+            '00000000-0000-0000-0000-000000000001': datetime.datetime(2024, 1, 3)}})
+
+    with manager.session_maker.begin() as session:
+        assert session.query(Asset).count() == 2
+        rows = session.query(DeliveryAsset.uuid_delivery_em_infra, DeliveryAsset.uuid_asset,
+                             DeliveryAsset.last_updated).all()
+    assert sorted((str(d), str(a), t) for d, a, t in rows) == [
+        ('00000001-0000-0000-0000-000000000000', '00000000-0000-0000-0000-000000000001', datetime.datetime(2024, 1, 2)),
+        ('00000001-0000-0000-0000-000000000000', '00000000-0000-0000-0000-000000000002', datetime.datetime(2024, 1, 2)),
+        ('00000002-0000-0000-0000-000000000000', '00000000-0000-0000-0000-000000000001', datetime.datetime(2024, 1, 3))]
+
+    os.unlink(Path('test.db'))
+
+
+def test_get_delivery_info_by_asset_uuids():
+    manager = DbManager(state_db_path=Path('test.db'))
+    manager.add_delivery('00000001-0000-0000-0000-000000000000')
+    manager.add_delivery('00000002-0000-0000-0000-000000000000')
+    manager.update_delivery_description(em_infra_uuid=UUID('00000001-0000-0000-0000-000000000000'),
+                                        description='DA-01')
+    manager.update_delivery_description(em_infra_uuid=UUID('00000002-0000-0000-0000-000000000000'),
+                                        description='DA-02')
+    manager.update_delivery_davie_uuid(em_infra_uuid=UUID('00000002-0000-0000-0000-000000000000'),
+                                       davie_uuid='00000000-0000-0000-0000-0000000000d2')
+    manager.upsert_assets_deliveries({
+        '00000001-0000-0000-0000-000000000000': {
+            '00000000-0000-0000-0000-000000000001': datetime.datetime(2024, 1, 1),
+            '00000000-0000-0000-0000-000000000002': datetime.datetime(2024, 1, 1)},
+        '00000002-0000-0000-0000-000000000000': {
+            '00000000-0000-0000-0000-000000000001': datetime.datetime(2024, 1, 1)}})
+
+    delivery_info = manager.get_delivery_info_by_asset_uuids(['00000000-0000-0000-0000-000000000001',
+                                                              '00000000-0000-0000-0000-000000000002',
+                                                              '00000000-0000-0000-0000-000000000003'])
+
+    assert {uuid: (sorted(referenties), davie_ids) for uuid, (referenties, davie_ids) in delivery_info.items()} == {
+        '00000000-0000-0000-0000-000000000001': (['DA-01', 'DA-02'], ['00000000-0000-0000-0000-0000000000d2']),
+        '00000000-0000-0000-0000-000000000002': (['DA-01'], [])}
+
+    os.unlink(Path('test.db'))
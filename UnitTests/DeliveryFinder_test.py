@@ -91,3 +91,102 @@ def test_get_additional_attributes_of_deliveries():
         d2 = session.query(Delivery).filter(Delivery.uuid_em_infra == UUID('00000002-0000-0000-0000-000000000000')
                                             ).scalar()
         assert d2 is None
+
+
+def create_fake_feed_page(page_number: int, last_page_number: int) -> FeedProxyPage:
+    entries = []
+    for index in reversed(range(3)):
+        aim_id = f'0000000{page_number}-0000-0000-0000-00000000000{index}-b25kZXJkZWVsI1dWTGljaHRtYXN0'
+        entries.append(ProxyEntryObject.model_validate({
+            'id': f'{page_number}_{index}', '_type': 'atom', 'updated': '2021-10-01T12:00:00Z',
+            'content': {'value': {'event-type': 'NAAM_GEWIJZIGD', 'asset-type': None, 'event-id': None,
+                                  'context-id': f'0000000{page_number}-0000-0000-0000-000000000000',
+                                  'aim-ids': [aim_id]}}}))
+    links = [Link(rel='self', href=f'/{page_number}/100')]
+    if page_number < last_page_number:
+        links.append(Link(rel='previous', href=f'/{page_number + 1}/100'))
+    return FeedProxyPage(id='Proxied EM-Infra change feed for assets', entries=entries, links=links)
+
+
+def test_find_events_with_context_prefetching_gives_same_result():
+    fake_feed_client = Mock(spec=EMInfraRestClient)
+    fake_feed_client.get_feed_page_by_number = Mock(
+        side_effect=lambda page_number: create_fake_feed_page(int(page_number), last_page_number=8))
+    fake_feed_client.get_current_feed_page = Mock(return_value=create_fake_feed_page(8, last_page_number=8))
+
+    delivery_finder = DeliveryFinder(em_infra_client=fake_feed_client, davie_client=Mock(), db_manager=Mock())
+    serial_result = delivery_finder.find_events_with_context(
+        current_feedproxy_event='1_1', current_feedproxy_page='1', proxy_feed_page=None, batch_page_size=5)
+    prefetch_result = delivery_finder.find_events_with_context(
+        current_feedproxy_event='1_1', current_feedproxy_page='1', proxy_feed_page=None, batch_page_size=5,
+        prefetch_page_count=3)
+
+    assert [e.id for e in serial_result[0]] == [e.id for e in prefetch_result[0]]
+    assert [e.id for e in serial_result[0]][:4] == ['1_2', '2_0', '2_1', '2_2']
+    assert serial_result[1:] == prefetch_result[1:] == ('6', '6_2')
+
+
+def test_find_events_with_context_prefetching_stops_at_end_of_feed():
+    requested_page_numbers = []
+
+    def fake_get_feed_page_by_number(page_number: str) -> FeedProxyPage:
+        requested_page_numbers.append(int(page_number))
+        if int(page_number) > 3:
+            raise RuntimeError('page does not exist')
+        return create_fake_feed_page(int(page_number), last_page_number=3)
+
+    fake_feed_client = Mock(spec=EMInfraRestClient)
+    fake_feed_client.get_feed_page_by_number = fake_get_feed_page_by_number
+    fake_feed_client.get_current_feed_page = Mock(return_value=create_fake_feed_page(3, last_page_number=3))
+
+    delivery_finder = DeliveryFinder(em_infra_client=fake_feed_client, davie_client=Mock(), db_manager=Mock())
+    events, page_number, event_id = delivery_finder.find_events_with_context(
+        current_feedproxy_event='1_0', current_feedproxy_page='1', proxy_feed_page=None, batch_page_size=5,
+        prefetch_page_count=4)
+
+    assert [e.id for e in events] == ['1_1', '1_2', '2_0', '2_1', '2_2', '3_0', '3_1', '3_2']
+    assert (page_number, event_id) == ('3', '3_2')
+    assert sorted(requested_page_numbers) == [1, 2, 3]
+
+
+def test_save_events_to_process_to_db_invalidates_asset_cache_before_checkpoint():
+    fake_db_manager = Mock(spec=DbManager)
+    fake_asset_cache_manager = Mock()
+    calls = Mock()
+    calls.attach_mock(fake_db_manager.set_state_variable, 'set_state_variable')
+    calls.attach_mock(fake_asset_cache_manager.invalidate_uuids, 'invalidate_uuids')
+    fake_feed_client = Mock(spec=EMInfraRestClient)
+    fake_feed_client.get_feed_page_by_number = Mock(
+        side_effect=lambda page_number: create_fake_feed_page(int(page_number), last_page_number=2))
+    delivery_finder = DeliveryFinder(em_infra_client=fake_feed_client, davie_client=Mock(),
+                                     db_manager=fake_db_manager, asset_cache_manager=fake_asset_cache_manager)
+
+    changed_uuids = set()
+    events, page_number, event_id = delivery_finder.find_events_with_context(
+        current_feedproxy_event='1_1', current_feedproxy_page='1', proxy_feed_page=None, changed_uuids=changed_uuids)
+    delivery_finder.save_events_to_process_to_db({}, page_number, event_id, changed_uuids=changed_uuids)
+
+    assert changed_uuids == {'00000001-0000-0000-0000-000000000002', '00000002-0000-0000-0000-000000000000',
+                             '00000002-0000-0000-0000-000000000001', '00000002-0000-0000-0000-000000000002'}
+    assert calls.mock_calls[0][0] == 'invalidate_uuids'
+    assert set(calls.mock_calls[0].kwargs['uuids']) == changed_uuids
+    assert [c[0] for c in calls.mock_calls[1:]] == ['set_state_variable', 'set_state_variable']
+
+
+def test_find_events_with_context_collects_the_uuids_of_relation_events():
+    relation_event = ProxyEntryObject.model_validate({
+        'id': '1_3', '_type': 'atom', 'updated': '2021-10-01T12:00:00Z',
+        'content': {'value': {'event-type': 'RELATIE_TOEGEVOEGD', 'asset-type': None, 'event-id': None,
+                              'uuids': ['00000001-0000-0000-0000-000000000010', '00000001-0000-0000-0000-000000000011'],
+                              'aim-ids': ['00000001-0000-0001-0000-000000000012-b25kZXJkZWVsI0JldmVzdGlnaW5n']}}})
+    feed_page = create_fake_feed_page(1, last_page_number=1)
+    feed_page.entries = [relation_event, *feed_page.entries]
+    delivery_finder = DeliveryFinder(em_infra_client=Mock(spec=EMInfraRestClient), davie_client=Mock(),
+                                     db_manager=Mock())
+
+    changed_uuids = set()
+    delivery_finder.find_events_with_context(current_feedproxy_event='1_2', current_feedproxy_page='1',
+                                             proxy_feed_page=feed_page, changed_uuids=changed_uuids)
+
+    assert changed_uuids == {'00000001-0000-0000-0000-000000000010', '00000001-0000-0000-0000-000000000011',
+                             '00000001-0000-0001-0000-000000000012'}
@@ -1,3 +1,13 @@
+import io
+import json
+import threading
+import time
+from unittest.mock import Mock
+
+import pytest
+from requests import Response
+
+from API.AbstractRequester import AbstractRequester
 from API.EMInfraRestClient import EMInfraRestClient
 from Domain.EMInfraDomain import ListUpdateDTOKenmerkEigenschapValueUpdateDTO, KenmerkEigenschapValueUpdateDTO
 
@@ -20,4 +30,77 @@ def test_create_update_eigenschappen_from_update_dict_dict_with_one():
     assert result_dto.data[0].typedValue.type == 'text'
 
 
+def create_response(body: bytes, status_code: int = 200, headers: dict = None) -> Response:
+    response = Response()
+    response.status_code = status_code
+    response.raw = io.BytesIO(body)
+    response.headers.update(headers or {})
+    return response
+
+
+def create_pages(page_count: int) -> [Response]:
+    return [create_response(json.dumps({'@graph': [{'uuid': f'{page:02}01'}, {'uuid': f'{page:02}02'}]}).encode(),
+                            headers={'Em-Paging-Next-Cursor': f'cursor-{page + 1}'} if page < page_count - 1 else {})
+            for page in range(page_count)]
+
+
+@pytest.mark.parametrize('prefetch_page_count', [0, 1, 3])
+def test_get_objects_from_oslo_search_endpoint_using_iterator(prefetch_page_count):
+    fake_requester = Mock(spec=AbstractRequester)
+    fake_requester.first_part_url = ''
+    fake_requester.post = Mock(side_effect=create_pages(5))
+    client = EMInfraRestClient(requester=fake_requester, search_prefetch_page_count=prefetch_page_count)
+
+    assert [asset['uuid'] for asset in client.get_objects_from_oslo_search_endpoint_using_iterator(
+        resource='assets')] == [f'{page:02}{index:02}' for page in range(5) for index in [1, 2]]
+    assert [call.kwargs['json']['fromCursor'] for call in fake_requester.post.call_args_list] == [
+        None, 'cursor-1', 'cursor-2', 'cursor-3', 'cursor-4']
+    assert all(call.kwargs['stream'] for call in fake_requester.post.call_args_list)
+
+
+def test_prefetched_pages_are_requested_before_the_consumer_reaches_them():
+    fake_requester = Mock(spec=AbstractRequester)
+    fake_requester.first_part_url = ''
+    fake_requester.post = Mock(side_effect=create_pages(5))
+    client = EMInfraRestClient(requester=fake_requester)
+
+    assets = client.get_objects_from_oslo_search_endpoint_using_iterator(resource='assets', prefetch_page_count=2)
+    assert next(assets)['uuid'] == '0001'
+    deadline = time.monotonic() + 5
+    while fake_requester.post.call_count < 3 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    # the page being handled, 2 in the queue and 1 waiting for a free place in the queue
+    time.sleep(0.1)
+    assert 3 <= fake_requester.post.call_count <= 4
+
+    assets.close()
+    assert not any(thread.name == 'oslo_search_prefetch' for thread in threading.enumerate())
+    assert fake_requester.post.call_count <= 4
+
+
+@pytest.mark.parametrize('prefetch_page_count', [0, 2])
+def test_get_objects_from_oslo_search_endpoint_using_iterator_error(prefetch_page_count):
+    pages = create_pages(3)
+    pages[1] = create_response(b'{"message": "bad request"}', status_code=400)
+    fake_requester = Mock(spec=AbstractRequester)
+    fake_requester.first_part_url = ''
+    fake_requester.post = Mock(side_effect=pages)
+    client = EMInfraRestClient(requester=fake_requester, search_prefetch_page_count=prefetch_page_count)
+
+    assets = client.get_objects_from_oslo_search_endpoint_using_iterator(resource='assets')
+    assert [next(assets)['uuid'], next(assets)['uuid']] == ['0001', '0002']
+    with pytest.raises(RuntimeError):
+        next(assets)
+    assert fake_requester.post.call_count == 2
+
+
+def test_get_objects_from_oslo_search_endpoint_using_iterator_request_error():
+    fake_requester = Mock(spec=AbstractRequester)
+    fake_requester.first_part_url = ''
+    fake_requester.post = Mock(side_effect=[create_pages(2)[0], ConnectionError('connection reset')])
+    client = EMInfraRestClient(requester=fake_requester, search_prefetch_page_count=1)
 
+    assets = client.get_objects_from_oslo_search_endpoint_using_iterator(resource='assets')
+    assert [next(assets)['uuid'], next(assets)['uuid']] == ['0001', '0002']
+    with pytest.raises(ConnectionError):
+        next(assets)
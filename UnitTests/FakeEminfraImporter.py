@@ -456,6 +456,8 @@ def fake_get_objects_from_oslo_search_endpoint_using_iterator(resource: str, cur
     elif resource == 'assetrelaties':
         assetrelaties = [relatie_10, relatie_11, relatie_12, relatie_13, relatie_14, relatie_15,
                          relatie_31, relatie_32, relatie_33, relatie_34, relatie_35]
+        if 'typeUri' in filter_dict:
+            assetrelaties = [r for r in assetrelaties if r['@type'] in filter_dict['typeUri']]
         if 'uuid' in filter_dict:
             yield from iter([r for r in assetrelaties
                              if r['@id'][46:82] in filter_dict['uuid']])
@@ -0,0 +1,61 @@
+import json
+
+import pytest
+
+from API.GraphStreamParser import GraphStreamParser
+
+page = {'@context': {'onderdeel': 'https://wegenenverkeer.data.vlaanderen.be/ns/onderdeel#'},
+        '@graph': [{'@id': 'https://data.awvvlaanderen.be/id/asset/0001', 'AIMNaamObject.naam': 'A0000.A01',
+                    'Verlichtingstoestel.systeemvermogen': 100, 'loc:Locatie.omschrijving': 'kruispunt Hoogstraat'
+                                                                                          ' - rue de l\'Église'},
+                   {'@id': 'https://data.awvvlaanderen.be/id/asset/0002', 'geo:Geometrie.log': [{'niveau': -1}],
+                    'AIMDBStatus.isActief': False, 'AIMObject.notitie': None},
+                   12.5, 'tekst', [1, [2]]],
+        'em-paging': {'next': None}}
+
+
+def split_in_chunks(data: bytes, chunk_size: int) -> [bytes]:
+    return [data[index:index + chunk_size] for index in range(0, len(data), chunk_size)]
+
+
+@pytest.mark.parametrize('chunk_size', [1, 2, 3, 7, 64, 100000])
+def test_iterate_items_in_chunks(chunk_size):
+    # 1 byte chunks also split the multibyte characters
+    data = json.dumps(page, indent=2, ensure_ascii=False).encode()
+    assert list(GraphStreamParser(split_in_chunks(data, chunk_size)).iterate_items()) == page['@graph']
+
+
+def test_iterate_items_yields_before_the_end_of_the_stream():
+    data = json.dumps({'@graph': [{'uuid': '0001'}, {'uuid': '0002'}]}).encode()
+    chunks_read = []
+
+    def chunks():
+        for chunk in split_in_chunks(data, 10):
+            chunks_read.append(chunk)
+            yield chunk
+
+    items = GraphStreamParser(chunks()).iterate_items()
+    assert next(items) == {'uuid': '0001'}
+    assert len(b''.join(chunks_read)) < len(data)
+    assert list(items) == [{'uuid': '0002'}]
+    assert b''.join(chunks_read) == data
+
+
+@pytest.mark.parametrize('data, expected', [
+    (b'{"@graph": []}', []),
+    (b' {"@graph":[1,2]} \n', [1, 2]),
+    (b'{"other": [1], "@graph": [3]}', [3])])
+def test_iterate_items_edge_cases(data, expected):
+    assert list(GraphStreamParser([data]).iterate_items()) == expected
+
+
+def test_iterate_items_missing_graph():
+    with pytest.raises(KeyError):
+        list(GraphStreamParser([b'{"message": "not found"}']).iterate_items())
+
+
+@pytest.mark.parametrize('data', [b'', b'{"@graph": [1, 2', b'{"@graph": [1 2]}', b'{"@graph": []} x',
+                                  b'<html>error</html>'])
+def test_iterate_items_invalid_json(data):
+    with pytest.raises(ValueError):
+        list(GraphStreamParser(split_in_chunks(data, 3)).iterate_items())
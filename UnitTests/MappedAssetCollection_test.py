@@ -0,0 +1,95 @@
+import pickle
+
+import pytest
+
+from Domain.AssetCollection import AssetCollection
+from Domain.Enums import Direction
+from Domain.MappedAssetCollection import MappedAssetCollection
+from Exceptions.AssetsMissingError import AssetsMissingError
+
+
+def create_collection() -> AssetCollection:
+    collection = AssetCollection()
+    collection.add_node({'uuid': '0001', 'typeURI': 'https://wegenenverkeer.data.vlaanderen.be/ns/onderdeel#WVLichtmast',
+                         'AIMNaamObject.naam': 'A0000.A01', 'geo:Geometrie.log': [{'geo:DtcLog.niveau': 0}]})
+    collection.add_node({'uuid': '0002', 'typeURI': 'https://wegenenverkeer.data.vlaanderen.be/ns/onderdeel#'
+                                                    'VerlichtingstoestelLED'})
+    collection.add_node({'uuid': '0003', 'typeURI': 'https://wegenenverkeer.data.vlaanderen.be/ns/onderdeel#'
+                                                    'Armatuurcontroller'})
+    collection.add_node({'uuid': '0004', 'typeURI': 'https://wegenenverkeer.data.vlaanderen.be/ns/onderdeel#'
+                                                    'VerlichtingstoestelLED', 'AIMDBStatus.isActief': False})
+    collection.add_node({'uuid': '0005', 'typeURI': 'https://wegenenverkeer.data.vlaanderen.be/ns/onderdeel#Montagekast'})
+    for bron, doel, relation_type in [('0002', '0001', 'Bevestiging'), ('0003', '0001', 'Bevestiging'),
+                                      ('0004', '0001', 'Bevestiging'), ('0005', '0001', 'Voedt'),
+                                      ('0005', '0002', 'Sturing')]:
+        collection.add_relation({'uuid': f'{bron}-{doel}', 'bron': bron, 'doel': doel,
+                                 'typeURI': f'https://wegenenverkeer.data.vlaanderen.be/ns/onderdeel#{relation_type}'})
+    return collection
+
+
+def test_get_node_object_by_uuid(tmp_path):
+    collection = create_collection()
+    MappedAssetCollection.write_graph_image(collection, tmp_path)
+    mapped_collection = MappedAssetCollection(tmp_path)
+
+    node = mapped_collection.get_node_object_by_uuid('0001')
+    assert node.uuid == '0001'
+    assert node.short_type == 'onderdeel#WVLichtmast'
+    assert node.active is True
+    assert node.attr_dict == collection.get_attribute_dict_by_uuid('0001')
+    assert mapped_collection.get_node_object_by_uuid('0004').active is False
+    assert mapped_collection.get_node_object_by_uuid('0001') is node
+    with pytest.raises(AssetsMissingError):
+        mapped_collection.get_node_object_by_uuid('0000')
+
+
+def test_get_node_objects_by_types(tmp_path):
+    collection = create_collection()
+    MappedAssetCollection.write_graph_image(collection, tmp_path)
+    mapped_collection = MappedAssetCollection(tmp_path)
+
+    short_types = ['onderdeel#VerlichtingstoestelLED', 'onderdeel#Montagekast', 'unknown']
+    assert [node.uuid for node in mapped_collection.get_node_objects_by_types(short_types)] == [
+        node.uuid for node in collection.get_node_objects_by_types(short_types)]
+    assert mapped_collection.get_node_types() == collection.get_node_types()
+    assert mapped_collection.get_node_uuids() == collection.get_node_uuids()
+
+
+@pytest.mark.parametrize('filters', [
+    {},
+    {'only_active': False},
+    {'relation_types': ['Bevestiging'], 'directions': [Direction.NONE]},
+    {'relation_types': ['Voedt', 'Bevestiging'], 'only_active': False},
+    {'directions': [Direction.REVERSED]},
+    {'node_types': ['onderdeel#VerlichtingstoestelLED', 'onderdeel#Montagekast']},
+    {'relation_types': ['HoortBij']}])
+def test_get_neighbours_same_as_asset_collection(tmp_path, filters):
+    collection = create_collection()
+    MappedAssetCollection.write_graph_image(collection, tmp_path)
+    mapped_collection = MappedAssetCollection(tmp_path)
+
+    for uuid in collection.get_node_uuids():
+        assert [node.uuid for node in mapped_collection.get_neighbours(start_uuid=uuid, **filters)] == [
+            node.uuid for node in collection.get_neighbours(start_uuid=uuid, **filters)]
+
+
+def test_traverse_graph(tmp_path):
+    MappedAssetCollection.write_graph_image(create_collection(), tmp_path)
+    mapped_collection = MappedAssetCollection(tmp_path)
+
+    assert list(mapped_collection.traverse_graph(start_uuid='0005', allowed_directions=[Direction.WITH],
+                                                 filtered_node_types=['onderdeel#WVLichtmast'])) == ['0001']
+    assert next(mapped_collection.traverse_graph(start_uuid='0002', return_type='info_object')).uuid == '0001'
+    with pytest.raises(ValueError):
+        list(mapped_collection.traverse_graph(start_uuid='0002', return_type='dict'))
+
+
+def test_pickle_maps_the_same_image(tmp_path):
+    MappedAssetCollection.write_graph_image(create_collection(), tmp_path)
+    mapped_collection = MappedAssetCollection(tmp_path)
+
+    collection_copy, node_copy = pickle.loads(pickle.dumps(
+        (mapped_collection, mapped_collection.get_node_object_by_uuid('0003'))))
+    assert collection_copy.image_path == tmp_path
+    assert node_copy is collection_copy.get_node_object_by_uuid('0003')
+    assert node_copy.attr_dict['uuid'] == '0003'
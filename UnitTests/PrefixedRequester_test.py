@@ -0,0 +1,25 @@
+from unittest.mock import Mock
+
+from API.AbstractRequester import AbstractRequester
+from API.DavieRestClient import DavieRestClient
+from API.EMInfraRestClient import EMInfraRestClient
+from API.EMsonImporter import EMsonImporter
+from API.PrefixedRequester import PrefixedRequester
+
+
+def test_clients_share_one_requester_with_own_prefix():
+    shared_requester = Mock(spec=AbstractRequester)
+    shared_requester.first_part_url = 'https://services.apps.mow.vlaanderen.be/'
+
+    em_infra_client = EMInfraRestClient(PrefixedRequester(shared_requester))
+    emson_importer = EMsonImporter(PrefixedRequester(shared_requester))
+    davie_client = DavieRestClient(PrefixedRequester(shared_requester))
+
+    em_infra_client.requester.get(url='feedproxy/feed/assets')
+    emson_importer.requester.post(url='api/otl/assets/search', json={})
+    davie_client.requester.get(url='aanleveringen/1')
+
+    assert shared_requester.first_part_url == 'https://services.apps.mow.vlaanderen.be/'
+    shared_requester.get.assert_any_call(url='eminfra/feedproxy/feed/assets')
+    shared_requester.post.assert_called_once_with(url='emson/api/otl/assets/search', json={})
+    shared_requester.get.assert_any_call(url='aanleveringen/1')
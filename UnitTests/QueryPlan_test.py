@@ -0,0 +1,47 @@
+import pytest
+
+from Domain.QueryPlan import QueryPlan, QueryPlanStep
+
+pattern = [('uuids', 'of', 'a'),
+           ('a', 'type_of', ['onderdeel#VerlichtingstoestelLED']),
+           ('a', '-[r1]-', 'b'),
+           ('b', 'type_of', ['onderdeel#WVLichtmast', 'onderdeel#WVConsole']),
+           ('e', '-[r2]->', 'b'),
+           ('e', 'type_of', ['onderdeel#Montagekast']),
+           ('b', '-[r3]->', 'c'),
+           ('c', 'type_of', ['lgc:installatie#VPLMast']),
+           ('r1', 'type_of', ['onderdeel#Bevestiging']),
+           ('r3', 'type_of', ['onderdeel#HoortBij'])]
+
+
+def test_compile_pattern():
+    plan = QueryPlan.compile(pattern)
+    assert plan.start_object == 'a'
+    assert plan.steps == (
+        QueryPlanStep(source='a', relation='r1', target='b', source_types=('onderdeel#VerlichtingstoestelLED',),
+                      relation_types=('onderdeel#Bevestiging',)),
+        QueryPlanStep(source='b', relation='r2', target='e',
+                      source_types=('onderdeel#WVLichtmast', 'onderdeel#WVConsole'), relation_types=None),
+        QueryPlanStep(source='b', relation='r3', target='c',
+                      source_types=('onderdeel#WVLichtmast', 'onderdeel#WVConsole'),
+                      relation_types=('onderdeel#HoortBij',)))
+
+
+def test_from_pattern_reuses_compiled_plan():
+    plan = QueryPlan.from_pattern(pattern)
+    assert QueryPlan.from_pattern(list(pattern)) is plan
+
+
+def test_compile_disconnected_pattern_raises():
+    with pytest.raises(ValueError):
+        QueryPlan.compile([('uuids', 'of', 'a'),
+                           ('a', 'type_of', ['onderdeel#VerlichtingstoestelLED']),
+                           ('b', '-[r1]-', 'c'),
+                           ('b', 'type_of', ['onderdeel#WVLichtmast'])])
+
+
+def test_compile_pattern_without_type_of_source_raises():
+    with pytest.raises(ValueError):
+        QueryPlan.compile([('uuids', 'of', 'a'),
+                           ('b', 'type_of', ['onderdeel#WVLichtmast']),
+                           ('a', '-[r1]-', 'b')])
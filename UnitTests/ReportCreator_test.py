@@ -1,13 +1,20 @@
-﻿from copy import deepcopy
+﻿import multiprocessing
+from copy import deepcopy
 from unittest.mock import Mock
 
 import pytest
+from openpyxl import Workbook, load_workbook
+from pandas import DataFrame, concat
+from pandas.testing import assert_frame_equal
 
 from API.AbstractRequester import AbstractRequester
 from Database.DatabaseModel import Delivery
 from Database.DbManager import DbManager
+from Domain.AssetCollection import AssetCollection
 from Domain.AssetInfoCollector import AssetInfoCollector
+from Domain.AttributeProjection import report_attribute_projection
 from Domain.InfoObject import NodeInfoObject
+from Domain.MappedAssetCollection import MappedAssetCollection
 from Domain.ReportCreator import ReportCreator
 from UnitTests.FakeEminfraImporter import fake_em_infra_importer
 
@@ -16,16 +23,21 @@ def fake_get_deliveries_by_asset_uuid(asset_uuid: str) -> [Delivery]:
     return [Delivery(referentie='DA-01', uuid_davie='01')]
 
 
+def fake_get_delivery_info_by_asset_uuids(asset_uuids: [str]) -> {str: ([str], [str])}:
+    return {asset_uuid: (['DA-01'], ['01']) for asset_uuid in asset_uuids}
+
+
 fake_db_manager = Mock(spec=DbManager)
 fake_db_manager.get_deliveries_by_asset_uuid = fake_get_deliveries_by_asset_uuid
+fake_db_manager.get_delivery_info_by_asset_uuids = fake_get_delivery_info_by_asset_uuids
 
 
-def test_start_creating_report():
+def create_fake_collection(attribute_projection: dict[str, frozenset[str]] | None = None) -> AssetCollection:
     fake_requester = Mock(spec=AbstractRequester)
     fake_requester.first_part_url = ''
     AssetInfoCollector.create_requester_with_settings = Mock(return_value=fake_requester)
-    collector = AssetInfoCollector(em_infra_rest_client=fake_em_infra_importer, emson_importer=Mock())
-    report_creator = ReportCreator(collection=collector.collection, db_manager=fake_db_manager)
+    collector = AssetInfoCollector(em_infra_rest_client=fake_em_infra_importer, emson_importer=Mock(),
+                                   attribute_projection=attribute_projection)
 
     collector.collect_asset_info(
         uuids=['00000000-0000-0000-0000-000000000002', '00000000-0000-0000-0000-000000000003',
@@ -40,6 +52,11 @@ def test_start_creating_report():
                '000000000004--HoortBij--000000000008', '000000000005--HoortBij--000000000009',
                '000000000024-Bevestigin-000000000004', '000000000023-Bevestigin-000000000004',
                '000000000022-Bevestigin-000000000004', '000000000002-Bevestigin-000000000026'])
+    return collector.collection
+
+
+def test_start_creating_report():
+    report_creator = ReportCreator(collection=create_fake_collection(), db_manager=fake_db_manager)
 
     expected_report = {
         'columns': [
@@ -402,3 +419,149 @@ def test_get_verlichtingstype():
     assert ReportCreator.get_verlichtingstype(toestellen) == 'hoofdbaan'
     toestellen = [node_info_object_mock('hoofdweg'), node_info_object_mock('afrit')]
     assert ReportCreator.get_verlichtingstype(toestellen) == 'opafrit'
+
+
+def test_create_dataframe_from_records_matches_concat():
+    all_column_names = ['a', 'b']
+    records = [{'a': ['1'], 'b': [True]},
+               {'a': ['2'], 'c': [3.0]},
+               {'b': False, 'd': ['4']}]
+    expected_df = DataFrame(columns=all_column_names)
+    for record in records:
+        expected_df = concat([expected_df, DataFrame(record)])
+
+    df = ReportCreator.create_dataframe_from_records(records, all_column_names)
+
+    assert list(df.columns) == ['a', 'b', 'c', 'd']
+    assert_frame_equal(df, expected_df, check_dtype=False)
+
+
+def test_create_dataframe_from_records_without_records():
+    df = ReportCreator.create_dataframe_from_records([], ['a', 'b'])
+    assert list(df.columns) == ['a', 'b']
+    assert df.empty
+
+
+def test_write_sheet(tmp_path):
+    workbook = Workbook(write_only=True)
+    ReportCreator.write_sheet(workbook=workbook, sheet_name='Overzicht', df=DataFrame({'alles_ok': [False]}),
+                              formatting_ranges=['A2:A2'])
+    ReportCreator.write_sheet(workbook=workbook, sheet_name='pov_toestel', df=DataFrame(
+        {'uuid': ['01', '02'], 'aantal': [1, None], 'lijst': [['a'], 'b']}, dtype=object))
+    workbook.save(tmp_path / 'report.xlsx')
+
+    workbook = load_workbook(tmp_path / 'report.xlsx')
+    assert workbook.sheetnames == ['Overzicht', 'pov_toestel']
+    assert list(workbook['Overzicht'].values) == [('alles_ok',), (False,)]
+    assert list(workbook['pov_toestel'].values) == [('uuid', 'aantal', 'lijst'), ('01', 1, "['a']"), ('02', None, 'b')]
+    rules = workbook['Overzicht'].conditional_formatting
+    assert [str(rule.sqref) for rule in rules] == ['A2']
+    assert len(workbook['pov_toestel'].conditional_formatting) == 0
+
+
+def test_create_all_reports_with_workers_writes_same_workbook(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'Reports').mkdir()
+    collection = create_fake_collection()
+
+    ReportCreator(collection=collection, db_manager=fake_db_manager).create_all_reports()
+    expected_workbook = load_workbook(tmp_path / 'Reports' / 'A0000.xlsx')
+    ReportCreator(collection=collection, db_manager=fake_db_manager).create_all_reports(max_workers=2)
+    workbook = load_workbook(tmp_path / 'Reports' / 'A0000.xlsx')
+
+    assert workbook.sheetnames == expected_workbook.sheetnames
+    for sheet_name in workbook.sheetnames:
+        assert list(workbook[sheet_name].values) == list(expected_workbook[sheet_name].values)
+
+
+def test_create_reports_per_installatie(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'Reports').mkdir()
+    collection = create_fake_collection()
+    collection.add_node({'uuid': '00000000-0000-0000-0000-000000000099', 'AIMNaamObject.naam': 'A0001.A01.WV1',
+                         'typeURI': 'https://wegenenverkeer.data.vlaanderen.be/ns/onderdeel#VerlichtingstoestelLED'})
+
+    report_creator = ReportCreator(collection=collection, db_manager=fake_db_manager)
+    report_creator.create_reports_per_installatie(max_workers=2)
+
+    assert sorted(report_creator.nodes_by_installatie_nummer) == ['A0000', 'A0001']
+    assert sorted(path.name for path in (tmp_path / 'Reports').iterdir()) == ['A0000.xlsx', 'A0001.xlsx']
+    toestel_rows = list(load_workbook(tmp_path / 'Reports' / 'A0001.xlsx')['pov_toestel'].values)
+    assert [row[2] for row in toestel_rows[1:]] == ['00000000-0000-0000-0000-000000000099']
+    toestel_rows = list(load_workbook(tmp_path / 'Reports' / 'A0000.xlsx')['pov_toestel'].values)
+    assert len(toestel_rows) == 6
+
+
+def test_report_attribute_projection_gives_same_sheets():
+    report_creator = ReportCreator(collection=create_fake_collection(), db_manager=fake_db_manager)
+    projected_report_creator = ReportCreator(
+        collection=create_fake_collection(attribute_projection=report_attribute_projection), db_manager=fake_db_manager)
+
+    for method_name in ReportCreator.sheet_method_names:
+        assert_frame_equal(getattr(projected_report_creator, method_name)(),
+                           getattr(report_creator, method_name)())
+
+
+def test_snapshot_gives_same_sheets(tmp_path):
+    collection = create_fake_collection()
+    collection.save_snapshot(tmp_path / 'snapshot.pkl')
+    report_creator = ReportCreator(collection=collection, db_manager=fake_db_manager)
+    snapshot_report_creator = ReportCreator(collection=AssetCollection.load_snapshot(tmp_path / 'snapshot.pkl'),
+                                            db_manager=fake_db_manager)
+
+    for method_name in ReportCreator.sheet_method_names:
+        assert_frame_equal(getattr(snapshot_report_creator, method_name)(), getattr(report_creator, method_name)())
+
+
+def test_mapped_collection_gives_same_sheets(tmp_path):
+    collection = create_fake_collection()
+    MappedAssetCollection.write_graph_image(collection, tmp_path / 'graph')
+    report_creator = ReportCreator(collection=collection, db_manager=fake_db_manager)
+    mapped_report_creator = ReportCreator(collection=MappedAssetCollection(tmp_path / 'graph'),
+                                          db_manager=fake_db_manager)
+
+    for method_name in ReportCreator.sheet_method_names:
+        assert_frame_equal(getattr(mapped_report_creator, method_name)(), getattr(report_creator, method_name)())
+
+
+def test_create_reports_per_installatie_from_mapped_collection(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'Reports').mkdir()
+    MappedAssetCollection.write_graph_image(create_fake_collection(), tmp_path / 'graph')
+
+    report_creator = ReportCreator(collection=MappedAssetCollection(tmp_path / 'graph'), db_manager=fake_db_manager)
+    report_creator.create_reports_per_installatie(max_workers=2)
+
+    toestel_rows = list(load_workbook(tmp_path / 'Reports' / 'A0000.xlsx')['pov_toestel'].values)
+    assert len(toestel_rows) == 6
+
+
+def add_relation_chain(collection: AssetCollection, length: int) -> None:
+    # a chain of relations makes the object graph too deeply recursive to pickle
+    for index in range(length + 1):
+        collection.add_node({'uuid': f'00000000-0000-0000-0001-{index:012}', 'AIMNaamObject.naam': f'A0000.K{index}',
+                             'typeURI': 'https://wegenenverkeer.data.vlaanderen.be/ns/onderdeel#Stroomkring'})
+    for index in range(length):
+        collection.add_relation({'uuid': f'00000000-0000-0000-0002-{index:012}',
+                                 'bron': f'00000000-0000-0000-0001-{index:012}',
+                                 'doel': f'00000000-0000-0000-0001-{index + 1:012}',
+                                 'typeURI': 'https://wegenenverkeer.data.vlaanderen.be/ns/onderdeel#Voedt'})
+
+
+def test_spawned_workers_get_a_deeply_linked_collection(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'Reports').mkdir()
+    monkeypatch.setattr(ReportCreator, 'worker_mp_context', multiprocessing.get_context('spawn'))
+    collection = create_fake_collection()
+    add_relation_chain(collection, length=150)
+
+    ReportCreator(collection=collection, db_manager=fake_db_manager).create_all_reports()
+    expected_workbook = load_workbook(tmp_path / 'Reports' / 'A0000.xlsx')
+    ReportCreator(collection=collection, db_manager=fake_db_manager).create_all_reports(max_workers=2)
+    workbook = load_workbook(tmp_path / 'Reports' / 'A0000.xlsx')
+    (tmp_path / 'Reports' / 'A0000.xlsx').unlink()
+    ReportCreator(collection=collection, db_manager=fake_db_manager).create_reports_per_installatie(max_workers=2)
+
+    for sheet_name in expected_workbook.sheetnames:
+        assert list(workbook[sheet_name].values) == list(expected_workbook[sheet_name].values)
+    assert (tmp_path / 'Reports' / 'A0000.xlsx').exists()
@@ -0,0 +1,114 @@
+import json
+from unittest.mock import Mock
+
+import pytest
+
+from API.Cassette import Cassette
+from API.CertRequester import CertRequester
+from API.EMInfraRestClient import EMInfraRestClient
+from API.EMsonImporter import EMsonImporter
+from API.PrefixedRequester import PrefixedRequester
+from TestSupport.StubEMInfraServer import StubEMInfraServer, SyntheticEMInfraData
+from Database.DbManager import DbManager
+from Domain.AssetInfoCollector import AssetInfoCollector
+from Domain.DeliveryFinder import DeliveryFinder
+
+
+@pytest.fixture(scope='module')
+def data():
+    return SyntheticEMInfraData(lichtpunt_count=60, delivery_count=3, feed_page_size=100)
+
+
+@pytest.fixture
+def stub_server(data):
+    with StubEMInfraServer(data=data) as server:
+        yield server
+
+
+def create_requester(url: str, tmp_path) -> CertRequester:
+    (tmp_path / 'cert.crt').touch()
+    (tmp_path / 'cert.key').touch()
+    return CertRequester(cert_path=tmp_path / 'cert.crt', key_path=tmp_path / 'cert.key', first_part_url=url)
+
+
+def test_search_pages_follow_the_cursor(stub_server, data, tmp_path):
+    requester = create_requester(stub_server.url, tmp_path)
+    client = EMInfraRestClient(PrefixedRequester(requester))
+    mast_uuids = [uuid for uuid in data.assets if uuid[19:23] == '0001']
+
+    assets = list(client.get_objects_from_oslo_search_endpoint_using_iterator(
+        resource='assets', size=25, filter_dict={'uuid': mast_uuids}))
+    relations = list(client.get_objects_from_oslo_search_endpoint_using_iterator(
+        resource='assetrelaties', size=25, filter_dict={
+            'asset': mast_uuids[:10], 'typeUri': ['https://grp.data.wegenenverkeer.be/ns/onderdeel#HoortBij']}))
+
+    assert [asset['@id'][39:75] for asset in assets] == mast_uuids
+    assert stub_server.request_count == 3 + 1
+    assert [relation['RelatieObject.bron']['@id'][39:75] for relation in relations] == mast_uuids[:10]
+    requester.close()
+
+
+def test_asset_info_collector_searches_chunks_with_workers(stub_server, data, tmp_path):
+    requester = create_requester(stub_server.url, tmp_path)
+    client = EMInfraRestClient(PrefixedRequester(requester))
+    mast_uuids = [uuid for uuid in data.assets if uuid[19:23] == '0001']
+    serial_collector = AssetInfoCollector(em_infra_rest_client=client, emson_importer=Mock(spec=EMsonImporter),
+                                          search_page_size=7)
+    concurrent_collector = AssetInfoCollector(em_infra_rest_client=client, emson_importer=Mock(spec=EMsonImporter),
+                                              search_max_workers=4, search_chunk_size=5, search_page_size=7)
+
+    serial_relations = list(serial_collector.get_assetrelaties_by_source_or_target_uuids(uuids=mast_uuids))
+    concurrent_relations = list(concurrent_collector.get_assetrelaties_by_source_or_target_uuids(uuids=mast_uuids))
+
+    assert len(serial_relations) == 2 * len(mast_uuids)
+    assert sorted(relation['@id'] for relation in concurrent_relations) == sorted(
+        relation['@id'] for relation in serial_relations)
+    requester.close()
+
+
+def test_delivery_finder_catches_up_with_the_feed(stub_server, data, tmp_path):
+    requester = create_requester(stub_server.url, tmp_path)
+    client = EMInfraRestClient(PrefixedRequester(requester))
+    delivery_finder = DeliveryFinder(em_infra_client=client, davie_client=Mock(),
+                                     db_manager=DbManager(state_db_path=tmp_path / 'state.db'))
+
+    events, page, event_id = delivery_finder.find_events_with_context(
+        current_feedproxy_event=None, current_feedproxy_page='0', proxy_feed_page=None)
+
+    assert [event.id for event in events] == [entry['id'] for entry in data.feed_entries]
+    assert page == '1'
+    assert event_id == data.feed_entries[-1]['id']
+    assert delivery_finder.is_last_event_in_feedproxy(client.get_current_feed_page(), event_id)
+    requester.close()
+
+
+def test_recorded_cassette_is_scrubbed_and_replays_the_same_answers(stub_server, data, tmp_path):
+    cassette_path = tmp_path / 'cassette.jsonl'
+    requester = create_requester(stub_server.url, tmp_path)
+    requester.headers['authorization'] = 'Bearer secret-token'
+    requester.cassette = Cassette(cassette_path=cassette_path)
+    client = EMInfraRestClient(PrefixedRequester(requester))
+    context_uuid = data.event_contexts[1]['uuid']
+
+    recorded = (list(client.get_objects_from_oslo_search_endpoint_using_iterator(resource='assets', size=50)),
+                list(client.get_feed_events_by_eventcontext_id(context_id=context_uuid, size=30)),
+                client.get_feed_page_by_number('1'))
+    requester.close()
+
+    assert 'secret-token' not in cassette_path.read_text()
+    interactions = [json.loads(line) for line in cassette_path.read_text().splitlines()]
+    assert interactions[0]['request']['headers']['authorization'] == '<scrubbed>'
+    assert len(interactions) == 5 + 2 + 1
+
+    with StubEMInfraServer(cassette=Cassette.load(cassette_path)) as replay_server:
+        replay_requester = create_requester(replay_server.url, tmp_path)
+        replay_client = EMInfraRestClient(PrefixedRequester(replay_requester))
+        replayed = (list(replay_client.get_objects_from_oslo_search_endpoint_using_iterator(
+                        resource='assets', size=50)),
+                    list(replay_client.get_feed_events_by_eventcontext_id(context_id=context_uuid, size=30)),
+                    replay_client.get_feed_page_by_number('1'))
+
+        assert replayed == recorded
+        with pytest.raises(RuntimeError):
+            replay_client.get_feed_page_by_number('0')
+        replay_requester.close()
@@ -0,0 +1,231 @@
+import os
+import stat
+import time
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+from unittest.mock import Mock
+
+import jwt
+import jwt.algorithms as jwt_algo
+import pytest
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+from API.JWTRequester import JWTRequester
+from API.RetryPolicy import RetryPolicy
+from API.RequesterFactory import RequesterFactory
+from API.TokenCache import TokenCache
+from API.TokenManager import TokenManager
+from Domain.Enums import AuthType, Environment
+from UnitTests.AbstractRequester_test import FakeAdapter
+
+
+@pytest.fixture(scope='module')
+def private_key():
+    return rsa.generate_private_key(public_exponent=65537, key_size=2048)
+
+
+@pytest.fixture
+def key_path(tmp_path, private_key):
+    key_path = tmp_path / 'private_key.json'
+    key_path.write_text(jwt_algo.RSAAlgorithm.to_jwk(private_key))
+    return key_path
+
+
+class FakeTokenEndpoint:
+    # hands out access-token-1, access-token-2, ... after <delay> seconds, or raises the errors of <failures>
+    def __init__(self, expires_in: int = 600, delay: float = 0.0, failures: list = None):
+        self.expires_in = expires_in
+        self.delay = delay
+        self.failures = failures or []
+        self.authentication_tokens = []
+        self.lock = Lock()
+
+    def get_access_token(self, token: str) -> (str, int):
+        time.sleep(self.delay)
+        with self.lock:
+            self.authentication_tokens.append(token)
+            if self.failures:
+                raise self.failures.pop(0)
+            return f'access-token-{len(self.authentication_tokens)}', self.expires_in
+
+
+def create_token_manager(key_path, endpoint: FakeTokenEndpoint, **kwargs) -> TokenManager:
+    token_manager = TokenManager(private_key_path=key_path, client_id='client', **kwargs)
+    token_manager.get_access_token = endpoint.get_access_token
+    return token_manager
+
+
+def test_token_is_reused_until_it_expires(key_path, private_key):
+    endpoint = FakeTokenEndpoint()
+    token_manager = create_token_manager(key_path, endpoint)
+
+    assert token_manager.get_token() == 'access-token-1'
+    assert token_manager.get_token() == 'access-token-1'
+
+    claims = jwt.decode(endpoint.authentication_tokens[0], key=private_key.public_key(), algorithms=['RS256'],
+                        audience=TokenManager.audience)
+    assert claims['iss'] == claims['sub'] == 'client'
+    token_manager.close()
+
+
+def test_key_is_parsed_once(key_path, monkeypatch):
+    endpoint = FakeTokenEndpoint(expires_in=0)
+    token_manager = create_token_manager(key_path, endpoint)
+    from_jwk_calls = []
+    from_jwk = jwt_algo.RSAAlgorithm.from_jwk
+    monkeypatch.setattr(jwt_algo.RSAAlgorithm, 'from_jwk', lambda jwk: from_jwk_calls.append(jwk) or from_jwk(jwk))
+
+    # expired right away, so every call refreshes
+    assert [token_manager.get_token() for _ in range(3)] == ['access-token-1', 'access-token-2', 'access-token-3']
+    assert len(from_jwk_calls) == 1
+    token_manager.close()
+
+
+def test_concurrent_callers_wait_on_one_refresh(key_path):
+    endpoint = FakeTokenEndpoint(delay=0.1)
+    token_manager = create_token_manager(key_path, endpoint)
+
+    with ThreadPoolExecutor(max_workers=20) as executor:
+        tokens = list(executor.map(lambda _: token_manager.get_token(), range(20)))
+
+    assert tokens == ['access-token-1'] * 20
+    assert len(endpoint.authentication_tokens) == 1
+    token_manager.close()
+
+
+def test_token_is_refreshed_in_the_background_before_it_expires(key_path):
+    endpoint = FakeTokenEndpoint(expires_in=2, delay=0.05)
+    token_manager = create_token_manager(key_path, endpoint, expiry_margin=0, refresh_margin=9.9)
+
+    assert token_manager.get_token() == 'access-token-1'
+    deadline = time.monotonic() + 5
+    while len(endpoint.authentication_tokens) < 2 and time.monotonic() < deadline:
+        # the current token is handed out while the next one is requested
+        assert token_manager.get_token() in ('access-token-1', 'access-token-2')
+        time.sleep(0.01)
+
+    assert token_manager.get_token() == 'access-token-2'
+    token_manager.close()
+
+
+def test_short_lived_token_is_used_without_refreshing_in_a_loop(key_path):
+    # expires_in at or below the margins (60s each)
+    for expires_in in [1, 30, 100]:
+        endpoint = FakeTokenEndpoint(expires_in=expires_in)
+        token_manager = create_token_manager(key_path, endpoint)
+
+        assert token_manager.get_token() == 'access-token-1'
+        time.sleep(0.5)
+
+        assert token_manager.is_valid()
+        assert token_manager.get_token() == 'access-token-1'
+        assert len(endpoint.authentication_tokens) == 1
+        token_manager.close()
+
+
+def test_failed_refresh_is_raised_to_the_waiting_callers_and_retried(key_path):
+    endpoint = FakeTokenEndpoint(delay=0.1, failures=[RuntimeError('Could not get the acces token')])
+    token_manager = create_token_manager(key_path, endpoint)
+
+    with ThreadPoolExecutor(max_workers=5) as executor:
+        futures = [executor.submit(token_manager.get_token) for _ in range(5)]
+    assert all(isinstance(future.exception(), RuntimeError) for future in futures)
+    assert len(endpoint.authentication_tokens) == 1
+
+    assert token_manager.get_token() == 'access-token-2'
+    token_manager.close()
+
+
+def test_jwt_requester_uses_the_token_manager(key_path):
+    endpoint = FakeTokenEndpoint()
+    requester = JWTRequester(private_key_path=key_path, client_id='client')
+    requester.token_manager.get_access_token = endpoint.get_access_token
+
+    kwargs = requester.modify_kwargs_for_bearer_token({})
+    requester.modify_kwargs_for_bearer_token({})
+
+    assert kwargs['headers']['authorization'] == 'Bearer access-token-1'
+    assert len(endpoint.authentication_tokens) == 1
+    requester.close()
+    assert requester.token_manager.closed
+
+
+def test_jwt_requester_gets_the_token_again_for_each_retry(key_path):
+    requester = JWTRequester(private_key_path=key_path, client_id='client', first_part_url='https://services.test/',
+                             retry_policy=RetryPolicy(max_retries=3, backoff_factor=0))
+    requester.token_manager.get_token = Mock(side_effect=['access-token-1', 'access-token-2'])
+    adapter = FakeAdapter([503, 200])
+    requester.mount('https://', adapter)
+
+    response = requester.get(url='core/api/assets')
+
+    assert response.status_code == 200
+    assert [r.headers['authorization'] for r in adapter.requests] == ['Bearer access-token-1',
+                                                                      'Bearer access-token-2']
+    requester.close()
+
+
+def test_token_cache_is_private_and_keeps_the_valid_tokens_per_key(tmp_path):
+    token_cache = TokenCache(tmp_path / 'cache' / 'tokens.json')
+    token_cache.save(key='client/prd', access_token='expired', expires_at=time.time() - 1)
+    token_cache.save(key='client/tei', access_token='tei-token', expires_at=time.time() + 600)
+    token_cache.save(key='client/prd', access_token='prd-token', expires_at=time.time() + 600)
+
+    assert token_cache.load('client/prd')[0] == 'prd-token'
+    assert token_cache.load('client/tei')[0] == 'tei-token'
+    assert token_cache.load('other/prd') is None
+    if os.name == 'posix':
+        assert stat.S_IMODE(os.stat(tmp_path / 'cache' / 'tokens.json').st_mode) == 0o600
+    assert os.listdir(tmp_path / 'cache') == ['tokens.json']
+
+
+@pytest.mark.skipif(os.name != 'posix', reason='file permissions')
+def test_token_cache_readable_by_others_is_not_used(tmp_path):
+    token_cache = TokenCache(tmp_path / 'tokens.json')
+    token_cache.save(key='client/prd', access_token='prd-token', expires_at=time.time() + 600)
+    os.chmod(tmp_path / 'tokens.json', 0o644)
+
+    assert token_cache.load('client/prd') is None
+
+
+def test_next_process_uses_the_cached_token(key_path, tmp_path):
+    first_endpoint = FakeTokenEndpoint(expires_in=600)
+    first_run = create_token_manager(key_path, first_endpoint, token_cache=TokenCache(tmp_path / 'tokens.json'),
+                                     cache_key='client/prd')
+    assert first_run.get_token() == 'access-token-1'
+    first_run.close()
+
+    next_endpoint = FakeTokenEndpoint(expires_in=600)
+    next_run = create_token_manager(key_path, next_endpoint, token_cache=TokenCache(tmp_path / 'tokens.json'),
+                                    cache_key='client/prd')
+    other_environment = create_token_manager(key_path, next_endpoint, token_cache=TokenCache(tmp_path / 'tokens.json'),
+                                             cache_key='client/tei')
+
+    assert next_run.get_token() == 'access-token-1'
+    assert next_endpoint.authentication_tokens == []
+    assert other_environment.get_token() == 'access-token-1'
+    assert len(next_endpoint.authentication_tokens) == 1
+    next_run.close()
+    other_environment.close()
+
+
+def test_cached_token_close_to_expiry_is_refreshed(key_path, tmp_path):
+    token_cache = TokenCache(tmp_path / 'tokens.json')
+    token_cache.save(key='client', access_token='almost-expired', expires_at=time.time() + 30)
+    endpoint = FakeTokenEndpoint()
+    token_manager = create_token_manager(key_path, endpoint, token_cache=token_cache)
+
+    assert token_manager.get_token() == 'access-token-1'
+    assert token_cache.load('client')[0] == 'access-token-1'
+    token_manager.close()
+
+
+def test_requester_factory_keys_the_token_cache_by_client_and_environment(key_path, tmp_path):
+    settings = {'requester': {'token_cache_path': str(tmp_path / 'tokens.json')},
+                'authentication': {'JWT': {'tei': {'key_path': str(key_path), 'client_id': 'client'}}}}
+
+    requester = RequesterFactory.create_requester(settings=settings, auth_type=AuthType.JWT, env=Environment.TEI)
+
+    assert requester.token_manager.token_cache.cache_path == tmp_path / 'tokens.json'
+    assert requester.token_manager.cache_key == 'client/tei'
+    requester.close()
@@ -17,8 +17,17 @@ root.addHandler(handler)
 
 settings_path = Path('/home/davidlinux/Documents/AWV/resources/settings_SyncOTLDataToLegacy.json')
 state_db_path = Path('/home/davidlinux/Documents/AWV/resources/SyncOTLDataToLegacy_state.db')
+snapshot_path = Path('/home/davidlinux/Documents/AWV/resources/SyncOTLDataToLegacy_snapshot.pkl')
+delivery_reference = 'DA-2024-15552'
 
 if __name__ == '__main__':
     syncer = DataLegacySyncer(settings_path=settings_path, auth_type=AuthType.JWT, env=Environment.PRD,
                               state_db_path=state_db_path)
-    syncer.collect_and_create_specific_reports(['DA-2024-15552'], installatie_nummer='WW0457')
+    if '--from-snapshot' in sys.argv:
+        # re-create the report from the assets saved by an earlier run, without contacting EM-Infra
+        syncer.create_reports_from_snapshot(
+            snapshot_path=snapshot_path.with_stem(f'{snapshot_path.stem}_{delivery_reference}'),
+            installatie_nummer='WW0457')
+    else:
+        syncer.collect_and_create_specific_reports([delivery_reference], installatie_nummer='WW0457',
+                                                   snapshot_path=snapshot_path)